@@ -0,0 +1,436 @@
+"""
+측정한 블로킹 시간으로 스스로 크기를 맞추는 실행기
+
+asyncbest.py의 correct_cpu_intensive는 loop.run_in_executor(None, ...)를 씁니다. 기본 실행기는
+워커 min(32, 코어+4)개짜리 스레드 풀 하나라서 I/O 대기 작업은 워커가 모자라 줄을 서고,
+CPU 작업은 GIL 때문에 스레드를 늘려도 빨라지지 않습니다.
+AdaptiveExecutor는 함수별로 실행 시간을 재서 길을 나눕니다.
+- 워커 안에서 CPU 시간(thread_time/process_time)과 경과 시간을 함께 재서 함수별 CPU 비율 EWMA 유지
+- CPU 비율이 cpu_threshold 이상이거나 호출당 CPU 시간이 offload_cpu_time 이상이고 피클 가능한 함수
+  → 프로세스 풀, 아니면 스레드 풀. 스레드가 많으면 GIL을 기다리는 시간 때문에 CPU 비율이 낮게
+  나오므로 호출당 CPU 시간(= GIL을 잡고 있던 시간)도 함께 봄
+  (둘 다 절반 아래로 내려가면 다시 스레드로 - 경계에서 왔다갔다 하지 않도록 히스테리시스)
+- 프로세스 풀 호출이 fn 자체의 예외가 아닌 이유(인자/결과 피클 실패, 풀 고장 등)로 실패하면
+  스레드로 고정하고 그 호출을 스레드에서 재실행.
+  인자를 제자리에서 바꾸는 함수는 프로세스에서 돌면 변경이 사라지므로 pin_to_thread(fn)로 고정
+- 함수별 통계는 코드 객체(__code__) 기준이라 루프 안의 람다도 하나로 모이고, max_functions개 LRU로 제한
+- 풀마다 동시 실행 한도(limit)를 두고, 주기적으로 대기열 지연(제출 → 워커에서 시작) p90을 봐서
+  목표보다 길고 밀려 있으면 늘리고, 한가하면 줄임
+- stats(): 함수별 호출 수/경로/CPU 비율/평균 실행·대기 시간, 풀별 한도/조정 이력
+
+concurrent.futures 풀은 워커 수를 바꿀 수 없어서 최대 크기로 만들고 limit으로 동시 실행만 조절합니다
+(스레드 풀의 유휴 스레드는 남아 있지만 대기만 함).
+
+사용법:
+    async with AdaptiveExecutor() as executor:
+        result = await executor.run(blocking_fn, arg)
+        print(executor.stats())
+
+python adaptiveexecutor.py                 # I/O + CPU 혼합 작업: 기본 실행기 vs 고정 풀 vs 적응형
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from stats_util import percentile
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+def _thread_call(fn, args, kwargs):
+    """스레드 워커: (결과, 시작 시각, CPU 초, 경과 초)"""
+    started = time.monotonic()
+    cpu = time.thread_time()
+    result = fn(*args, **kwargs)
+    return result, started, time.thread_time() - cpu, time.monotonic() - started
+
+
+class _CallFailed(Exception):
+    """프로세스 워커에서 fn이 낸 예외 - 인자/결과 전달(피클) 실패와 구분하기 위해 포장"""
+
+    def __init__(self, error: BaseException):
+        super().__init__(error)
+        self.error = error
+
+
+def _process_call(fn, args, kwargs):
+    """프로세스 워커 (프로세스당 작업 하나씩이므로 process_time = 이 작업의 CPU 시간)"""
+    started = time.monotonic()  # 리눅스/맥에서 monotonic은 프로세스 간에 같은 시계
+    cpu = time.process_time()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        raise _CallFailed(e)
+    return result, started, time.process_time() - cpu, time.monotonic() - started
+
+
+class _Lane:
+    """실행기 하나 + 동시 실행 한도 + FIFO 대기열"""
+
+    def __init__(self, name: str, executor: Executor, call, limit: int, min_limit: int, max_limit: int):
+        self.name = name
+        self.executor = executor
+        self.call = call
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiters: deque = deque()
+        self.queue_delays: deque = deque(maxlen=2000)  # 마지막 조정 이후 샘플
+        self.resizes: List[Dict] = []
+
+    async def submit(self, fn, args, kwargs):
+        loop = asyncio.get_running_loop()
+        enqueued = time.monotonic()
+        if self.in_flight >= self.limit or self.waiters:
+            waiter = loop.create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter  # 깨울 때 in_flight를 대신 올려 자리를 예약해 둠
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1  # 예약된 자리를 다음 대기자에게
+                    self._wake()
+                else:
+                    self.waiters.remove(waiter)
+                raise
+        else:
+            self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result, started, cpu, wall = await loop.run_in_executor(self.executor, self.call, fn, args, kwargs)
+        finally:
+            self.in_flight -= 1
+            self._wake()
+        queue_delay = max(0.0, started - enqueued)
+        self.queue_delays.append(queue_delay)
+        return result, queue_delay, cpu, wall
+
+    def _wake(self):
+        while self.waiters and self.in_flight < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def resize(self, limit: int, reason: str):
+        limit = max(self.min_limit, min(self.max_limit, limit))
+        if limit == self.limit:
+            return
+        self.resizes.append({"at": round(time.monotonic(), 3), "from": self.limit, "to": limit, "reason": reason})
+        self.limit = limit
+        self._wake()
+
+
+@dataclass
+class FunctionStats:
+    name: str
+    route: str = THREAD
+    picklable: bool = True
+    calls: int = 0
+    errors: int = 0
+    cpu_ratio: float = -1.0  # EWMA, 아직 측정 전이면 -1
+    cpu_time: float = 0.0  # 호출당 CPU 초 EWMA
+    wall_total: float = 0.0
+    queue_total: float = 0.0
+    reroutes: int = 0
+    queue_delays: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> Dict:
+        calls = max(self.calls, 1)
+        return {
+            "function": self.name,
+            "route": self.route,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cpu_ratio": round(self.cpu_ratio, 3),
+            "cpu_ms": round(self.cpu_time * 1000, 2),
+            "avg_wall_ms": round(self.wall_total / calls * 1000, 2),
+            "avg_queue_ms": round(self.queue_total / calls * 1000, 2),
+            "p99_queue_ms": round(percentile(list(self.queue_delays), 99) * 1000, 2),
+            "reroutes": self.reroutes,
+            "picklable": self.picklable,
+        }
+
+
+class AdaptiveExecutor:
+    """
+    Args:
+        cpu_threshold: CPU 비율이 이 이상이면 프로세스 풀로
+        offload_cpu_time: 호출당 CPU 시간이 이 이상이면 프로세스 풀로 (초, 프로세스 간 전달 비용보다 충분히 크게)
+        probe_calls: 경로를 정하기 전 스레드 풀에서 측정할 호출 수
+        target_queue_delay: 대기열 지연 p90 목표 (초)
+        adjust_interval: 한도 조정 주기 (초)
+        min_threads / max_threads, min_processes / max_processes: 풀별 동시 실행 한도 범위
+        alpha: CPU 비율 EWMA 가중치
+        max_functions: 통계를 유지할 함수 수 (넘으면 가장 오래 안 쓴 함수부터 삭제)
+    """
+
+    def __init__(self, cpu_threshold: float = 0.7, offload_cpu_time: float = 0.002, probe_calls: int = 3,
+                 target_queue_delay: float = 0.01, adjust_interval: float = 0.25,
+                 min_threads: int = 4, max_threads: int = 256,
+                 min_processes: int = 1, max_processes: Optional[int] = None, alpha: float = 0.3,
+                 max_functions: int = 1024):
+        self.cpu_threshold = cpu_threshold
+        self.offload_cpu_time = offload_cpu_time
+        self.probe_calls = probe_calls
+        self.target_queue_delay = target_queue_delay
+        self.adjust_interval = adjust_interval
+        self.alpha = alpha
+        self.max_functions = max_functions
+        max_processes = max_processes or os.cpu_count() or 1
+        self.lanes = {
+            THREAD: _Lane(THREAD, ThreadPoolExecutor(max_threads, thread_name_prefix="adaptive"),
+                          _thread_call, min_threads, min_threads, max_threads),
+            PROCESS: _Lane(PROCESS, ProcessPoolExecutor(max_processes, mp_context=get_context("spawn")),
+                           _process_call, max_processes, min_processes, max_processes),
+        }
+        self.functions: "OrderedDict[Any, FunctionStats]" = OrderedDict()
+        self._controller: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.shutdown()
+
+    def start(self):
+        """실행 중인 루프에서 한도 조정 태스크 시작"""
+        if self._controller is None:
+            self._controller = asyncio.create_task(self._adjust_loop(), name="adaptive-executor-controller")
+
+    async def shutdown(self):
+        if self._controller is not None:
+            self._controller.cancel()
+            try:
+                await self._controller
+            except asyncio.CancelledError:
+                pass
+            self._controller = None
+        for lane in self.lanes.values():
+            await asyncio.to_thread(lane.executor.shutdown, True)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+
+    def _stats_for(self, fn) -> FunctionStats:
+        # 같은 코드의 함수(루프에서 만든 람다, 인스턴스별 메서드)는 통계 하나를 공유
+        key = getattr(fn, "__code__", fn)
+        stats = self.functions.get(key)
+        if stats is None:
+            name = f"{getattr(fn, '__module__', '?')}.{getattr(fn, '__qualname__', repr(fn))}"
+            try:
+                pickle.dumps(fn)
+                picklable = True
+            except Exception:  # 람다, 클로저 등은 프로세스로 보낼 수 없음
+                picklable = False
+            stats = self.functions[key] = FunctionStats(name, picklable=picklable)
+            while len(self.functions) > self.max_functions:
+                self.functions.popitem(last=False)
+        else:
+            self.functions.move_to_end(key)
+        return stats
+
+    def pin_to_thread(self, fn: Callable[..., Any]):
+        """fn을 항상 스레드 풀에서 실행 (인자를 제자리에서 바꾸는 함수 등)"""
+        stats = self._stats_for(fn)
+        stats.picklable = False
+        if stats.route != THREAD:
+            stats.route = THREAD
+            stats.reroutes += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs)를 측정된 경로의 풀에서 실행"""
+        if self._controller is None:
+            self.start()
+        stats = self._stats_for(fn)
+        lane = self.lanes[stats.route]
+        try:
+            result, queue_delay, cpu, wall = await lane.submit(fn, args, kwargs)
+        except asyncio.CancelledError:
+            raise
+        except _CallFailed as e:
+            stats.errors += 1
+            raise e.error from None
+        except Exception:
+            if lane.name == PROCESS:
+                # fn의 예외가 아님 = 인자/결과(락, 소켓 등)를 전달하지 못했거나 풀이 고장
+                # → 스레드로 고정하고 다시 실행
+                self.pin_to_thread(fn)
+                return await self.run(fn, *args, **kwargs)
+            stats.errors += 1
+            raise
+        self._record(stats, queue_delay, cpu, wall)
+        return result
+
+    def _record(self, stats: FunctionStats, queue_delay: float, cpu: float, wall: float):
+        stats.calls += 1
+        stats.wall_total += wall
+        stats.queue_total += queue_delay
+        stats.queue_delays.append(queue_delay)
+        ratio = min(1.0, cpu / wall) if wall > 0 else 0.0
+        if stats.cpu_ratio < 0:
+            stats.cpu_ratio, stats.cpu_time = ratio, cpu
+        else:
+            stats.cpu_ratio = (1 - self.alpha) * stats.cpu_ratio + self.alpha * ratio
+            stats.cpu_time = (1 - self.alpha) * stats.cpu_time + self.alpha * cpu
+
+        if stats.calls < self.probe_calls:
+            return
+        if stats.route == THREAD:
+            if stats.picklable and (stats.cpu_ratio >= self.cpu_threshold
+                                    or stats.cpu_time >= self.offload_cpu_time):
+                stats.route = PROCESS
+                stats.reroutes += 1
+        elif stats.cpu_ratio < self.cpu_threshold / 2 and stats.cpu_time < self.offload_cpu_time / 2:
+            stats.route = THREAD
+            stats.reroutes += 1
+
+    # ------------------------------------------------------------------
+    # 한도 조정
+    # ------------------------------------------------------------------
+
+    async def _adjust_loop(self):
+        while True:
+            await asyncio.sleep(self.adjust_interval)
+            for lane in self.lanes.values():
+                self._adjust(lane)
+
+    def _adjust(self, lane: _Lane):
+        delays = list(lane.queue_delays)
+        lane.queue_delays.clear()
+        peak, lane.peak_in_flight = lane.peak_in_flight, lane.in_flight
+        p90 = percentile(delays, 90)
+        if lane.waiters and p90 > self.target_queue_delay:
+            # 밀려 있음 → 대기 중인 만큼(최대 2배)까지 늘림
+            lane.resize(lane.limit + min(lane.limit, len(lane.waiters)), f"p90 대기 {p90 * 1000:.1f}ms")
+        elif not lane.waiters and peak < lane.limit // 2:
+            lane.resize(max(peak, lane.limit * 3 // 4), f"최대 사용 {peak}/{lane.limit}")
+
+    def stats(self) -> Dict:
+        return {
+            "functions": [s.to_dict() for s in self.functions.values()],
+            "lanes": {name: {"limit": lane.limit, "in_flight": lane.in_flight, "queued": len(lane.waiters),
+                             "resizes": len(lane.resizes), "history": lane.resizes[-5:]}
+                      for name, lane in self.lanes.items()},
+        }
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크: I/O 대기 + CPU 작업 혼합
+# ---------------------------------------------------------------------------
+
+def blocking_io(delay: float) -> float:
+    """블로킹 클라이언트 호출 흉내 (동기 DB 드라이버, requests 등)"""
+    time.sleep(delay)
+    return delay
+
+
+def cpu_work(n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+async def _mixed_load(run, io_calls: int, cpu_calls: int, io_delay: float, cpu_n: int) -> Dict:
+    latencies = {"io": [], "cpu": []}
+
+    async def one(kind: str, fn, arg):
+        start = time.perf_counter()
+        await run(fn, arg)
+        latencies[kind].append(time.perf_counter() - start)
+
+    jobs = [one("io", blocking_io, io_delay) for _ in range(io_calls)]
+    jobs += [one("cpu", cpu_work, cpu_n) for _ in range(cpu_calls)]
+    # 섞어서 제출 (같은 순서를 쓰도록 고정된 간격으로 교차)
+    step = max(1, io_calls // max(cpu_calls, 1))
+    ordered = []
+    io_jobs, cpu_jobs = jobs[:io_calls], jobs[io_calls:]
+    while io_jobs or cpu_jobs:
+        ordered.extend(io_jobs[:step])
+        del io_jobs[:step]
+        if cpu_jobs:
+            ordered.append(cpu_jobs.pop())
+    start = time.perf_counter()
+    await asyncio.gather(*ordered)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "tasks_per_sec": round((io_calls + cpu_calls) / elapsed, 1),
+        "io_p99_ms": round(percentile(latencies["io"], 99) * 1000, 1),
+        "cpu_p99_ms": round(percentile(latencies["cpu"], 99) * 1000, 1),
+    }
+
+
+async def benchmark(io_calls: int, cpu_calls: int, io_delay: float, cpu_n: int,
+                    rounds: int) -> Tuple[List[Dict], Dict]:
+    loop = asyncio.get_running_loop()
+    rows = []
+
+    async def default_run(fn, arg):
+        return await loop.run_in_executor(None, fn, arg)
+
+    with ThreadPoolExecutor(64) as fixed:
+        async def fixed_run(fn, arg):
+            return await loop.run_in_executor(fixed, fn, arg)
+
+        for name, run in (("default executor", default_run), ("fixed threads(64)", fixed_run)):
+            for i in range(rounds):
+                row = await _mixed_load(run, io_calls, cpu_calls, io_delay, cpu_n)
+                rows.append({"strategy": name, "round": i + 1, **row})
+
+    async with AdaptiveExecutor() as executor:
+        for i in range(rounds):
+            row = await _mixed_load(executor.run, io_calls, cpu_calls, io_delay, cpu_n)
+            rows.append({"strategy": "adaptive", "round": i + 1, **row})
+        stats = executor.stats()
+    return rows, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="적응형 실행기 벤치마크")
+    parser.add_argument("--io-calls", type=int, default=500)
+    parser.add_argument("--cpu-calls", type=int, default=40)
+    parser.add_argument("--io-delay", type=float, default=0.02, help="블로킹 I/O 호출 시간 (초)")
+    parser.add_argument("--cpu-n", type=int, default=200_000, help="CPU 작업 크기")
+    parser.add_argument("--rounds", type=int, default=3, help="전략별 반복 (적응형은 반복하며 학습)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print(f"=== 혼합 작업: 블로킹 I/O {args.io_calls}건 ({args.io_delay * 1000:.0f}ms) + "
+          f"CPU {args.cpu_calls}건 (n={args.cpu_n:,}), 코어 {os.cpu_count()}개 ===")
+    rows, stats = asyncio.run(benchmark(args.io_calls, args.cpu_calls, args.io_delay, args.cpu_n, args.rounds))
+    print(f"{'strategy':<18} {'round':>5} {'seconds':>8} {'tasks/s':>8} {'io_p99_ms':>10} {'cpu_p99_ms':>11}")
+    print("-" * 66)
+    for row in rows:
+        print(f"{row['strategy']:<18} {row['round']:>5} {row['seconds']:>8} {row['tasks_per_sec']:>8} "
+              f"{row['io_p99_ms']:>10} {row['cpu_p99_ms']:>11}")
+
+    print("\n함수별 통계 (adaptive):")
+    for fn in stats["functions"]:
+        print(f"  {fn['function']:<32} {fn['route']:<8} 호출 {fn['calls']:>5}  CPU 비율 {fn['cpu_ratio']:.2f} ({fn['cpu_ms']}ms)  "
+              f"평균 {fn['avg_wall_ms']}ms  대기 p99 {fn['p99_queue_ms']}ms")
+    for name, lane in stats["lanes"].items():
+        print(f"  {name} 풀: 한도 {lane['limit']}, 조정 {lane['resizes']}회")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": rows, "adaptive": stats}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -140,6 +140,9 @@ async def example6_semaphore():
 
 # 예제 7: 블록체인 트랜잭션 처리 시뮬레이션
 class Transaction:
+    # __dict__ 없이 고정 필드만 저장 → 트랜잭션이 많을 때 메모리 절약 (txpipeline.py 참고)
+    __slots__ = ("id", "from_addr", "to_addr", "amount")
+
     def __init__(self, tx_id: int, from_addr: str, to_addr: str, amount: float):
         self.id = tx_id
         self.from_addr = from_addr
@@ -220,6 +223,7 @@ async def example8_async_context_manager():
 async def example9_async_http():
     print("\n=== 예제 9: 비동기 HTTP 요청 ===")
     print("(실제 실행하려면 'pip install aiohttp' 필요)")
+    print("(세션 공유/커넥션 풀을 쓰는 실제 크롤러: webcrawler.py)")
     
     # aiohttp 사용 예제 코드 (주석 처리)
     """
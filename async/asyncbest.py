@@ -1,5 +1,9 @@
 import asyncio
 
+from quorumclient import BlockchainAsyncUsage
+from resourceefficiency import ResourceEfficiency
+from webcrawler import WebCrawlerExample
+
 class AsyncBestPractices:
     
     async def common_mistakes(self):
@@ -0,0 +1,416 @@
+"""
+비동기 제너레이터 위의 스트림 연산자 - 배압(backpressure)과 깔끔한 취소
+
+예제 5의 stream_data는 async for로 소비만 할 수 있고 가공 단계를 조합할 방법이 없습니다.
+Stream은 비동기 이터러블을 감싸서 연산자를 이어 붙입니다.
+- map(fn, concurrency): 동시 실행 수를 제한한 변환 (BoundedTaskPool 재사용, 순서 유지 선택)
+- batch(size, timeout): size개가 모이거나 첫 항목 후 timeout이 지나면 리스트로 내보냄
+- throttle(rate, burst): 토큰 버킷으로 초당 rate개 이하로 제한
+- merge(*streams): 여러 스트림을 도착 순서대로 합침
+- buffer(n): 생산자가 소비자보다 최대 n개 앞서 갈 수 있게 분리
+- take(n): 앞의 n개만 사용하고 나머지 단계는 정리
+
+배압: 모든 단계가 크기가 정해진 큐나 한도가 있는 태스크 창을 쓰므로 느린 소비자가
+생산자를 멈춥니다 (메모리는 N이 아니라 버퍼 크기에 비례).
+취소: 소비자가 중간에 멈추거나(aclose / async with) 취소되면 각 단계가 자기 펌프 태스크를
+취소하고 상위 단계를 닫아서 소스까지 정리됩니다.
+항목마다 래퍼 객체를 만들지 않고, 큐에 데이터가 있으면 대기 없이 바로 꺼냅니다.
+
+사용법:
+    async with Stream(feed()).map(parse, concurrency=8).batch(100, 0.05).buffer(4) as stream:
+        async for rows in stream:
+            ...
+
+python asyncstream.py                      # 연산자별 처리량 + 긴 파이프라인 메모리 벤치마크
+python asyncstream.py --items 2000000 --json stream.json
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from multiprocessing import get_context
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from taskpool import BoundedTaskPool
+
+_DONE = object()
+
+
+class _Failure:
+    """펌프 태스크에서 난 예외를 소비자 쪽으로 전달"""
+
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def _from_iterable(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def _aclose(iterator):
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _pump(iterator, queue: asyncio.Queue, done=_DONE):
+    """상위 단계를 끝까지 읽어 큐에 넣음 (큐가 차면 여기서 멈춤 → 배압)"""
+    try:
+        async for item in iterator:
+            await queue.put(item)
+    except asyncio.CancelledError:
+        raise
+    except BaseException as e:
+        await queue.put(_Failure(e))
+        return
+    await queue.put(done)
+
+
+async def _stop(pumps: List[asyncio.Task], iterators: List[Any]):
+    for pump in pumps:
+        pump.cancel()
+    await asyncio.gather(*pumps, return_exceptions=True)
+    for iterator in iterators:
+        await _aclose(iterator)
+
+
+async def _map(source, fn, concurrency: int, ordered: bool):
+    iterator = source.__aiter__()
+    try:
+        if concurrency > 1:
+            pool = BoundedTaskPool(limit=concurrency, ordered=ordered)
+            async with aclosing(pool.map(fn, iterator)) as results:
+                async for result in results:
+                    yield result
+        elif asyncio.iscoroutinefunction(fn):
+            async for item in iterator:
+                yield await fn(item)
+        else:
+            async for item in iterator:
+                yield fn(item)
+    finally:
+        await _aclose(iterator)
+
+
+async def _buffer(source, size: int):
+    iterator = source.__aiter__()
+    queue: asyncio.Queue = asyncio.Queue(size)
+    pump = asyncio.create_task(_pump(iterator, queue))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if type(item) is _Failure:
+                raise item.exc
+            yield item
+    finally:
+        await _stop([pump], [iterator])
+
+
+async def _batch(source, size: int, timeout: Optional[float]):
+    iterator = source.__aiter__()
+    queue: asyncio.Queue = asyncio.Queue(size)
+    pump = asyncio.create_task(_pump(iterator, queue))
+    loop = asyncio.get_running_loop()
+    batch: List[Any] = []
+    deadline = 0.0
+    try:
+        while True:
+            if batch and timeout is not None and queue.empty():
+                remaining = deadline - loop.time()
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    yield batch
+                    batch = []
+                    continue
+            else:
+                item = await queue.get()
+            if item is _DONE:
+                if batch:
+                    yield batch
+                return
+            if type(item) is _Failure:
+                raise item.exc
+            if not batch:
+                deadline = loop.time() + (timeout or 0.0)
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    finally:
+        await _stop([pump], [iterator])
+
+
+async def _throttle(source, rate: float, burst: int):
+    iterator = source.__aiter__()
+    loop = asyncio.get_running_loop()
+    tokens = float(burst)
+    last = loop.time()
+    try:
+        async for item in iterator:
+            now = loop.time()
+            tokens = min(burst, tokens + (now - last) * rate)
+            last = now
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / rate)
+                now = loop.time()
+                tokens = min(burst, tokens + (now - last) * rate)
+                last = now
+            tokens -= 1
+            yield item
+    finally:
+        await _aclose(iterator)
+
+
+async def _merge(sources, size: int):
+    iterators = [source.__aiter__() for source in sources]
+    queue: asyncio.Queue = asyncio.Queue(size)
+    pumps = [asyncio.create_task(_pump(iterator, queue)) for iterator in iterators]
+    remaining = len(pumps)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            if type(item) is _Failure:
+                raise item.exc
+            yield item
+    finally:
+        await _stop(pumps, iterators)
+
+
+async def _take(source, n: int):
+    iterator = source.__aiter__()
+    try:
+        if n <= 0:
+            return
+        count = 0
+        async for item in iterator:
+            yield item
+            count += 1
+            if count >= n:
+                return
+    finally:
+        await _aclose(iterator)
+
+
+class Stream:
+    """
+    비동기 이터러블(또는 일반 이터러블)을 감싸서 연산자를 체이닝
+
+    연산자는 새 Stream을 돌려주고, 실제 실행은 async for로 소비할 때 시작됩니다.
+    """
+
+    __slots__ = ("_source", "_iterator")
+
+    def __init__(self, source: Union[AsyncIterable[Any], Iterable[Any]]):
+        self._source = source if hasattr(source, "__aiter__") else _from_iterable(source)
+        self._iterator = None
+
+    def __aiter__(self):
+        if self._iterator is None:
+            self._iterator = self._source.__aiter__()
+        return self._iterator
+
+    async def aclose(self):
+        """소비를 중단하고 모든 단계 정리"""
+        await _aclose(self._iterator if self._iterator is not None else self._source)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def map(self, fn: Callable[[Any], Union[Any, Awaitable[Any]]], concurrency: int = 1,
+            ordered: bool = True) -> "Stream":
+        """concurrency > 1이면 fn은 코루틴 함수여야 함 (최대 concurrency개 동시 실행)"""
+        if concurrency < 1:
+            raise ValueError("concurrency는 1 이상이어야 합니다")
+        return Stream(_map(self._source, fn, concurrency, ordered))
+
+    def batch(self, size: int, timeout: Optional[float] = None) -> "Stream":
+        if size < 1:
+            raise ValueError("size는 1 이상이어야 합니다")
+        return Stream(_batch(self._source, size, timeout))
+
+    def throttle(self, rate: float, burst: int = 1) -> "Stream":
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate > 0, burst >= 1 이어야 합니다")
+        return Stream(_throttle(self._source, rate, burst))
+
+    def buffer(self, size: int) -> "Stream":
+        if size < 1:
+            raise ValueError("size는 1 이상이어야 합니다")
+        return Stream(_buffer(self._source, size))
+
+    def take(self, n: int) -> "Stream":
+        return Stream(_take(self._source, n))
+
+    def merge(self, *others: Union["Stream", AsyncIterable[Any]], buffer: int = 64) -> "Stream":
+        return Stream.merged(self, *others, buffer=buffer)
+
+    @staticmethod
+    def merged(*sources: Union["Stream", AsyncIterable[Any]], buffer: int = 64) -> "Stream":
+        """여러 스트림을 도착 순서대로 합침 (각 소스는 자기 펌프 태스크에서 읽힘)"""
+        sources = [s._source if isinstance(s, Stream) else s for s in sources]
+        return Stream(_merge(sources, buffer))
+
+    async def collect(self) -> List[Any]:
+        async with self:
+            return [item async for item in self]
+
+
+# ---------------------------------------------------------------------------
+# 데모 / 벤치마크
+# ---------------------------------------------------------------------------
+
+async def ticks(count: int, symbol: str = "BTC", interval: float = 0.0) -> AsyncIterator[tuple]:
+    """시세 피드 흉내 (symbol, seq, price)"""
+    for seq in range(count):
+        if interval:
+            await asyncio.sleep(interval)
+        yield (symbol, seq, 100.0 + (seq % 50) * 0.01)
+
+
+async def _enrich(tick: tuple) -> tuple:
+    await asyncio.sleep(0)
+    return tick + (tick[2] * 1.001,)
+
+
+async def _drain(stream) -> int:
+    """항목 수 (batch 결과는 안에 든 항목 수로 셈)"""
+    count = 0
+    async for item in stream:
+        count += len(item) if type(item) is list else 1
+    return count
+
+
+def operator_cases(n: int) -> Dict[str, Callable[[], AsyncIterable[Any]]]:
+    return {
+        "source only": lambda: Stream(ticks(n)),
+        "map (sync)": lambda: Stream(ticks(n)).map(lambda t: t[2]),
+        "map (async, c=16)": lambda: Stream(ticks(n)).map(_enrich, concurrency=16),
+        "batch(256, 10ms)": lambda: Stream(ticks(n)).batch(256, 0.01),
+        "buffer(256)": lambda: Stream(ticks(n)).buffer(256),
+        "merge(4 feeds)": lambda: Stream.merged(*[ticks(n // 4, s) for s in ("A", "B", "C", "D")]),
+        "throttle(1e9)": lambda: Stream(ticks(n)).throttle(1e9, burst=1000),
+    }
+
+
+async def operator_throughput(n: int) -> List[Dict]:
+    rows = []
+    for name, make in operator_cases(n).items():
+        start = time.perf_counter()
+        count = await _drain(make())
+        elapsed = time.perf_counter() - start
+        rows.append({"operator": name, "items": count, "items_per_sec": round(count / elapsed)})
+    return rows
+
+
+def _long_pipeline(n: int) -> Stream:
+    """시세 피드 → 8단계 변환 → 버퍼 → 배치 (버퍼/배치 크기만큼만 메모리에 머묾)"""
+    stream = Stream(ticks(n)).buffer(1024)
+    for i in range(8):
+        stream = stream.map(lambda t, i=i: t if i % 2 else (t[0], t[1], t[2] + 0.01))
+    return stream.map(_enrich, concurrency=32).buffer(1024).batch(500, 0.05)
+
+
+async def _list_pipeline(n: int) -> int:
+    """비교용: 단계마다 결과를 리스트로 모으는 방식"""
+    items = [tick async for tick in ticks(n)]
+    for i in range(8):
+        items = [t if i % 2 else (t[0], t[1], t[2] + 0.01) for t in items]
+    items = await asyncio.gather(*[_enrich(t) for t in items])
+    batches = [items[i:i + 500] for i in range(0, len(items), 500)]
+    return sum(len(b) for b in batches)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _pipeline_in_fresh_process(mode: str, n: int) -> Dict:
+    async def run():
+        if mode == "stream":
+            count = 0
+            async with _long_pipeline(n) as stream:
+                async for rows in stream:
+                    count += len(rows)
+            return count
+        return await _list_pipeline(n)
+
+    base = _peak_rss_mb()
+    start = time.perf_counter()
+    count = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return {"mode": mode, "items": count, "items_per_sec": round(count / elapsed),
+            "seconds": round(elapsed, 2), "peak_rss_delta_mb": round(_peak_rss_mb() - base, 1)}
+
+
+def pipeline_benchmark(sizes: List[int]) -> List[Dict]:
+    rows = []
+    for n in sizes:
+        for mode in ("stream", "list"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                rows.append({"n": n, **executor.submit(_pipeline_in_fresh_process, mode, n).result()})
+    return rows
+
+
+async def demo():
+    print("=== 시세 피드: 2개 병합 → 변환 → 초당 200개 제한 → 10개/50ms 배치 → 앞 3배치만 ===")
+    feed = Stream.merged(ticks(1000, "BTC", 0.001), ticks(1000, "ETH", 0.001))
+    stream = feed.map(_enrich, concurrency=4).throttle(200, burst=10).batch(10, 0.05).take(3)
+    start = time.perf_counter()
+    async with stream:
+        async for rows in stream:
+            symbols = "".join(row[0][0] for row in rows)
+            print(f"{time.perf_counter() - start:6.3f}s  배치 {len(rows)}개 ({symbols})")
+    leftover = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    print(f"take(3) 후 남은 태스크: {len(leftover)}개 (펌프/맵 태스크 모두 정리됨)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비동기 스트림 연산자 벤치마크")
+    parser.add_argument("--items", type=int, default=200_000, help="연산자별 처리량 측정 항목 수")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="긴 파이프라인 항목 수")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    asyncio.run(demo())
+
+    print(f"\n=== 연산자별 처리량 ({args.items:,}개) ===")
+    operators = asyncio.run(operator_throughput(args.items))
+    for row in operators:
+        print(f"{row['operator']:<20} {row['items_per_sec']:>12,} items/s")
+
+    print("\n=== 긴 파이프라인 (12단계): 스트림 vs 단계별 리스트 ===")
+    pipelines = pipeline_benchmark(args.sizes)
+    print(f"{'n':>10} {'mode':<7} {'items/s':>10} {'seconds':>8} {'peak_rss_mb':>12}")
+    print("-" * 52)
+    for row in pipelines:
+        print(f"{row['n']:>10,} {row['mode']:<7} {row['items_per_sec']:>10,} {row['seconds']:>8} "
+              f"{row['peak_rss_delta_mb']:>12}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"operators": operators, "pipelines": pipelines}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+동시성 벤치마크 하네스 - 실행 모델(순차/스레드/asyncio/프로세스)별 반복 측정
+
+cpupower.py의 CPUUtilizationAnalysis는 고정된 sleep 작업을 한 번 실행하고 CPU 사용률을
+8번 샘플링합니다. 이 하네스는 설정 가능한 작업(I/O 지연, 개수, CPU 비율)을 네 가지 전략으로
+워밍업 후 여러 번 실행하고, 코어별 CPU 사용률과 RSS를 샘플링해서
+벽시계 시간 p50/p95, CPU 효율을 JSON/CSV로 출력합니다.
+
+작업 단위 하나 = CPU 연산 (io_latency * cpu_fraction / (1 - cpu_fraction)초) + I/O 대기 (io_latency초)
+- sequential: 단위를 하나씩 실행
+- thread:     ThreadPoolExecutor(workers)
+- asyncio:    태스크 (동시 workers개), CPU 부분은 이벤트 루프를 막음
+- process:    ProcessPoolExecutor(workers)
+
+사용법:
+python concurrencybench.py --io-latency 0.05 --count 200 --cpu-fraction 0.2 --json bench.json
+python concurrencybench.py --cpu-fraction 0.8 --strategies thread process --csv bench.csv
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import psutil
+
+from stats_util import percentile
+
+STRATEGIES = ("sequential", "thread", "asyncio", "process")
+
+
+@dataclass
+class Workload:
+    io_latency: float = 0.05   # 단위당 I/O 대기 (초)
+    count: int = 100           # 작업 단위 수
+    cpu_fraction: float = 0.2  # 단위의 순차 실행 시간 중 CPU 연산 비율 (0 이상 1 미만)
+
+    @property
+    def cpu_seconds(self) -> float:
+        """단위당 CPU 연산 시간"""
+        return self.io_latency * self.cpu_fraction / (1 - self.cpu_fraction)
+
+
+def burn(iterations: int) -> int:
+    """순수 파이썬 CPU 연산"""
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+def calibrate(seconds: float = 0.2) -> float:
+    """burn의 초당 반복 횟수"""
+    iterations = 100_000
+    while True:
+        start = time.perf_counter()
+        burn(iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return iterations / elapsed
+        iterations *= 2
+
+
+def run_unit(iterations: int, io_latency: float) -> int:
+    """블로킹 작업 단위 (스레드/프로세스/순차용)"""
+    result = burn(iterations)
+    time.sleep(io_latency)
+    return result
+
+
+async def run_unit_async(iterations: int, io_latency: float) -> int:
+    result = burn(iterations)
+    await asyncio.sleep(io_latency)
+    return result
+
+
+class ResourceSampler:
+    """백그라운드 스레드에서 코어별 CPU 사용률과 (자식 포함) RSS를 주기적으로 샘플링"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.per_core: List[List[float]] = []
+        self.rss: List[int] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _total_rss(self) -> int:
+        rss = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+
+    def _run(self):
+        psutil.cpu_percent(percpu=True)  # 기준점 설정
+        while not self._stop.wait(self.interval):
+            self.per_core.append(psutil.cpu_percent(percpu=True))
+            self.rss.append(self._total_rss())
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        if not self.rss:
+            # 샘플 간격보다 짧게 끝난 실행도 한 번은 기록
+            self.per_core.append(psutil.cpu_percent(percpu=True))
+            self.rss.append(self._total_rss())
+
+
+def _cpu_times(process: psutil.Process) -> Dict[int, float]:
+    """자신과 자식 프로세스의 누적 CPU 시간 (pid → user+system 초)"""
+    times = {}
+    for proc in [process] + process.children(recursive=True):
+        try:
+            t = proc.cpu_times()
+            times[proc.pid] = t.user + t.system
+        except psutil.Error:
+            pass
+    return times
+
+
+class ConcurrencyBenchmark:
+    """전략별 실행기를 한 번 만들고 워밍업 + 반복 실행"""
+
+    def __init__(self, workload: Workload, workers: int = 32, process_workers: int = None,
+                 repeat: int = 5, warmup: int = 1, sample_interval: float = 0.1):
+        if not 0 <= workload.cpu_fraction < 1:
+            raise ValueError("cpu_fraction은 0 이상 1 미만이어야 합니다")
+        self.workload = workload
+        self.workers = workers
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.repeat = repeat
+        self.warmup = warmup
+        self.sample_interval = sample_interval
+        self.iterations_per_sec = calibrate()
+        self.iterations = int(self.iterations_per_sec * workload.cpu_seconds)
+
+    def _run_once(self, strategy: str, executor) -> None:
+        w = self.workload
+        args = [self.iterations] * w.count, [w.io_latency] * w.count
+        if strategy == "sequential":
+            for _ in range(w.count):
+                run_unit(self.iterations, w.io_latency)
+        elif strategy in ("thread", "process"):
+            list(executor.map(run_unit, *args))
+        elif strategy == "asyncio":
+            asyncio.run(self._run_async())
+        else:
+            raise ValueError(f"알 수 없는 전략: {strategy}")
+
+    async def _run_async(self):
+        sem = asyncio.Semaphore(self.workers)
+
+        async def limited():
+            async with sem:
+                return await run_unit_async(self.iterations, self.workload.io_latency)
+
+        await asyncio.gather(*[limited() for _ in range(self.workload.count)])
+
+    def _executor(self, strategy: str):
+        if strategy == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers)
+        if strategy == "process":
+            return ProcessPoolExecutor(max_workers=self.process_workers)
+        return None
+
+    def run(self, strategy: str) -> Dict:
+        executor = self._executor(strategy)
+        process = psutil.Process()
+        walls, consumed, core_means, peak_rss = [], [], [], 0
+        try:
+            for _ in range(self.warmup):
+                self._run_once(strategy, executor)
+            for _ in range(self.repeat):
+                before = _cpu_times(process)
+                with ResourceSampler(self.sample_interval) as sampler:
+                    start = time.perf_counter()
+                    self._run_once(strategy, executor)
+                    walls.append(time.perf_counter() - start)
+                after = _cpu_times(process)
+                consumed.append(sum(t - before.get(pid, 0.0) for pid, t in after.items()))
+                core_means.append([sum(c) / len(c) for c in zip(*sampler.per_core)])
+                peak_rss = max(peak_rss, max(sampler.rss))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        per_core = [round(sum(c) / len(c), 1) for c in zip(*core_means)]
+        useful = self.workload.count * self.workload.cpu_seconds
+        cpu_used = sum(consumed) / len(consumed)
+        return {
+            "strategy": strategy,
+            "workers": {"sequential": 1, "process": self.process_workers}.get(strategy, self.workers),
+            "runs": len(walls),
+            "wall_p50": round(percentile(walls, 50), 4),
+            "wall_p95": round(percentile(walls, 95), 4),
+            "wall_mean": round(sum(walls) / len(walls), 4),
+            "cpu_seconds": round(cpu_used, 4),
+            # 필요한 CPU 연산 시간 / 실제 소비한 CPU 시간 (1에 가까울수록 오버헤드 적음)
+            "cpu_efficiency": round(useful / cpu_used, 3) if cpu_used > 0 else 0.0,
+            "cpu_util_pct": round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+            "per_core_pct": per_core,
+            "peak_rss_mb": round(peak_rss / 1024 / 1024, 1),
+        }
+
+    def run_all(self, strategies=STRATEGIES) -> List[Dict]:
+        rows = [self.run(strategy) for strategy in strategies]
+        baseline = next((r["wall_p50"] for r in rows if r["strategy"] == "sequential"), None)
+        for row in rows:
+            row["speedup"] = round(baseline / row["wall_p50"], 2) if baseline else None
+        return rows
+
+
+_COLUMNS = ("strategy", "workers", "wall_p50", "wall_p95", "speedup",
+            "cpu_efficiency", "cpu_util_pct", "peak_rss_mb")
+
+
+def print_table(rows: List[Dict]):
+    print(f"{'strategy':<11} {'workers':>7} {'p50_s':>8} {'p95_s':>8} {'speedup':>8} "
+          f"{'cpu_eff':>8} {'cpu_%':>6} {'rss_mb':>7}")
+    print("-" * 70)
+    for r in rows:
+        speedup = "-" if r["speedup"] is None else r["speedup"]
+        print(f"{r['strategy']:<11} {r['workers']:>7} {r['wall_p50']:>8} {r['wall_p95']:>8} "
+              f"{speedup:>8} {r['cpu_efficiency']:>8} {r['cpu_util_pct']:>6} {r['peak_rss_mb']:>7}")
+
+
+def write_results(rows: List[Dict], workload: Workload, json_path: str = None, csv_path: str = None):
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"workload": asdict(workload), "cpu_count": os.cpu_count(), "rows": rows},
+                      f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {json_path}")
+    if csv_path:
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(asdict(workload)) + list(_COLUMNS) + ["wall_mean"])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({**asdict(workload), **{k: row[k] for k in _COLUMNS},
+                                 "wall_mean": row["wall_mean"]})
+        print(f"CSV 저장: {csv_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실행 모델별 동시성 벤치마크")
+    parser.add_argument("--io-latency", type=float, default=0.05, help="단위당 I/O 대기 (초)")
+    parser.add_argument("--count", type=int, default=100, help="작업 단위 수")
+    parser.add_argument("--cpu-fraction", type=float, default=0.2, help="단위당 CPU 연산 비율 (0~1 미만)")
+    parser.add_argument("--workers", type=int, default=32, help="스레드/asyncio 동시 실행 수")
+    parser.add_argument("--process-workers", type=int, help="프로세스 풀 크기 (기본: 코어 수)")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--sample-interval", type=float, default=0.1, help="CPU/RSS 샘플 간격 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    parser.add_argument("--csv", dest="csv_path", help="결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    workload = Workload(args.io_latency, args.count, args.cpu_fraction)
+    bench = ConcurrencyBenchmark(workload, workers=args.workers, process_workers=args.process_workers,
+                                 repeat=args.repeat,
+                                 warmup=args.warmup, sample_interval=args.sample_interval)
+    print("=== 동시성 벤치마크 ===")
+    print(f"작업: {workload.count}개 x (CPU {workload.cpu_seconds * 1000:.1f}ms + "
+          f"I/O {workload.io_latency * 1000:.1f}ms), 코어 {os.cpu_count()}개, "
+          f"워밍업 {args.warmup}회 + 측정 {args.repeat}회\n")
+
+    rows = bench.run_all(args.strategies)
+    print_table(rows)
+    write_results(rows, workload, args.json_path, args.csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -86,6 +86,15 @@ class CPUUtilizationAnalysis:
         
         return end - start, avg_cpu
 
+    def run_benchmark_harness(self, io_latency=0.05, count=100, cpu_fraction=0.2, repeat=5):
+        """같은 작업을 순차/스레드/asyncio/프로세스로 반복 측정 (concurrencybench.py)"""
+        from concurrencybench import ConcurrencyBenchmark, Workload, print_table
+
+        bench = ConcurrencyBenchmark(Workload(io_latency, count, cpu_fraction), repeat=repeat)
+        rows = bench.run_all()
+        print_table(rows)
+        return rows
+
 # 간단한 I/O vs CPU 비교 데모
 class SimpleComparison:
     
@@ -163,6 +172,17 @@ class WorkloadComparison:
         
         return sync_time
     
+    def cpu_bound_alternatives(self, n=1000000):
+        """CPU 집약적 작업의 대안 - 프로세스 풀 / NumPy 벡터화 (cpuscaling.py)"""
+        print("\n=== CPU 집약적 작업 대안 전략 ===")
+        from cpuscaling import print_scaling, scaling_report
+        
+        report = scaling_report(n, repeat=3, workers_list=[os.cpu_count() or 1])
+        print_scaling(report)
+        print("여러 코어를 쓰는 프로세스 풀이나 NumPy 벡터화가 실제로 빨라지는 방법")
+        
+        return report
+    
     async def io_bound_demo(self):
         """I/O 집약적 작업 - async 이점 큼"""
         print("\n=== I/O 집약적 작업 (async 이점 큼) ===")
@@ -218,6 +238,7 @@ async def run_workload_comparison():
     workload = WorkloadComparison()
     
     cpu_time = workload.cpu_bound_demo()
+    workload.cpu_bound_alternatives()
     io_time = await workload.io_bound_demo()
     
     print(f"\n=== 작업 유형별 비교 ===")
@@ -0,0 +1,227 @@
+"""
+CPU 집약적 작업의 대안 전략 - 프로세스 풀 청크 분할, NumPy 벡터화, 비동기 오프로드
+
+WorkloadComparison.cpu_bound_demo는 calculate_squares(1000000)을 순수 파이썬 루프로
+세 번 순차 실행하고, asyncbest.py의 correct_cpu_intensive는 기본 executor(스레드)로 넘길 뿐이라
+GIL 때문에 실제로 빨라지지 않습니다. 여기서는:
+- sum_squares_processes: 범위를 청크로 나눠 ProcessPoolExecutor로 여러 코어에서 계산
+- sum_squares_numpy: NumPy 벡터 연산 (청크 단위로 메모리 제한)
+- offload_sum_squares: 위 둘 중 하나를 이벤트 루프를 막지 않고 await
+- scaling_report: 워커 수별 속도 향상 + 계산 중 이벤트 루프 지연
+
+사용법:
+python cpuscaling.py                        # n=1000000 x 3회, 워커 1..코어 수
+python cpuscaling.py --n 20000000 --repeat 1 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_INT64_MAX = 2 ** 63 - 1
+
+
+def expected_sum_squares(n: int) -> int:
+    """0² + 1² + ... + (n-1)² (검증용 닫힌 식)"""
+    return (n - 1) * n * (2 * n - 1) // 6
+
+
+def sum_squares_range(start: int, stop: int) -> int:
+    """calculate_squares와 같은 순수 파이썬 루프 (프로세스 풀 워커에서 실행)"""
+    total = 0
+    for i in range(start, stop):
+        total += i * i
+    return total
+
+
+def chunk_ranges(n: int, chunks: int) -> List[tuple]:
+    size = -(-n // chunks)
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def sum_squares_processes(n: int, executor: ProcessPoolExecutor, chunks: int) -> int:
+    """범위를 chunks개로 나눠 프로세스 풀에서 계산 (워커에는 (start, stop)만 전달)"""
+    starts, stops = zip(*chunk_ranges(n, chunks))
+    return sum(executor.map(sum_squares_range, starts, stops))
+
+
+def sum_squares_numpy(n: int, chunk: int = 1 << 22) -> int:
+    """
+    NumPy 벡터화 버전 (n < 약 30억)
+
+    int64 합이 넘치지 않도록 청크 크기를 줄여가며 청크별 합을 파이썬 int로 더합니다.
+    """
+    if np is None:
+        raise ImportError("Missing required package: numpy (pip install numpy)")
+    total = 0
+    start = 0
+    while start < n:
+        stop = min(start + chunk, n)
+        limit = max(1, _INT64_MAX // max(stop - 1, 1) ** 2)
+        stop = min(stop, start + limit)
+        values = np.arange(start, stop, dtype=np.int64)
+        total += int(np.multiply(values, values).sum())
+        start = stop
+    return total
+
+
+async def offload_sum_squares(n: int, strategy: str = "process",
+                              executor: Optional[Executor] = None, chunks: int = 8) -> int:
+    """
+    이벤트 루프를 막지 않고 CPU 작업 실행
+
+    - "process": 청크를 프로세스 풀에 나눠 보내고 asyncio.gather로 대기
+      (executor는 ProcessPoolExecutor여야 하고, 없으면 이 호출 동안만 쓸 풀을 만듦)
+    - "numpy": 스레드에서 NumPy 실행 (NumPy 연산은 GIL을 놓으므로 루프가 계속 돔)
+    """
+    loop = asyncio.get_running_loop()
+    if strategy == "process":
+        if executor is not None and not isinstance(executor, ProcessPoolExecutor):
+            raise TypeError("process 전략에는 ProcessPoolExecutor가 필요합니다 (스레드는 GIL에 막힘)")
+        own = ProcessPoolExecutor(min(chunks, os.cpu_count() or 1)) if executor is None else None
+        try:
+            futures = [loop.run_in_executor(executor or own, sum_squares_range, start, stop)
+                       for start, stop in chunk_ranges(n, chunks)]
+            return sum(await asyncio.gather(*futures))
+        finally:
+            if own is not None:
+                await asyncio.to_thread(own.shutdown)
+    if strategy == "numpy":
+        return await loop.run_in_executor(executor, sum_squares_numpy, n)
+    raise ValueError(f"알 수 없는 전략: {strategy}")
+
+
+def _timed(fn, repeat: int) -> float:
+    """repeat회 중 최소 시간 (초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def measure_loop_lag(work, interval: float = 0.005) -> Dict:
+    """work()를 await하는 동안 heartbeat 지연 측정 (이벤트 루프가 막히는지 확인)"""
+    loop = asyncio.get_running_loop()
+    lags = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            before = loop.time()
+            await asyncio.sleep(interval)
+            lags.append(loop.time() - before - interval)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = loop.time()
+    try:
+        await work()
+    finally:
+        done.set()
+        await beat
+    return {"seconds": loop.time() - start, "max_lag_ms": round(max(lags, default=0.0) * 1000, 1),
+            "beats": len(lags)}
+
+
+def scaling_report(n: int, repeat: int, workers_list: List[int], chunks_per_worker: int = 4) -> Dict:
+    """순수 파이썬 대비 NumPy / 프로세스 풀(워커 수별) 속도 향상"""
+    expected = expected_sum_squares(n)
+    assert sum_squares_range(0, n) == expected
+
+    baseline = _timed(lambda: sum_squares_range(0, n), repeat)
+    rows = [{"strategy": "python_loop", "workers": 1, "seconds": baseline, "speedup": 1.0}]
+
+    if np is not None:
+        assert sum_squares_numpy(n) == expected
+        seconds = _timed(lambda: sum_squares_numpy(n), repeat)
+        rows.append({"strategy": "numpy", "workers": 1, "seconds": seconds,
+                     "speedup": baseline / seconds})
+
+    for workers in workers_list:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = workers * chunks_per_worker
+            list(executor.map(sum_squares_range, [0] * workers, [1] * workers))  # 워커 기동 (워밍업)
+            assert sum_squares_processes(n, executor, chunks) == expected
+            seconds = _timed(lambda: sum_squares_processes(n, executor, chunks), repeat)
+        rows.append({"strategy": "process_pool", "workers": workers, "seconds": seconds,
+                     "speedup": baseline / seconds})
+
+    for row in rows:
+        row["seconds"] = round(row["seconds"], 4)
+        row["speedup"] = round(row["speedup"], 2)
+    return {"n": n, "cpu_count": os.cpu_count(), "rows": rows}
+
+
+async def responsiveness_report(n: int) -> List[Dict]:
+    """같은 계산을 루프 안에서/스레드(기본 executor)/오프로드로 실행할 때 heartbeat 최대 지연"""
+    results = []
+
+    async def inline():
+        sum_squares_range(0, n)
+
+    async def default_executor():
+        await asyncio.get_running_loop().run_in_executor(None, sum_squares_range, 0, n)
+
+    cases = [("inline (async 함수 안 루프)", inline),
+             ("run_in_executor(None) 스레드", default_executor)]
+    with ProcessPoolExecutor() as processes, ThreadPoolExecutor(max_workers=1) as threads:
+        cases.append(("offload process", lambda: offload_sum_squares(n, "process", processes)))
+        if np is not None:
+            cases.append(("offload numpy", lambda: offload_sum_squares(n, "numpy", threads)))
+        for label, work in cases:
+            result = await measure_loop_lag(work)
+            results.append({"strategy": label, **result})
+    return results
+
+
+def print_scaling(report: Dict):
+    print(f"\n=== 속도 향상 (n={report['n']:,}, 코어 {report['cpu_count']}개) ===")
+    print(f"{'strategy':<14} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+    print("-" * 42)
+    for row in report["rows"]:
+        print(f"{row['strategy']:<14} {row['workers']:>7} {row['seconds']:>9} {row['speedup']:>7}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 집약적 작업 대안 전략 비교")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="프로세스 풀 워커 수 목록 (기본: 1, 2, 4, ... 코어 수)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    workers_list = args.workers or sorted({min(2 ** i, cpu_count) for i in range(cpu_count.bit_length() + 1)})
+    if np is None:
+        print("numpy가 설치되지 않아 벡터화 전략을 건너뜁니다. 설치: pip install numpy")
+
+    report = scaling_report(args.n, args.repeat, workers_list)
+    print_scaling(report)
+
+    print("\n=== 계산 중 이벤트 루프 반응성 (heartbeat 5ms) ===")
+    report["responsiveness"] = asyncio.run(responsiveness_report(args.n))
+    print(f"{'strategy':<30} {'seconds':>8} {'max_lag_ms':>11} {'beats':>6}")
+    print("-" * 58)
+    for row in report["responsiveness"]:
+        print(f"{row['strategy']:<30} {row['seconds']:>8.3f} {row['max_lag_ms']:>11} {row['beats']:>6}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
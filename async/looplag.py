@@ -0,0 +1,290 @@
+"""
+이벤트 루프 지연 모니터 + 블로킹 호출 탐지기
+
+예제 1의 time.sleep(1)처럼 코루틴 안에서 블로킹 호출을 하면 루프 전체가 멈춥니다.
+LoopMonitor는 운영 환경에 켜 두는 것을 전제로 만든 가벼운 계측 모듈입니다.
+- heartbeat 태스크: interval마다 깨어나서 "예정 시각 대비 늦게 깨어난 정도"(스케줄링 지연)를 기록
+- watchdog 스레드: heartbeat가 threshold 이상 멈추면 루프 스레드의 스택과
+  현재 실행 중인 태스크/코루틴 이름을 캡처 (정지 한 번에 한 번만)
+- stats(): 최근 window개 지연 샘플의 p50/p90/p99/max와 블로킹 이벤트 목록
+
+비용: 초당 1/interval번 깨어나는 태스크 하나 + 대부분 잠들어 있는 스레드 하나.
+스택은 실제로 멈췄을 때만 캡처합니다.
+
+사용법:
+    monitor = LoopMonitor(interval=0.1, threshold=0.1)
+    monitor.install()            # 실행 중인 루프 안에서 호출
+    ...
+    print(monitor.stats())
+    await monitor.uninstall()
+
+python looplag.py                # 블로킹 탐지 데모 + 오버헤드 측정
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from stats_util import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingEvent:
+    """루프가 threshold 이상 멈춘 한 번의 사건"""
+
+    __slots__ = ("started_at", "duration", "task_name", "coro_name", "stack")
+
+    def __init__(self, started_at: float, task_name: Optional[str], coro_name: Optional[str],
+                 stack: List[str]):
+        self.started_at = started_at
+        self.duration = 0.0  # 루프가 다시 돌아오면 채워짐
+        self.task_name = task_name
+        self.coro_name = coro_name
+        self.stack = stack
+
+    def to_dict(self) -> Dict:
+        return {
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 1),
+            "task": self.task_name,
+            "coroutine": self.coro_name,
+            "stack": self.stack,
+        }
+
+
+class LoopMonitor:
+    """
+    Args:
+        interval: heartbeat 주기 (초)
+        threshold: 블로킹으로 판단할 정지 시간 (초)
+        window: 백분위수 계산에 쓰는 최근 지연 샘플 수
+        max_events: 보관할 최근 블로킹 이벤트 수
+        stack_limit: 캡처할 스택 프레임 수 (안쪽부터)
+        on_block: 블로킹 이벤트가 생길 때 watchdog 스레드에서 호출할 콜백
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, window: int = 3000,
+                 max_events: int = 100, stack_limit: int = 15,
+                 on_block: Optional[Callable[[BlockingEvent], None]] = None):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self.on_block = on_block
+
+        self.lags: deque = deque(maxlen=window)
+        self.events: deque = deque(maxlen=max_events)
+        self.beats = 0
+        self.blocked_count = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._current_event: Optional[BlockingEvent] = None
+
+    # ------------------------------------------------------------------
+    # 설치 / 해제
+    # ------------------------------------------------------------------
+
+    def install(self) -> "LoopMonitor":
+        """실행 중인 루프에 heartbeat 태스크와 watchdog 스레드 설치"""
+        if self._heartbeat is not None:
+            raise RuntimeError("이미 설치되어 있습니다")
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-monitor-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    async def uninstall(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def __aenter__(self):
+        return self.install()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.uninstall()
+
+    # ------------------------------------------------------------------
+    # heartbeat (루프 스레드)
+    # ------------------------------------------------------------------
+
+    async def _beat(self):
+        loop = self._loop
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lags.append(lag)
+            self.beats += 1
+            self._last_beat = time.monotonic()
+            event = self._current_event
+            if event is not None:
+                # watchdog이 잡은 정지가 끝남 → 실제 지속 시간 기록
+                event.duration = lag
+                self._current_event = None
+
+    # ------------------------------------------------------------------
+    # watchdog (별도 스레드)
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        check = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled >= self.threshold and self._current_event is None:
+                self._capture(time.time() - stalled)
+
+    def _capture(self, started_at: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=self.stack_limit) if frame is not None else []
+        # 다른 스레드에서도 루프별 현재 태스크를 읽을 수 있음 (콜백이면 None)
+        task = asyncio.current_task(self._loop)
+        task_name = coro_name = None
+        if task is not None:
+            task_name = task.get_name()
+            coro = task.get_coro()
+            coro_name = getattr(coro, "__qualname__", repr(coro))
+
+        event = BlockingEvent(started_at, task_name, coro_name, [line.rstrip() for line in stack])
+        self._current_event = event
+        self.events.append(event)
+        self.blocked_count += 1
+
+        where = stack[-1].strip().splitlines()[0] if stack else "?"
+        logger.warning("이벤트 루프 블로킹 감지: task=%s coroutine=%s at %s", task_name, coro_name, where)
+        if self.on_block is not None:
+            try:
+                self.on_block(event)
+            except Exception:
+                logger.exception("on_block 콜백 오류")
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        lags = list(self.lags)
+        return {
+            "beats": self.beats,
+            "lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+            "lag_p90_ms": round(percentile(lags, 90) * 1000, 2),
+            "lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+            "lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+            "blocked_count": self.blocked_count,
+            "events": [event.to_dict() for event in self.events],
+        }
+
+    def prometheus(self, prefix: str = "asyncio_loop") -> str:
+        """Prometheus 텍스트 형식 (지연 백분위수 + 블로킹 횟수)"""
+        stats = self.stats()
+        lines = [f"# TYPE {prefix}_lag_seconds summary"]
+        for quantile, key in (("0.5", "lag_p50_ms"), ("0.9", "lag_p90_ms"), ("0.99", "lag_p99_ms")):
+            lines.append(f'{prefix}_lag_seconds{{quantile="{quantile}"}} {stats[key] / 1000:.6g}')
+        lines.append(f"# TYPE {prefix}_blocked_total counter")
+        lines.append(f"{prefix}_blocked_total {stats['blocked_count']}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# 데모 / 오버헤드 측정
+# ---------------------------------------------------------------------------
+
+async def blocking_handler():
+    """예제 1의 실수: 코루틴 안에서 time.sleep"""
+    await asyncio.sleep(0.05)
+    time.sleep(0.3)
+
+
+async def demo(interval: float, threshold: float) -> Dict:
+    print("=== 블로킹 호출 탐지 ===")
+    async with LoopMonitor(interval=interval, threshold=threshold) as monitor:
+        await asyncio.sleep(0.5)  # 정상 상태
+        await asyncio.create_task(blocking_handler(), name="request-42")
+        await asyncio.sleep(0.3)
+        stats = monitor.stats()
+
+    print(f"heartbeat {stats['beats']}회, 지연 p50 {stats['lag_p50_ms']}ms / "
+          f"p99 {stats['lag_p99_ms']}ms / 최대 {stats['lag_max_ms']}ms")
+    for event in stats["events"]:
+        print(f"\n블로킹 {event['duration_ms']}ms: task={event['task']}, coroutine={event['coroutine']}")
+        for line in event["stack"][-2:]:
+            print(f"  {line}")
+    print("\n" + monitor.prometheus())
+    return stats
+
+
+async def _workload(tasks: int, steps: int):
+    async def worker():
+        for _ in range(steps):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[worker() for _ in range(tasks)])
+
+
+async def overhead(tasks: int, steps: int, interval: float, repeat: int = 5) -> Dict:
+    """모니터 유무에 따른 같은 작업의 실행 시간 (최소값 비교)"""
+    async def timed():
+        start = time.perf_counter()
+        await _workload(tasks, steps)
+        return time.perf_counter() - start
+
+    plain, monitored = [], []
+    for _ in range(repeat):
+        plain.append(await timed())
+        async with LoopMonitor(interval=interval):
+            monitored.append(await timed())
+    base, with_monitor = min(plain), min(monitored)
+    return {
+        "switches": tasks * steps,
+        "plain_s": round(base, 4),
+        "monitored_s": round(with_monitor, 4),
+        "overhead_pct": round((with_monitor - base) / base * 100, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트 루프 지연 모니터 데모")
+    parser.add_argument("--interval", type=float, default=0.05, help="heartbeat 주기 (초)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="블로킹 판단 기준 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    stats = asyncio.run(demo(args.interval, args.threshold))
+
+    print("=== 오버헤드 (태스크 1000개 x 200회 컨텍스트 스위치) ===")
+    cost = asyncio.run(overhead(1000, 200, args.interval))
+    print(f"모니터 없음 {cost['plain_s']}초, 모니터 켬 {cost['monitored_s']}초 "
+          f"→ 오버헤드 {cost['overhead_pct']}%")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"demo": stats, "overhead": cost}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+우선순위 + 마감 시간을 아는 비동기 작업 스케줄러
+
+async/ 예제들은 모든 작업을 gather/create_task로 들어온 순서대로(FIFO) 실행합니다.
+운영에서는 지연에 민감한 요청이 대량 백그라운드 작업 뒤에 줄을 서게 됩니다.
+PriorityScheduler는:
+- 정해진 수의 워커 태스크만 작업을 실행 (동시 실행 수 제한)
+- 대기열은 (클래스 순위, 도착 순서) 힙 → 높은 클래스가 항상 먼저, 같은 클래스 안에서는 FIFO
+- 마감 시간이 지난 작업은 꺼낼 때 버리거나(shed → DeadlineExceeded) 가장 낮은 순위로 내림(demote).
+  shed 모드에서는 실행 중에 마감이 지나도 작업을 취소하고, 호출자가 future를 취소해도 실행 중인 작업을
+  취소해서 워커를 바로 비움
+- max_queue를 넘으면 새 작업을 거절 (SchedulerFull), close() 뒤의 제출도 거절 (SchedulerClosed)
+- 클래스별 대기시간/전체 지연 p50/p99와 완료/버림/내림 횟수 집계
+
+사용법:
+    async with PriorityScheduler(workers=8) as scheduler:
+        result = await scheduler.submit(handle, request, priority="high", timeout=0.5)
+
+python priorityscheduler.py                # 저우선순위 포화 부하 중 고우선순위 p99: FIFO vs 우선순위
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from stats_util import percentile
+
+DEFAULT_CLASSES = {"high": 0, "normal": 1, "low": 2}
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class SchedulerFull(Exception):
+    pass
+
+
+class SchedulerClosed(Exception):
+    pass
+
+
+async def _run_job(fn: Callable[..., Awaitable[Any]], args: tuple) -> Any:
+    return await fn(*args)
+
+
+class _Job:
+    __slots__ = ("fn", "args", "future", "klass", "enqueued", "deadline")
+
+    def __init__(self, fn, args, future, klass, enqueued, deadline):
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.klass = klass
+        self.enqueued = enqueued
+        self.deadline = deadline
+
+
+class _ClassStats:
+    __slots__ = ("submitted", "completed", "failed", "shed", "demoted", "rejected", "queue_times", "latencies")
+
+    def __init__(self, window: int):
+        self.submitted = self.completed = self.failed = 0
+        self.shed = self.demoted = self.rejected = 0
+        self.queue_times: deque = deque(maxlen=window)
+        self.latencies: deque = deque(maxlen=window)
+
+    def to_dict(self) -> Dict:
+        queue_times, latencies = list(self.queue_times), list(self.latencies)
+        return {
+            "submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+            "shed": self.shed, "demoted": self.demoted, "rejected": self.rejected,
+            "queue_p50_ms": round(percentile(queue_times, 50) * 1000, 2),
+            "queue_p99_ms": round(percentile(queue_times, 99) * 1000, 2),
+            "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+
+
+class PriorityScheduler:
+    """
+    Args:
+        workers: 동시에 실행할 작업 수 (워커 태스크 수)
+        classes: 클래스 이름 → 순위 (작을수록 먼저). 순위가 같으면 도착 순서대로
+        on_expired: 마감이 지난 작업 처리 - "shed"(버림) 또는 "demote"(가장 낮은 순위로 내림)
+        max_queue: 대기열 최대 길이 (None이면 제한 없음)
+        window: 백분위수 계산에 쓰는 클래스별 최근 샘플 수
+    """
+
+    def __init__(self, workers: int = 8, classes: Optional[Dict[str, int]] = None,
+                 on_expired: str = "shed", max_queue: Optional[int] = None, window: int = 10_000):
+        if on_expired not in ("shed", "demote"):
+            raise ValueError("on_expired는 'shed' 또는 'demote'여야 합니다")
+        self.workers = workers
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        self.on_expired = on_expired
+        self.max_queue = max_queue
+        self._demoted_rank = max(self.classes.values()) + 1
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._available: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+        self.stats_by_class = {name: _ClassStats(window) for name in self.classes}
+
+    # ------------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------------
+
+    def start(self) -> "PriorityScheduler":
+        if not self._tasks:
+            self._available = asyncio.Semaphore(len(self._heap))
+            self._tasks = [asyncio.create_task(self._worker(), name=f"scheduler-worker-{i}")
+                           for i in range(self.workers)]
+        return self
+
+    async def close(self, cancel_pending: bool = True):
+        """워커 종료. 대기 중인 작업의 future는 취소, 이후 submit은 SchedulerClosed"""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if cancel_pending:
+            for _, _, job in self._heap:
+                job.future.cancel()
+            self._heap.clear()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # 제출 / 실행
+    # ------------------------------------------------------------------
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args, priority: str = "normal",
+               timeout: Optional[float] = None, deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        fn(*args)를 대기열에 넣고 결과 future를 반환
+
+        timeout: 지금부터 이 시간 안에 시작하지 못하면 마감 (초, shed 모드에서는 끝내지 못해도 마감)
+        deadline: loop.time() 기준 절대 마감 시각 (timeout보다 우선)
+        """
+        if self._closed:
+            raise SchedulerClosed("종료된 스케줄러에는 작업을 넣을 수 없습니다")
+        stats = self.stats_by_class[priority]
+        stats.submitted += 1
+        if self.max_queue is not None and len(self._heap) >= self.max_queue:
+            stats.rejected += 1
+            raise SchedulerFull(f"대기열 {len(self._heap)}개 가득 참")
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if deadline is None and timeout is not None:
+            deadline = now + timeout
+        job = _Job(fn, args, loop.create_future(), priority, now, deadline)
+        heapq.heappush(self._heap, (self.classes[priority], next(self._seq), job))
+        if self._available is None:
+            self.start()
+        else:
+            self._available.release()
+        return job.future
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in self.classes}
+        for _, _, job in self._heap:
+            depth[job.klass] += 1
+        return depth
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._available.acquire()
+            _, _, job = heapq.heappop(self._heap)
+            if job.future.done():  # 호출자가 이미 취소
+                continue
+            stats = self.stats_by_class[job.klass]
+            now = loop.time()
+            if job.deadline is not None and now > job.deadline:
+                if self.on_expired == "shed":
+                    stats.shed += 1
+                    job.future.set_exception(DeadlineExceeded(
+                        f"{job.klass} 작업이 {(now - job.enqueued) * 1000:.0f}ms 대기 후 마감 초과"))
+                    continue
+                # 가장 낮은 순위로 내리고 다시 마감을 검사하지 않음
+                stats.demoted += 1
+                job.deadline = None
+                heapq.heappush(self._heap, (self._demoted_rank, next(self._seq), job))
+                self._available.release()
+                continue
+
+            stats.queue_times.append(now - job.enqueued)
+            task = loop.create_task(_run_job(job.fn, job.args))
+            # 호출자가 future를 취소하거나 실행 중에 마감이 지나면 작업 태스크를 취소해 워커를 바로 비움
+            job.future.add_done_callback(lambda _, task=task: task.cancel())
+            timer = None
+            if job.deadline is not None and self.on_expired == "shed":
+                timer = loop.call_at(job.deadline, self._expire, job)
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    job.future.cancel()
+                    raise  # 워커 자신이 취소됨 (close) - await 중인 작업 태스크도 함께 취소됨
+                if not job.future.done():
+                    # 작업 안에서 난 취소 (내부 태스크 취소 등) → 이 작업만 취소로 끝내고 워커는 계속
+                    stats.failed += 1
+                    job.future.cancel()
+                continue  # future가 먼저 끝났으면 호출자 취소 또는 실행 중 마감 초과
+            except Exception as e:
+                stats.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                continue
+            finally:
+                if timer is not None:
+                    timer.cancel()
+            stats.completed += 1
+            stats.latencies.append(loop.time() - job.enqueued)
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def _expire(self, job: _Job):
+        """shed 모드: 실행 중에 마감이 지남 → DeadlineExceeded (done 콜백이 작업 태스크를 취소)"""
+        if not job.future.done():
+            self.stats_by_class[job.klass].shed += 1
+            job.future.set_exception(DeadlineExceeded(f"{job.klass} 작업이 마감까지 끝나지 않음"))
+
+    def stats(self) -> Dict:
+        return {"workers": self.workers, "queued": len(self._heap), "by_class": {
+            name: s.to_dict() for name, s in self.stats_by_class.items()}}
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크: 저우선순위 포화 부하 + 고우선순위 요청
+# ---------------------------------------------------------------------------
+
+async def _work(seconds: float):
+    await asyncio.sleep(seconds)
+
+
+async def _run_mode(mode: str, workers: int, duration: float, bulk_rate: float, bulk_cost: float,
+                    high_rate: float, high_cost: float, bulk_deadline: float) -> Dict:
+    classes = {"high": 0, "low": 0} if mode == "fifo" else {"high": 0, "low": 1}
+    scheduler = PriorityScheduler(workers=workers, classes=classes, on_expired="shed").start()
+    timeout = bulk_deadline if mode == "priority+deadline" else None
+    futures = []
+
+    async def feed(priority: str, rate: float, cost: float, timeout: Optional[float]):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sent = 0
+        while loop.time() - start < duration:
+            # 일정한 도착률 유지 (밀린 만큼 한 번에 보냄)
+            due = int((loop.time() - start) * rate) + 1
+            for _ in range(due - sent):
+                futures.append(scheduler.submit(_work, cost, priority=priority, timeout=timeout))
+            sent = due
+            await asyncio.sleep(0.002)
+
+    await asyncio.gather(feed("low", bulk_rate, bulk_cost, timeout),
+                         feed("high", high_rate, high_cost, None))
+    stats = scheduler.stats()
+    backlog = stats["queued"]
+    await scheduler.close()
+    for future in futures:  # 종료 시 취소/버림된 결과 회수
+        if future.done() and not future.cancelled():
+            future.exception()
+    return {"mode": mode, "backlog_at_end": backlog, **{
+        f"{name}_{key}": value for name, s in stats["by_class"].items()
+        for key, value in s.items() if key in ("completed", "shed", "queue_p99_ms", "latency_p50_ms", "latency_p99_ms")}}
+
+
+async def benchmark(workers: int, duration: float, bulk_rate: float, bulk_cost: float,
+                    high_rate: float, high_cost: float, bulk_deadline: float) -> List[Dict]:
+    rows = []
+    for mode in ("fifo", "priority", "priority+deadline"):
+        rows.append(await _run_mode(mode, workers, duration, bulk_rate, bulk_cost,
+                                    high_rate, high_cost, bulk_deadline))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="우선순위/마감 스케줄러 벤치마크")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=3.0, help="부하 시간 (초)")
+    parser.add_argument("--bulk-rate", type=float, default=1200, help="저우선순위 작업 도착률 (초당)")
+    parser.add_argument("--bulk-cost", type=float, default=0.01, help="저우선순위 작업 시간 (초)")
+    parser.add_argument("--high-rate", type=float, default=50, help="고우선순위 요청 도착률 (초당)")
+    parser.add_argument("--high-cost", type=float, default=0.005, help="고우선순위 작업 시간 (초)")
+    parser.add_argument("--bulk-deadline", type=float, default=0.5, help="저우선순위 마감 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    capacity = args.workers / args.bulk_cost
+    print(f"=== 워커 {args.workers}개 (저우선순위 처리 용량 ~{capacity:.0f}/s), 저우선순위 {args.bulk_rate:.0f}/s "
+          f"+ 고우선순위 {args.high_rate:.0f}/s, {args.duration}초 ===")
+    rows = asyncio.run(benchmark(args.workers, args.duration, args.bulk_rate, args.bulk_cost,
+                                 args.high_rate, args.high_cost, args.bulk_deadline))
+    print(f"{'mode':<18} {'high_p50':>9} {'high_p99':>9} {'high_q_p99':>11} {'low_done':>9} "
+          f"{'low_shed':>9} {'low_p99':>9} {'backlog':>8}")
+    print("-" * 90)
+    for row in rows:
+        print(f"{row['mode']:<18} {row['high_latency_p50_ms']:>9} {row['high_latency_p99_ms']:>9} "
+              f"{row['high_queue_p99_ms']:>11} {row['low_completed']:>9} {row['low_shed']:>9} "
+              f"{row['low_latency_p99_ms']:>9} {row['backlog_at_end']:>8}")
+    print("(시간 단위 ms, backlog = 부하 종료 시 대기열에 남은 작업 수)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+여러 노드에 동시 요청 + 쿼럼 조기 반환 (asyncbest.py의 BlockchainAsyncUsage)
+
+블록체인 클라이언트는 같은 조회(블록 해시, 잔액 등)를 여러 노드에 보내고
+일치하는 응답이 충분히 모이면 바로 사용합니다. 전부 기다리면 가장 느린 노드가 지연을 결정합니다.
+- SimulatedNode: 지연(로그정규 분포 + 가끔 긴 꼬리), 실패율, 오래된 응답(stale) 비율이 다른 가상 노드
+- QuorumClient.request: 같은 요청을 여러 노드에 보내고 같은 응답이 quorum개 모이면 반환,
+  남은 요청은 취소. 실패/불일치로 쿼럼이 불가능해지면 예비 노드로 추가 요청
+- 노드별 지연 EWMA + 실패율로 점수를 매겨 빠른 노드를 먼저 고름 (fanout < 노드 수일 때)
+- 예상 지연의 hedge_factor배가 지나도 쿼럼이 안 되면 예비 노드에 헤지 요청 (꼬리 지연 감소)
+
+사용법:
+python quorumclient.py                             # 노드 7개, 쿼럼 3, 요청 300건 벤치마크
+python quorumclient.py --requests 1000 --quorum 4 --json quorum.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from stats_util import percentile
+
+
+class NodeError(Exception):
+    pass
+
+
+class QuorumError(Exception):
+    pass
+
+
+def block_hash(height: int) -> str:
+    return hashlib.sha256(f"block-{height}".encode()).hexdigest()[:16]
+
+
+class SimulatedNode:
+    """
+    Args:
+        latency: 중앙값 지연 (초)
+        sigma: 로그정규 분포 폭
+        tail_rate / tail_factor: tail_rate 확률로 지연이 tail_factor배 (GC, 네트워크 재전송 등)
+        failure_rate: 오류 응답 확률
+        stale_rate: 한 블록 뒤처진 응답을 돌려줄 확률
+    """
+
+    def __init__(self, name: str, latency: float, sigma: float = 0.3, tail_rate: float = 0.02,
+                 tail_factor: float = 10.0, failure_rate: float = 0.0, stale_rate: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.latency = latency
+        self.sigma = sigma
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self.failure_rate = failure_rate
+        self.stale_rate = stale_rate
+        self.rng = rng or random.Random()
+        self.calls = 0
+
+    async def get_block_hash(self, height: int) -> str:
+        self.calls += 1
+        delay = self.latency * math.exp(self.rng.gauss(0, self.sigma))
+        if self.rng.random() < self.tail_rate:
+            delay *= self.tail_factor
+        await asyncio.sleep(delay)
+        if self.rng.random() < self.failure_rate:
+            raise NodeError(f"{self.name}: 내부 오류")
+        if self.rng.random() < self.stale_rate:
+            return block_hash(height - 1)
+        return block_hash(height)
+
+
+@dataclass
+class NodeStats:
+    ewma_latency: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    disagreed: int = 0  # 성공했지만 쿼럼 결과와 다른 값 (오래된 상태 등)
+    cancelled: int = 0
+
+    def score(self) -> float:
+        """낮을수록 좋음: 지연 EWMA에 실패/불일치 비율 가중"""
+        total = self.successes + self.failures
+        bad_rate = (self.failures + self.disagreed) / total if total else 0.0
+        return self.ewma_latency * (1 + 4 * bad_rate)
+
+
+class QuorumClient:
+    """
+    Args:
+        nodes: 요청을 보낼 노드 목록 (awaitable 메서드를 가진 객체)
+        quorum: 같은 응답이 이만큼 모이면 반환
+        fanout: 처음 보낼 노드 수 (None이면 전부). 점수가 좋은 노드부터 고름
+        timeout: 요청 전체 제한 시간 (초)
+        alpha: 지연 EWMA 가중치
+        hedge_factor: 고른 노드 중 quorum번째로 빠른 노드 EWMA의 이 배수만큼 지나도
+            쿼럼이 안 되면 예비 노드에 추가 요청 (None이면 헤지하지 않음)
+        explore: 요청마다 이 확률로 마지막 자리를 순위 밖 노드에 줘서 추정치를 갱신
+    """
+
+    def __init__(self, nodes: List[SimulatedNode], quorum: int, fanout: Optional[int] = None,
+                 timeout: float = 5.0, alpha: float = 0.2, hedge_factor: Optional[float] = 2.0,
+                 explore: float = 0.05, rng: Optional[random.Random] = None):
+        if not 1 <= quorum <= len(nodes):
+            raise ValueError("quorum은 1 이상 노드 수 이하여야 합니다")
+        self.nodes = nodes
+        self.quorum = quorum
+        self.fanout = min(fanout or len(nodes), len(nodes))
+        self.timeout = timeout
+        self.alpha = alpha
+        self.hedge_factor = hedge_factor
+        self.explore = explore
+        self.rng = rng or random.Random()
+        self.stats: Dict[str, NodeStats] = {node.name: NodeStats() for node in nodes}
+
+    def ranked_nodes(self) -> List[SimulatedNode]:
+        """아직 측정하지 않은 노드(EWMA 0)는 먼저 시도되도록 앞에 옴"""
+        return sorted(self.nodes, key=lambda node: self.stats[node.name].score())
+
+    def _select(self):
+        """(처음 보낼 노드, 예비 노드) - 점수순, 가끔 순위 밖 노드 하나를 섞음"""
+        ranked = self.ranked_nodes()
+        chosen, spare = ranked[:self.fanout], ranked[self.fanout:]
+        if spare and self.rng.random() < self.explore:
+            picked = spare.pop(self.rng.randrange(len(spare)))
+            spare.insert(0, chosen.pop())
+            chosen.append(picked)
+        return chosen, spare
+
+    def _hedge_delay(self, chosen: List[SimulatedNode]) -> Optional[float]:
+        if self.hedge_factor is None:
+            return None
+        estimates = sorted(self.stats[node.name].ewma_latency for node in chosen)
+        estimate = estimates[min(self.quorum, len(estimates)) - 1]
+        return estimate * self.hedge_factor if estimate > 0 else None
+
+    def _record(self, name: str, latency: float, ok: bool):
+        stats = self.stats[name]
+        stats.ewma_latency = latency if stats.ewma_latency == 0 else \
+            (1 - self.alpha) * stats.ewma_latency + self.alpha * latency
+        if ok:
+            stats.successes += 1
+        else:
+            stats.failures += 1
+
+    async def _call(self, node: SimulatedNode, method: str, args: tuple):
+        start = time.perf_counter()
+        try:
+            result = await getattr(node, method)(*args)
+        except asyncio.CancelledError:
+            # 취소된 요청은 최소 이만큼 걸린다는 정보만 있음 → 기존 추정치보다 낮추지 않음
+            stats = self.stats[node.name]
+            stats.cancelled += 1
+            elapsed = time.perf_counter() - start
+            if elapsed > stats.ewma_latency:
+                self._record(node.name, elapsed, ok=True)
+                stats.successes -= 1
+            raise
+        except Exception:
+            self._record(node.name, time.perf_counter() - start, ok=False)
+            raise
+        self._record(node.name, time.perf_counter() - start, ok=True)
+        return result
+
+    async def request(self, method: str, *args):
+        """같은 응답 quorum개가 모이면 그 값을 반환하고 나머지 요청은 취소"""
+        chosen, spare = self._select()
+        hedge_delay = self._hedge_delay(chosen)
+        owners = {}  # 태스크 → 노드 이름
+
+        def launch(node):
+            task = asyncio.create_task(self._call(node, method, args))
+            owners[task] = node.name
+            pending.add(task)
+
+        pending = set()
+        for node in chosen:
+            launch(node)
+        answers: Dict[str, str] = {}
+        votes: Counter = Counter()
+        failed = 0
+        now = time.monotonic()
+        deadline = now + self.timeout
+        hedge_at = now + hedge_delay if hedge_delay is not None else None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise QuorumError(f"시간 초과: 응답 {dict(votes)}, 실패 {failed}")
+                wake = deadline if hedge_at is None or not spare else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wake - now),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                # done의 태스크를 모두 확인한 뒤 반환 (실패한 태스크 예외도 회수)
+                winner = None
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        failed += 1
+                        continue
+                    value = task.result()
+                    answers[owners[task]] = value
+                    votes[value] += 1
+                    if winner is None and votes[value] >= self.quorum:
+                        winner = value
+                if winner is not None:
+                    for name, answer in answers.items():
+                        if answer != winner:
+                            self.stats[name].disagreed += 1
+                    return winner
+                # 남은 요청이 모두 같은 값에 투표해도 쿼럼이 안 되면 예비 노드 추가
+                best = max(votes.values(), default=0)
+                while spare and best + len(pending) < self.quorum:
+                    launch(spare.pop(0))
+                # 예상보다 늦어지면 예비 노드 하나에 헤지 요청
+                if not done and spare and hedge_at is not None and time.monotonic() >= hedge_at:
+                    launch(spare.pop(0))
+                    hedge_at += hedge_delay
+            raise QuorumError(f"쿼럼 실패: 응답 {dict(votes)}, 실패 {failed}")
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                for task in pending:
+                    if not task.cancelled():
+                        task.exception()  # 취소되기 전에 끝난 요청의 예외 회수
+
+    async def request_all(self, method: str, *args):
+        """비교 기준: 모든 노드 응답을 기다린 뒤 다수결"""
+        results = await asyncio.gather(*[self._call(node, method, args) for node in self.nodes],
+                                       return_exceptions=True)
+        votes = Counter(r for r in results if not isinstance(r, BaseException))
+        if not votes:
+            raise QuorumError("모든 노드 실패")
+        value, count = votes.most_common(1)[0]
+        if count < self.quorum:
+            raise QuorumError(f"쿼럼 실패: 응답 {dict(votes)}")
+        return value
+
+
+# ---------------------------------------------------------------------------
+# 데모 / 벤치마크
+# ---------------------------------------------------------------------------
+
+def make_nodes(seed: int = 42) -> List[SimulatedNode]:
+    """빠른 노드, 보통 노드, 느린 노드, 불안정한 노드, 뒤처진 노드가 섞인 7개"""
+    rng = random.Random(seed)
+    specs = [
+        ("fast-1", 0.010, 0.0, 0.0),
+        ("fast-2", 0.012, 0.0, 0.0),
+        ("mid-1", 0.030, 0.0, 0.0),
+        ("mid-2", 0.040, 0.02, 0.0),
+        ("slow", 0.150, 0.0, 0.0),
+        ("flaky", 0.020, 0.30, 0.0),
+        ("lagging", 0.015, 0.0, 0.50),
+    ]
+    return [SimulatedNode(name, latency, failure_rate=failure, stale_rate=stale, rng=rng)
+            for name, latency, failure, stale in specs]
+
+
+async def run_mode(mode: str, quorum: int, requests: int, concurrency: int, seed: int) -> Dict:
+    nodes = make_nodes(seed)
+    fanout = {"quorum_all": None, "quorum_ranked": quorum + 1, "wait_all": None}[mode]
+    client = QuorumClient(nodes, quorum=quorum, fanout=fanout, rng=random.Random(seed))
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = wrong = 0
+
+    async def one(height: int):
+        nonlocal errors, wrong
+        async with sem:
+            start = time.perf_counter()
+            try:
+                if mode == "wait_all":
+                    value = await client.request_all("get_block_hash", height)
+                else:
+                    value = await client.request("get_block_hash", height)
+            except QuorumError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            if value != block_hash(height):
+                wrong += 1
+
+    begin = time.perf_counter()
+    await asyncio.gather(*[one(1000 + i) for i in range(requests)])
+    elapsed = time.perf_counter() - begin
+    return {
+        "mode": mode,
+        "fanout": client.fanout,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "node_calls": sum(node.calls for node in nodes),
+        "errors": errors,
+        "wrong": wrong,
+        "node_stats": {name: {"ewma_ms": round(s.ewma_latency * 1000, 1), "ok": s.successes,
+                              "failed": s.failures, "disagreed": s.disagreed, "cancelled": s.cancelled}
+                       for name, s in client.stats.items()},
+    }
+
+
+class BlockchainAsyncUsage:
+    """asyncbest.py demonstrate_all에서 사용하는 노드 병렬 통신 데모"""
+
+    def __init__(self, quorum: int = 3, seed: int = 42):
+        self.quorum = quorum
+        self.seed = seed
+
+    async def parallel_node_communication(self, heights: int = 5) -> List[str]:
+        client = QuorumClient(make_nodes(self.seed), quorum=self.quorum)
+        hashes = []
+        for height in range(100, 100 + heights):
+            start = time.perf_counter()
+            value = await client.request("get_block_hash", height)
+            hashes.append(value)
+            print(f"블록 {height}: {value} ({(time.perf_counter() - start) * 1000:.1f}ms, 쿼럼 {self.quorum})")
+        ranked = ", ".join(node.name for node in client.ranked_nodes())
+        print(f"노드 순위 (빠른 순): {ranked}")
+        return hashes
+
+
+async def benchmark(quorum: int, requests: int, concurrency: int, seed: int) -> List[Dict]:
+    rows = []
+    for mode in ("wait_all", "quorum_all", "quorum_ranked"):
+        rows.append(await run_mode(mode, quorum, requests, concurrency, seed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="쿼럼 조기 반환 vs 전체 대기 벤치마크")
+    parser.add_argument("--quorum", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("=== 블록 해시 조회 데모 ===")
+    asyncio.run(BlockchainAsyncUsage(args.quorum, args.seed).parallel_node_communication())
+
+    print(f"\n=== 노드 7개, 쿼럼 {args.quorum}, 요청 {args.requests}건 (동시 {args.concurrency}) ===")
+    rows = asyncio.run(benchmark(args.quorum, args.requests, args.concurrency, args.seed))
+    print(f"{'mode':<14} {'fanout':>6} {'p50_ms':>8} {'p99_ms':>8} {'req/s':>8} {'calls':>7} {'errors':>7} {'wrong':>6}")
+    print("-" * 70)
+    for row in rows:
+        print(f"{row['mode']:<14} {row['fanout']:>6} {row['p50_ms']:>8} {row['p99_ms']:>8} "
+              f"{row['req_per_sec']:>8} {row['node_calls']:>7} {row['errors']:>7} {row['wrong']:>6}")
+
+    ranked = rows[-1]["node_stats"]
+    print("\n노드별 통계 (quorum_ranked):")
+    for name, s in ranked.items():
+        print(f"  {name:<8} ewma {s['ewma_ms']:>6}ms  ok {s['ok']:>4}  failed {s['failed']:>3}  "
+              f"disagreed {s['disagreed']:>3}  cancelled {s['cancelled']:>4}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+스레드 vs 코루틴 - 메모리와 확장성 측정 (asyncbest.py의 ResourceEfficiency)
+
+"I/O 대기는 async로"라는 규칙에 숫자를 붙이기 위한 측정입니다.
+N개(100 ~ 100,000)의 I/O 대기자를 OS 스레드와 asyncio 태스크로 각각 띄우고:
+- create_s / rss_mb / kb_per_waiter: 전부 대기 상태가 될 때까지의 생성 시간과 RSS 증가량
+- wakeup_per_sec: 이벤트 한 번으로 N개를 깨워서 모두 끝날 때까지의 처리량
+- switches_per_sec: N개 작업자가 번갈아 양보(time.sleep(0) / asyncio.sleep(0))하는 스케줄링 처리량
+
+(모드, N) 조합마다 새 프로세스에서 측정해서 RSS가 서로 섞이지 않게 합니다.
+스레드는 OS 한도(ulimit -u, threads-max, 메모리)에 걸리면 거기서 멈추고 limit_reached로 표시합니다.
+
+사용법:
+python resourceefficiency.py                                # N = 100, 1k, 10k, 100k
+python resourceefficiency.py --sizes 100 1000 --json resource.json
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List
+
+import psutil
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+SWITCH_BUDGET = 200_000  # 모드/크기마다 전체 양보 횟수를 비슷하게 맞춤
+
+
+def _rss() -> int:
+    return psutil.Process().memory_info().rss
+
+
+def measure_threads(n: int, switch_budget: int = SWITCH_BUDGET) -> Dict:
+    """스레드 n개: threading.Event를 기다리는 I/O 대기자"""
+    event = threading.Event()
+    threads: List[threading.Thread] = []
+    error = None
+    base = _rss()
+    start = time.perf_counter()
+    try:
+        for _ in range(n):
+            thread = threading.Thread(target=event.wait, daemon=True)
+            thread.start()
+            threads.append(thread)
+    except (RuntimeError, MemoryError) as e:  # can't start new thread
+        error = f"{type(e).__name__}: {e}"
+    created = time.perf_counter() - start
+    rss = _rss() - base
+
+    start = time.perf_counter()
+    event.set()
+    for thread in threads:
+        thread.join()
+    wakeup = time.perf_counter() - start
+
+    row = _row("threads", n, len(threads), created, rss, wakeup, error)
+    if error is None:
+        row["switches_per_sec"] = _thread_switches(n, max(1, switch_budget // n))
+    return row
+
+
+def _thread_switches(n: int, steps: int) -> int:
+    barrier = threading.Barrier(n + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(steps):
+            time.sleep(0)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return round(n * steps / (time.perf_counter() - start))
+
+
+async def measure_tasks(n: int, switch_budget: int = SWITCH_BUDGET) -> Dict:
+    """asyncio 태스크 n개: asyncio.Event를 기다리는 I/O 대기자"""
+    event = asyncio.Event()
+    base = _rss()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(event.wait()) for _ in range(n)]
+    await asyncio.sleep(0)  # 모두 첫 await까지 실행되어 대기 상태가 됨
+    created = time.perf_counter() - start
+    rss = _rss() - base
+
+    start = time.perf_counter()
+    event.set()
+    await asyncio.gather(*tasks)
+    wakeup = time.perf_counter() - start
+
+    row = _row("asyncio", n, n, created, rss, wakeup, None)
+    steps = max(1, switch_budget // n)
+
+    async def worker():
+        for _ in range(steps):
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(n)])
+    row["switches_per_sec"] = round(n * steps / (time.perf_counter() - start))
+    return row
+
+
+def _row(mode: str, n: int, started: int, created: float, rss: int, wakeup: float, error) -> Dict:
+    return {
+        "mode": mode,
+        "n": n,
+        "started": started,
+        "create_s": round(created, 4),
+        "rss_mb": round(rss / 1024 / 1024, 1),
+        "kb_per_waiter": round(rss / 1024 / max(started, 1), 2),
+        "wakeup_per_sec": round(started / wakeup) if wakeup > 0 else None,
+        "switches_per_sec": None,
+        "limit_reached": error,
+    }
+
+
+def _measure_in_process(mode: str, n: int) -> Dict:
+    if mode == "threads":
+        return measure_threads(n)
+    return asyncio.run(measure_tasks(n))
+
+
+class ResourceEfficiency:
+    """스레드 vs asyncio 태스크 자원 사용량 비교"""
+
+    def __init__(self, sizes: List[int] = None):
+        self.sizes = sizes or DEFAULT_SIZES
+        self.results: List[Dict] = []
+
+    def measure(self, mode: str, n: int) -> Dict:
+        """새 프로세스에서 (mode, n) 한 번 측정"""
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            return executor.submit(_measure_in_process, mode, n).result()
+
+    def compare_memory_usage(self, sizes: List[int] = None) -> List[Dict]:
+        """N별로 스레드와 태스크를 번갈아 측정해서 표로 출력"""
+        print(f"{'mode':<8} {'n':>8} {'started':>8} {'create_s':>9} {'rss_mb':>8} {'kb/waiter':>10} "
+              f"{'wakeup/s':>10} {'switch/s':>10}")
+        print("-" * 78)
+        rows = []
+        for n in sizes or self.sizes:
+            for mode in ("threads", "asyncio"):
+                row = self.measure(mode, n)
+                rows.append(row)
+                print(f"{row['mode']:<8} {n:>8,} {row['started']:>8,} {row['create_s']:>9} {row['rss_mb']:>8} "
+                      f"{row['kb_per_waiter']:>10} {row['wakeup_per_sec'] or '-':>10} "
+                      f"{row['switches_per_sec'] or '-':>10}")
+                if row["limit_reached"]:
+                    print(f"         ⚠️ 스레드 {row['started']:,}개에서 한도 도달: {row['limit_reached']}")
+        self.results = rows
+        return rows
+
+    async def demonstrate_scalability(self, n: int = 10_000, io_latency: float = 0.1) -> Dict:
+        """같은 I/O 대기 n건을 태스크와 스레드로 처리한 경과 시간 (이벤트 루프 안에서 실행)"""
+        start = time.perf_counter()
+        await asyncio.gather(*[asyncio.sleep(io_latency) for _ in range(n)])
+        task_seconds = time.perf_counter() - start
+
+        def run_threads():
+            threads = [threading.Thread(target=time.sleep, args=(io_latency,)) for _ in range(n)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return time.perf_counter() - started
+
+        try:
+            thread_seconds = await asyncio.to_thread(run_threads)
+        except RuntimeError as e:
+            thread_seconds = None
+            print(f"스레드 {n:,}개 생성 실패: {e}")
+
+        result = {"n": n, "io_latency": io_latency, "asyncio_s": round(task_seconds, 3),
+                  "threads_s": round(thread_seconds, 3) if thread_seconds is not None else None}
+        print(f"I/O 대기 {n:,}건 ({io_latency}초씩): asyncio {result['asyncio_s']}초, "
+              f"스레드 {result['threads_s'] if thread_seconds is not None else '실패'}초")
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스레드 vs 코루틴 메모리/확장성 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--scalability-n", type=int, default=10_000)
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    demo = ResourceEfficiency(args.sizes)
+    print(f"=== I/O 대기자 N개: 스레드 vs asyncio 태스크 (CPU {psutil.cpu_count()}개, "
+          f"메모리 {psutil.virtual_memory().total / 1024 ** 3:.1f}GB) ===")
+    rows = demo.compare_memory_usage()
+
+    print("\n=== 확장성: 같은 I/O 대기를 동시에 처리 ===")
+    scalability = asyncio.run(demo.demonstrate_scalability(args.scalability_n))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": rows, "scalability": scalability}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+비동기 리소스 풀 (async.py의 AsyncResource 패턴 재사용)
+
+예제 8의 AsyncResource는 async with 할 때마다 연결 0.5초 + 정리 0.5초를 씁니다.
+실제 DB/RPC 클라이언트도 같아서 요청마다 연결하면 연결 비용이 지연과 서버 연결 수를 지배합니다.
+ResourcePool은 만든 리소스를 재사용합니다.
+- min_size / max_size: 미리 만들어 둘 개수(pre-warm)와 최대 개수
+- idle_timeout: min_size를 넘는 유휴 리소스는 이 시간이 지나면 정리
+- health_check: 꺼낼 때 검사해서 실패하면 버리고 다른 리소스 사용
+- acquire_timeout: 이 시간 안에 못 얻으면 AcquireTimeout
+- 공정한 FIFO 대기: 반납된 리소스는 대기 중인 첫 번째 요청에 바로 넘김 (새치기 없음)
+- stats(): 획득 대기시간 p50/p99, 사용률(시간 가중 사용 중 개수 / max_size), 생성/폐기 횟수
+
+async with 형태의 리소스(AsyncResource 등)는 ResourcePool.from_context_manager로 감쌀 수 있습니다.
+
+사용법:
+    async with ResourcePool(connect, close=disconnect, min_size=2, max_size=10) as pool:
+        async with pool.connection() as conn:
+            ...
+
+python resourcepool.py                     # AsyncResource 데모 + 요청마다 연결 vs 풀 벤치마크
+python resourcepool.py --requests 5000 --concurrency 100 500 --json pool.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from stats_util import percentile
+
+
+class PoolClosed(Exception):
+    pass
+
+
+class AcquireTimeout(Exception):
+    pass
+
+
+class _Entry:
+    __slots__ = ("resource", "created", "last_used")
+
+    def __init__(self, resource: Any, now: float):
+        self.resource = resource
+        self.created = now
+        self.last_used = now
+
+
+class ResourcePool:
+    """
+    Args:
+        factory: 리소스를 새로 만드는 코루틴 함수
+        close: 리소스를 정리하는 코루틴 함수 (없으면 버리기만 함)
+        health_check: 꺼낼 때 호출, False를 돌려주거나 예외가 나면 그 리소스는 폐기
+        min_size / max_size: 유지할 최소 개수 / 동시에 열 수 있는 최대 개수
+        idle_timeout: min_size를 넘는 유휴 리소스 정리 기준 (초, None이면 정리 안 함)
+        acquire_timeout: 기본 획득 제한 시간 (초)
+        window: 대기시간 백분위수에 쓰는 최근 샘플 수
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]],
+                 close: Optional[Callable[[Any], Awaitable[None]]] = None,
+                 health_check: Optional[Callable[[Any], Awaitable[bool]]] = None,
+                 min_size: int = 1, max_size: int = 10, idle_timeout: Optional[float] = 60.0,
+                 acquire_timeout: float = 10.0, window: int = 10_000):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("0 <= min_size <= max_size, max_size >= 1 이어야 합니다")
+        self.factory = factory
+        self.close_resource = close
+        self.health_check = health_check
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: deque = deque()  # 오른쪽이 가장 최근 반납 (재사용은 오른쪽, 정리는 왼쪽부터)
+        self._in_use: Dict[int, _Entry] = {}
+        self._waiters: deque = deque()
+        self._size = 0  # 열려 있거나 여는 중인 리소스 수
+        self._closed = False
+        self._reaper: Optional[asyncio.Task] = None
+
+        self.waits: deque = deque(maxlen=window)
+        self.counters = {"acquired": 0, "timeouts": 0, "created": 0, "destroyed": 0,
+                         "health_failures": 0, "create_errors": 0}
+        self._busy_area = 0.0  # ∫ 사용 중 개수 dt
+        self._last_change = time.monotonic()
+        self._started = self._last_change
+
+    @classmethod
+    def from_context_manager(cls, resource_type: Callable[[], Any], **kwargs) -> "ResourcePool":
+        """async with로 쓰는 리소스: __aenter__로 열고 __aexit__로 닫음"""
+        async def factory():
+            return await resource_type().__aenter__()
+
+        async def close(resource):
+            await resource.__aexit__(None, None, None)
+
+        return cls(factory, close=close, **kwargs)
+
+    # ------------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------------
+
+    async def start(self) -> "ResourcePool":
+        """min_size개를 동시에 미리 만들고 유휴 정리 태스크 시작"""
+        entries = await asyncio.gather(*[self._create() for _ in range(self.min_size)])
+        now = time.monotonic()
+        for entry in entries:
+            entry.last_used = now
+            self._idle.append(entry)
+        if self.idle_timeout is not None:
+            self._reaper = asyncio.create_task(self._reap(), name="resource-pool-reaper")
+        return self
+
+    async def close(self):
+        """대기 중인 요청은 PoolClosed, 유휴 리소스는 정리 (사용 중인 것은 반납될 때 정리)"""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolClosed("풀이 닫혔습니다"))
+        idle, self._idle = list(self._idle), deque()
+        await asyncio.gather(*[self._destroy(entry) for entry in idle])
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # 획득 / 반납
+    # ------------------------------------------------------------------
+
+    async def acquire(self, timeout: Optional[float] = None) -> Any:
+        if self._closed:
+            raise PoolClosed("풀이 닫혔습니다")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            entry = None
+            if self._idle and not self._waiters:
+                entry = self._idle.pop()
+            elif self._size < self.max_size and not self._waiters:
+                self._size += 1
+                entry = await self._create(reserved=True, deadline=deadline)
+            else:
+                entry = await self._wait(deadline)
+                if entry is None:  # 자리가 비었다는 신호 → 직접 생성
+                    self._size += 1
+                    entry = await self._create(reserved=True, deadline=deadline)
+            try:
+                healthy = await self._healthy(entry, deadline)
+            except AcquireTimeout:
+                await self._destroy(entry)  # 헬스체크가 멈춤 → 불량으로 보고 폐기
+                raise
+            except BaseException:
+                # 헬스체크 중 취소 → 리소스를 다음 대기자/유휴 목록으로 돌려 자리를 잃지 않음
+                self._hand_off(entry)
+                raise
+            if healthy:
+                break
+            await self._destroy(entry)
+
+        self._account_busy()
+        self._in_use[id(entry.resource)] = entry
+        self.counters["acquired"] += 1
+        self.waits.append(loop.time() - start)
+        return entry.resource
+
+    async def _wait(self, deadline: float) -> Optional[_Entry]:
+        """FIFO 대기열에서 반납된 리소스(또는 빈 자리 신호 None)를 기다림"""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.CancelledError:
+            if not waiter.done():
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            elif waiter.exception() is None:
+                # 넘겨받은 직후 취소됨 → 리소스/빈 자리를 다음 대기자에게
+                self._hand_off(waiter.result())
+            raise
+        if not done:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self.counters["timeouts"] += 1
+            raise AcquireTimeout(f"{self.max_size}개 모두 사용 중 (대기 {len(self._waiters)}개)")
+        return waiter.result()
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+
+    async def _create(self, reserved: bool = False, deadline: Optional[float] = None) -> _Entry:
+        if not reserved:
+            self._size += 1
+        try:
+            resource = await asyncio.wait_for(self.factory(), self._remaining(deadline))
+        except BaseException as e:
+            self.counters["create_errors"] += 1
+            self._size -= 1
+            self._hand_off(None)
+            if isinstance(e, asyncio.TimeoutError):
+                self.counters["timeouts"] += 1
+                raise AcquireTimeout("리소스 생성이 제한 시간 안에 끝나지 않았습니다") from None
+            raise
+        self.counters["created"] += 1
+        return _Entry(resource, time.monotonic())
+
+    async def _healthy(self, entry: _Entry, deadline: Optional[float] = None) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            ok = await asyncio.wait_for(self.health_check(entry.resource), self._remaining(deadline))
+        except asyncio.TimeoutError:
+            self.counters["health_failures"] += 1
+            self.counters["timeouts"] += 1
+            raise AcquireTimeout("헬스체크가 제한 시간 안에 끝나지 않았습니다") from None
+        except Exception:
+            ok = False
+        if not ok:
+            self.counters["health_failures"] += 1
+        return ok
+
+    async def _destroy(self, entry: _Entry):
+        self._size -= 1
+        self.counters["destroyed"] += 1
+        self._hand_off(None)  # 빈 자리가 생겼음을 대기자에게 알림
+        if self.close_resource is not None:
+            try:
+                await self.close_resource(entry.resource)
+            except Exception:
+                pass
+
+    def _hand_off(self, entry: Optional[_Entry]):
+        """첫 번째 대기자에게 리소스(또는 빈 자리 None)를 넘기고, 대기자가 없으면 유휴 목록으로"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(entry)
+                return
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            self._idle.append(entry)
+
+    async def release(self, resource: Any, discard: bool = False):
+        """반납 (discard=True면 끊어진 것으로 보고 폐기)"""
+        self._account_busy()
+        entry = self._in_use.pop(id(resource))
+        if discard or self._closed:
+            await self._destroy(entry)
+        else:
+            self._hand_off(entry)
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None):
+        """연결 오류(OSError 계열)로 빠져나가면 폐기, 그 외에는 반납"""
+        resource = await self.acquire(timeout)
+        try:
+            yield resource
+        except (OSError, ConnectionError):
+            await self.release(resource, discard=True)
+            raise
+        except BaseException:
+            await self.release(resource)
+            raise
+        else:
+            await self.release(resource)
+
+    # ------------------------------------------------------------------
+    # 유휴 정리 / 지표
+    # ------------------------------------------------------------------
+
+    async def _reap(self):
+        interval = max(self.idle_timeout / 2, 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            while (self._idle and self._size > self.min_size
+                   and now - self._idle[0].last_used >= self.idle_timeout):
+                await self._destroy(self._idle.popleft())
+
+    def _account_busy(self):
+        """사용 중 개수가 바뀌기 직전에 호출 (사용률 적분)"""
+        now = time.monotonic()
+        self._busy_area += len(self._in_use) * (now - self._last_change)
+        self._last_change = now
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        busy_area = self._busy_area + len(self._in_use) * (now - self._last_change)
+        waits = list(self.waits)
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "waiting": len(self._waiters),
+            "utilization": round(busy_area / (self.max_size * (now - self._started)), 3),
+            "wait_p50_ms": round(percentile(waits, 50) * 1000, 2),
+            "wait_p99_ms": round(percentile(waits, 99) * 1000, 2),
+            "wait_max_ms": round(max(waits, default=0.0) * 1000, 2),
+            **self.counters,
+        }
+
+
+# ---------------------------------------------------------------------------
+# 데모 / 벤치마크
+# ---------------------------------------------------------------------------
+
+class SimulatedDatabase:
+    """연결 비용과 최대 연결 수가 있는 가상 서버 (PostgreSQL max_connections처럼)"""
+
+    def __init__(self, max_connections: int = 100, connect_cost: float = 0.05,
+                 close_cost: float = 0.05, query_cost: float = 0.01, drop_rate: float = 0.0):
+        self.max_connections = max_connections
+        self.connect_cost = connect_cost
+        self.close_cost = close_cost
+        self.query_cost = query_cost
+        self.drop_rate = drop_rate
+        self.open = 0
+        self.peak = 0
+        self.connects = 0
+        self.refused = 0
+
+    async def connect(self) -> "SimulatedConnection":
+        await asyncio.sleep(self.connect_cost)
+        if self.open >= self.max_connections:
+            self.refused += 1
+            raise ConnectionRefusedError("too many clients already")
+        self.open += 1
+        self.connects += 1
+        self.peak = max(self.peak, self.open)
+        return SimulatedConnection(self)
+
+
+class SimulatedConnection:
+    def __init__(self, db: SimulatedDatabase):
+        self.db = db
+        self.alive = True
+
+    async def query(self, sql: str) -> str:
+        if not self.alive:
+            raise ConnectionResetError("server closed the connection")
+        await asyncio.sleep(self.db.query_cost)
+        return "ok"
+
+    async def ping(self) -> bool:
+        # 유휴 중 서버가 끊은 연결을 흉내냄
+        if self.alive and random.random() < self.db.drop_rate:
+            self.alive = False
+        return self.alive
+
+    async def close(self):
+        await asyncio.sleep(self.db.close_cost)
+        self.db.open -= 1
+
+
+async def _load(mode: str, db: SimulatedDatabase, requests: int, concurrency: int,
+                pool_size: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+    pool = None
+    if mode == "pool":
+        pool = await ResourcePool(db.connect, close=lambda conn: conn.close(),
+                                  health_check=lambda conn: conn.ping(),
+                                  min_size=pool_size // 2, max_size=pool_size, idle_timeout=30).start()
+
+    async def one(i: int):
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                if pool is not None:
+                    async with pool.connection() as conn:
+                        await conn.query(f"SELECT {i}")
+                else:
+                    conn = await db.connect()
+                    try:
+                        await conn.query(f"SELECT {i}")
+                    finally:
+                        await conn.close()
+            except (OSError, AcquireTimeout):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - begin
+    row = {
+        "mode": mode,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "errors": errors,
+        "connects": db.connects,
+        "peak_connections": db.peak,
+    }
+    if pool is not None:
+        row["pool"] = pool.stats()
+        await pool.close()
+    return row
+
+
+async def benchmark(requests: int, concurrencies: List[int], pool_size: int, max_connections: int,
+                    scale: float) -> List[Dict]:
+    rows = []
+    for concurrency in concurrencies:
+        for mode in ("per_use", "pool"):
+            db = SimulatedDatabase(max_connections=max_connections, connect_cost=0.05 * scale,
+                                   close_cost=0.05 * scale, query_cost=0.01 * scale, drop_rate=0.001)
+            row = await _load(mode, db, requests, concurrency, pool_size)
+            rows.append({"concurrency": concurrency, **row})
+    return rows
+
+
+async def demo_async_resource():
+    """async.py 예제 8의 AsyncResource를 그대로 풀에 넣음: 연결/정리 메시지가 풀 크기만큼만 나옴"""
+    AsyncResource = importlib.import_module("async").AsyncResource
+    async with ResourcePool.from_context_manager(AsyncResource, min_size=1, max_size=2) as pool:
+        async def use(i: int):
+            async with pool.connection() as resource:
+                data = await resource.fetch()
+                print(f"요청 {i}: {data}")
+
+        await asyncio.gather(*[use(i) for i in range(6)])
+        stats = pool.stats()
+    print(f"요청 6건, 생성 {stats['created']}개, 대기 p99 {stats['wait_p99_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비동기 리소스 풀 데모 + 벤치마크")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--max-connections", type=int, default=100, help="가상 서버 최대 연결 수")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="비용 배율 (1.0 = 연결 50ms, 정리 50ms, 쿼리 10ms)")
+    parser.add_argument("--skip-demo", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if not args.skip_demo:
+        print("=== AsyncResource 풀 데모 ===")
+        asyncio.run(demo_async_resource())
+
+    print(f"\n=== 요청마다 연결 vs 풀 (요청 {args.requests}, 풀 {args.pool_size}, "
+          f"서버 최대 연결 {args.max_connections}) ===")
+    rows = asyncio.run(benchmark(args.requests, args.concurrency, args.pool_size,
+                                 args.max_connections, args.scale))
+    print(f"{'conc':>5} {'mode':<8} {'req/s':>8} {'p50_ms':>8} {'p99_ms':>8} {'errors':>7} {'connects':>9} {'peak_conn':>10}")
+    print("-" * 70)
+    for row in rows:
+        print(f"{row['concurrency']:>5} {row['mode']:<8} {row['req_per_sec']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8} "
+              f"{row['errors']:>7} {row['connects']:>9} {row['peak_connections']:>10}")
+    pool = rows[-1]["pool"]
+    print(f"\n풀 지표: 대기 p50 {pool['wait_p50_ms']}ms / p99 {pool['wait_p99_ms']}ms, "
+          f"사용률 {pool['utilization']:.0%}, 헬스체크 실패 {pool['health_failures']}, "
+          f"타임아웃 {pool['timeouts']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
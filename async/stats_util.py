@@ -0,0 +1,16 @@
+"""
+측정 결과 집계에 쓰는 작은 공용 함수 (외부 의존성 없음)
+
+벤치마크 스크립트와 라이브러리 모듈(looplag, resourcepool 등)이 함께 씁니다.
+"""
+import math
+from typing import List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,163 @@
+"""
+Task 마이크로벤치마크 - 생성 속도, 대기 중 태스크당 메모리, gather / TaskGroup / wait 비교
+
+coroutine.py는 태스크 하나를 print와 weakref로 살펴봅니다. 여기서는 프로세스당 동시 실행
+한도를 정할 수 있도록 태스크 수 1천~100만에서 다음을 측정합니다.
+- create_per_sec: 이벤트를 기다리는(대기 중) 태스크를 만드는 속도
+- bytes_per_task: tracemalloc으로 잰 대기 중 태스크 하나의 메모리 (태스크 + 코루틴 프레임)
+- gather / taskgroup / wait: 같은 개수의 태스크를 끝까지 실행하는 데 걸린 시간
+
+크기마다 새 프로세스에서 측정해서 이전 측정의 메모리 단편화가 섞이지 않게 합니다.
+
+사용법:
+python taskbench.py                                  # 1k, 10k, 100k, 1M
+python taskbench.py --sizes 1000 100000 --json taskbench.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List
+
+HAS_TASKGROUP = hasattr(asyncio, "TaskGroup")  # Python 3.11+
+
+
+async def _waiter(event: asyncio.Event):
+    await event.wait()
+
+
+async def _step():
+    await asyncio.sleep(0)
+
+
+async def measure_creation(n: int) -> Dict:
+    """대기 중 태스크 n개 생성 속도 (tracemalloc 없이)"""
+    event = asyncio.Event()
+    gc.collect()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(_waiter(event)) for _ in range(n)]
+    created = time.perf_counter() - start
+    await asyncio.sleep(0)  # 모든 태스크가 첫 await까지 실행되어 대기 상태가 됨
+    pending = time.perf_counter() - start
+
+    start = time.perf_counter()
+    event.set()
+    await asyncio.gather(*tasks)
+    wakeup = time.perf_counter() - start
+    return {
+        "create_per_sec": round(n / created),
+        "create_and_start_us": round(pending / n * 1e6, 3),
+        "wakeup_all_s": round(wakeup, 4),
+    }
+
+
+async def measure_memory(n: int) -> Dict:
+    """대기 중 태스크 하나당 메모리 (tracemalloc 현재 할당량 차이)"""
+    event = asyncio.Event()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(_waiter(event)) for _ in range(n)]
+    await asyncio.sleep(0)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    event.set()
+    await asyncio.gather(*tasks)
+    # 리스트 자체(포인터 8바이트)는 태스크 비용이 아니므로 제외
+    per_task = (after - before - sys.getsizeof(tasks)) / n
+    return {"bytes_per_task": round(per_task, 1), "mb_total": round((after - before) / 1024 / 1024, 1)}
+
+
+async def run_gather(n: int):
+    await asyncio.gather(*[_step() for _ in range(n)])
+
+
+async def run_taskgroup(n: int):
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(n):
+            tg.create_task(_step())
+
+
+async def run_wait(n: int):
+    await asyncio.wait([asyncio.create_task(_step()) for _ in range(n)])
+
+
+RUNNERS = {"gather": run_gather, "taskgroup": run_taskgroup, "wait": run_wait}
+
+
+async def measure_apis(n: int) -> Dict:
+    """같은 n개 태스크를 각 API로 완료까지 실행한 시간"""
+    results = {}
+    for name, runner in RUNNERS.items():
+        if name == "taskgroup" and not HAS_TASKGROUP:
+            continue
+        gc.collect()
+        start = time.perf_counter()
+        await runner(n)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_s"] = round(elapsed, 4)
+        results[f"{name}_per_sec"] = round(n / elapsed)
+    return results
+
+
+async def _measure_size(n: int) -> Dict:
+    row = {"tasks": n}
+    row.update(await measure_creation(n))
+    row.update(await measure_memory(n))
+    row.update(await measure_apis(n))
+    return row
+
+
+def _run_in_fresh_process(n: int) -> Dict:
+    return asyncio.run(_measure_size(n))
+
+
+def run_suite(sizes: List[int]) -> List[Dict]:
+    rows = []
+    header = (f"{'tasks':>9} {'create/s':>10} {'bytes/task':>11} {'gather_s':>9} "
+              f"{'taskgroup_s':>12} {'wait_s':>8}")
+    print(header)
+    print("-" * len(header))
+    for n in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            row = executor.submit(_run_in_fresh_process, n).result()
+        rows.append(row)
+        print(f"{n:>9,} {row['create_per_sec']:>10,} {row['bytes_per_task']:>11} "
+              f"{row['gather_s']:>9} {row.get('taskgroup_s', '-'):>12} {row['wait_s']:>8}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio Task 마이크로벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--json", dest="json_path", default="taskbench.json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("=== asyncio Task 마이크로벤치마크 ===")
+    print(f"Python {platform.python_version()} ({platform.python_implementation()}), "
+          f"TaskGroup {'지원' if HAS_TASKGROUP else '미지원'}\n")
+    rows = run_suite(args.sizes)
+
+    largest = rows[-1]
+    print(f"\n참고: 대기 중 태스크 {largest['tasks']:,}개 ≈ {largest['mb_total']}MB "
+          f"(태스크당 {largest['bytes_per_task']}B)")
+
+    with open(args.json_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "rows": rows,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
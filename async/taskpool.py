@@ -0,0 +1,250 @@
+"""
+BoundedTaskPool - 입력을 지연 소비하며 동시 실행 수를 제한하고 결과를 스트리밍
+
+async.py 예제 6/7처럼 코루틴을 전부 만든 뒤 gather하면 항목 수만큼 태스크가 메모리에 올라가고
+모든 작업이 끝나야 결과를 볼 수 있습니다. BoundedTaskPool은 (비동기) 이터러블에서
+필요한 만큼만 항목을 꺼내 최대 N개의 태스크만 실행하고, 끝나는 대로 결과를 내보냅니다.
+
+사용법:
+python taskpool.py                         # 100만 항목 gather vs 풀 벤치마크
+python taskpool.py --items 100000 --limit 500 --latency 0.001
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+
+
+class BoundedTaskPool:
+    """
+    동시 실행 수를 limit개로 제한하는 재사용 가능한 태스크 풀
+
+    - 입력은 리스트/제너레이터/비동기 이터러블 모두 가능하며 필요한 만큼만 꺼냄
+    - ordered=True면 입력 순서대로, False면 끝나는 순서대로 결과를 yield
+    - 작업 하나가 실패하면 나머지를 취소하고 예외를 호출자에게 전달
+      (return_exceptions=True면 예외를 결과로 yield)
+    - 소비자가 중간에 멈추거나 취소되면 실행 중인 태스크를 모두 취소
+    """
+
+    def __init__(self, limit: int = 100, ordered: bool = False, return_exceptions: bool = False):
+        if limit < 1:
+            raise ValueError("limit은 1 이상이어야 합니다")
+        self.limit = limit
+        self.ordered = ordered
+        self.return_exceptions = return_exceptions
+        self.submitted = 0
+        self.completed = 0
+        self.peak_in_flight = 0
+
+    def map(self, fn: Callable[[Any], Awaitable[Any]],
+            items: Union[Iterable[Any], AsyncIterator[Any]],
+            ordered: Optional[bool] = None) -> AsyncIterator[Any]:
+        """items의 각 항목에 fn을 적용한 결과를 스트리밍"""
+        ordered = self.ordered if ordered is None else ordered
+        if ordered:
+            return self._map_ordered(fn, items)
+        return self._map_unordered(fn, items)
+
+    async def run(self, fn: Callable[[Any], Awaitable[Any]], items, ordered: bool = True) -> list:
+        """결과를 리스트로 모으기 (gather 대체용)"""
+        return [result async for result in self.map(fn, items, ordered=ordered)]
+
+    async def _next_item(self, iterator):
+        """다음 항목 또는 StopAsyncIteration"""
+        if hasattr(iterator, "__anext__"):
+            return await iterator.__anext__()
+        try:
+            return next(iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def _iterate(self, items):
+        return items.__aiter__() if hasattr(items, "__aiter__") else iter(items)
+
+    def _spawn(self, fn, item) -> asyncio.Task:
+        self.submitted += 1
+        return asyncio.create_task(fn(item))
+
+    def _result(self, task: asyncio.Task):
+        self.completed += 1
+        if self.return_exceptions and not task.cancelled() and task.exception() is not None:
+            return task.exception()
+        return task.result()
+
+    async def _map_ordered(self, fn, items):
+        iterator = self._iterate(items)
+        # 완료됐지만 아직 내보내지 않은 태스크도 한도에 포함 → 앞쪽 작업이 느려도 메모리가 제한됨
+        window: deque = deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(window) < self.limit:
+                    try:
+                        item = await self._next_item(iterator)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    window.append(self._spawn(fn, item))
+                self.peak_in_flight = max(self.peak_in_flight, len(window))
+                if not window:
+                    return
+                head = window[0]
+                if not head.done():
+                    await asyncio.wait([head])
+                window.popleft()
+                yield self._result(head)
+        finally:
+            await self._cancel(window)
+
+    async def _map_unordered(self, fn, items):
+        iterator = self._iterate(items)
+        in_flight = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.limit:
+                    try:
+                        item = await self._next_item(iterator)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    in_flight.add(self._spawn(fn, item))
+                self.peak_in_flight = max(self.peak_in_flight, len(in_flight))
+                if not in_flight:
+                    return
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    yield self._result(task)
+        finally:
+            await self._cancel(in_flight)
+
+    @staticmethod
+    async def _cancel(tasks):
+        """남은 태스크 취소 후 정리 (완료된 태스크의 예외도 회수해 경고 방지)"""
+        tasks = list(tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크: gather + Semaphore (예제 6 방식) vs BoundedTaskPool
+# ---------------------------------------------------------------------------
+
+def _peak_rss_mb() -> float:
+    # Linux: KB, macOS: 바이트
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+async def _bench(strategy: str, items: int, limit: int, latency: float) -> dict:
+    async def work(i):
+        await asyncio.sleep(latency)
+        return i
+
+    first_result = None
+    checksum = 0
+    start = time.perf_counter()
+
+    if strategy == "gather":
+        sem = asyncio.Semaphore(limit)
+
+        async def limited(i):
+            async with sem:
+                return await work(i)
+
+        results = await asyncio.gather(*[limited(i) for i in range(items)])
+        first_result = time.perf_counter() - start
+        checksum = sum(results)
+    else:
+        pool = BoundedTaskPool(limit=limit, ordered=(strategy == "pool_ordered"))
+        async for result in pool.map(work, range(items)):
+            if first_result is None:
+                first_result = time.perf_counter() - start
+            checksum += result
+
+    elapsed = time.perf_counter() - start
+    assert checksum == items * (items - 1) // 2, "결과 누락"
+    return {
+        "strategy": strategy,
+        "items": items,
+        "limit": limit,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(items / elapsed),
+        "first_result_ms": round(first_result * 1000, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _run_in_fresh_process(strategy: str, items: int, limit: int, latency: float) -> dict:
+    return asyncio.run(_bench(strategy, items, limit, latency))
+
+
+def benchmark(items: int, limit: int, latency: float) -> list:
+    """전략마다 새 프로세스에서 실행해 최대 RSS를 분리 측정"""
+    rows = []
+    print(f"{'strategy':<14} {'seconds':>8} {'items/s':>10} {'first_ms':>10} {'peak_rss_mb':>12}")
+    print("-" * 58)
+    for strategy in ("gather", "pool_unordered", "pool_ordered"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            row = executor.submit(_run_in_fresh_process, strategy, items, limit, latency).result()
+        rows.append(row)
+        print(f"{row['strategy']:<14} {row['seconds']:>8} {row['items_per_sec']:>10} "
+              f"{row['first_result_ms']:>10} {row['peak_rss_mb']:>12}")
+    return rows
+
+
+async def demo():
+    print("=== 스트리밍 결과 (unordered) ===")
+
+    async def fetch(i):
+        await asyncio.sleep(0.05 * (5 - i))
+        return f"작업 {i}"
+
+    pool = BoundedTaskPool(limit=3)
+    async for result in pool.map(fetch, range(5)):
+        print(f"  수신: {result}")
+
+    print("\n=== 에러 전파 ===")
+
+    async def failing(i):
+        await asyncio.sleep(0.01 * i)
+        if i == 2:
+            raise ValueError(f"작업 {i} 실패!")
+        return i
+
+    try:
+        await pool.run(failing, range(10))
+    except ValueError as e:
+        print(f"  예외 전달됨: {e} (나머지 작업 취소)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BoundedTaskPool vs gather 벤치마크")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=1000, help="동시 실행 태스크 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="작업당 asyncio.sleep 시간 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    asyncio.run(demo())
+
+    print(f"\n=== 벤치마크: {args.items:,}개 항목, 동시 {args.limit}개 ===")
+    rows = benchmark(args.items, args.limit, args.latency)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+실행 중 태스크 목록 + 누수 추적기
+
+coroutine.py의 demonstrate_task_references는 강한 참조가 있는 동안만 태스크가 살아 있다는 걸
+보여줍니다. 운영에서는 반대로 끝나지 않는 태스크가 계속 쌓이는 문제가 생깁니다.
+TaskRegistry는 루프의 task factory를 가로채서 만들어지는 모든 태스크를 약한 참조로 추적합니다.
+- 생성 시: 생성 위치(파일:줄 함수)와 생성 시각만 기록 (프레임 몇 개를 거슬러 올라가는 비용)
+- snapshot(): 살아 있는 태스크를 생성 위치별로 묶어 개수/상태/최고 나이/메모리 추정치를 보여주고
+  오래 살아 있는(long_lived) 태스크와 아무도 await하지 않는(unawaited) 대기 태스크를 표시
+  (unawaited는 완료 콜백 유무로 판단하는 best-effort 휴리스틱 - _has_waiters 참고)
+
+사용법:
+    registry = TaskRegistry(long_lived_after=60)
+    registry.install()           # 실행 중인 루프 안에서 호출
+    ...
+    registry.print_report()
+    registry.uninstall()
+
+python taskregistry.py           # 누수 데모 + 오버헤드 측정
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+_UNKNOWN_SITE = (None, 0)
+
+
+def _creation_site(frame, max_depth: int = 8) -> Tuple[object, int]:
+    """asyncio 내부 프레임을 건너뛴 첫 호출 위치 (코드 객체, 줄) - 문자열은 스냅샷 때 만듦"""
+    for _ in range(max_depth):
+        if frame is None:
+            break
+        code = frame.f_code
+        if not code.co_filename.startswith(_ASYNCIO_DIR):
+            return code, frame.f_lineno
+        frame = frame.f_back
+    return _UNKNOWN_SITE
+
+
+def _format_site(site: Tuple[object, int]) -> str:
+    code, lineno = site
+    if code is None:
+        return "?"
+    return f"{os.path.relpath(code.co_filename)}:{lineno} {code.co_name}"
+
+
+def estimate_task_bytes(task: asyncio.Task) -> int:
+    """태스크 + 코루틴 + 현재 프레임 크기 (지역 변수가 가리키는 객체는 제외한 하한 추정치)"""
+    size = sys.getsizeof(task)
+    coro = task.get_coro()
+    if coro is not None:
+        size += sys.getsizeof(coro)
+        frame = getattr(coro, "cr_frame", None)
+        if frame is not None:
+            size += sys.getsizeof(frame)
+    return size
+
+
+class TaskRegistry:
+    """
+    Args:
+        long_lived_after: 이보다 오래 대기 중이면 long_lived로 표시 (초)
+        unawaited_after: 이보다 오래 대기 중인데 아무도 기다리지 않으면 unawaited로 표시 (초, best-effort)
+    """
+
+    def __init__(self, long_lived_after: float = 60.0, unawaited_after: float = 1.0):
+        self.long_lived_after = long_lived_after
+        self.unawaited_after = unawaited_after
+        self.created_total = 0
+        # 태스크 → (생성 위치, 생성 시각). 약한 참조라 태스크 수명에 영향을 주지 않음
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.Task, tuple]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+
+    def install(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> "TaskRegistry":
+        """루프의 task factory 교체 (기존 factory가 있으면 감싸서 유지)"""
+        self._loop = loop or asyncio.get_running_loop()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._factory)
+        return self
+
+    def uninstall(self):
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+            self._loop = None
+
+    def _factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        self.created_total += 1
+        # 생성 시에는 프레임 몇 개만 거슬러 올라가고 나머지 정보는 snapshot()에서 계산
+        self._tasks[task] = (_creation_site(sys._getframe(1)), time.monotonic())
+        return task
+
+    def live_count(self) -> int:
+        return len(self._tasks)
+
+    @staticmethod
+    def _has_waiters(task: asyncio.Task) -> Optional[bool]:
+        """
+        best-effort 휴리스틱: await/gather/wait 중인 쪽이 있으면 태스크에 완료 콜백이 등록되어 있음
+
+        공개 API로는 완료 콜백 목록을 볼 수 없어 CPython Task의 _callbacks를 읽습니다.
+        add_done_callback만 건 태스크도 기다리는 쪽이 있는 것으로 보고, _callbacks가 없는 구현
+        (다른 인터프리터/이벤트 루프의 Task)에서는 None(알 수 없음)을 반환해 unawaited로 세지 않습니다.
+        """
+        if not hasattr(task, "_callbacks"):
+            return None
+        return bool(task._callbacks)
+
+    def snapshot(self, include_done: bool = False) -> List[Dict]:
+        """생성 위치별 그룹 (개수 많은 순)"""
+        now = time.monotonic()
+        groups: Dict[Tuple[object, int], Dict] = {}
+        for task, (site, created) in list(self._tasks.items()):
+            done = task.done()
+            if done and not include_done:
+                continue
+            age = now - created
+            group = groups.get(site)
+            if group is None:
+                coro = task.get_coro()
+                group = groups[site] = {
+                    "site": _format_site(site),
+                    "coroutine": getattr(coro, "__qualname__", type(coro).__name__),
+                    "count": 0, "pending": 0, "done": 0,
+                    "oldest_age_s": 0.0, "bytes_estimate": 0,
+                    "long_lived": 0, "unawaited": 0, "sample_names": [],
+                }
+            group["count"] += 1
+            group["done" if done else "pending"] += 1
+            group["oldest_age_s"] = max(group["oldest_age_s"], round(age, 2))
+            group["bytes_estimate"] += estimate_task_bytes(task)
+            if not done:
+                if age >= self.long_lived_after:
+                    group["long_lived"] += 1
+                if age >= self.unawaited_after and self._has_waiters(task) is False:
+                    group["unawaited"] += 1
+            if len(group["sample_names"]) < 3:
+                group["sample_names"].append(task.get_name())
+        return sorted(groups.values(), key=lambda g: -g["count"])
+
+    def print_report(self, top: int = 10):
+        groups = self.snapshot()
+        print(f"살아 있는 태스크 {sum(g['count'] for g in groups)}개 "
+              f"(누적 생성 {self.created_total}개), 생성 위치 {len(groups)}곳")
+        print(f"{'count':>6} {'oldest_s':>9} {'kb':>7} {'long':>5} {'unawaited':>9}  site / coroutine")
+        print("-" * 80)
+        for g in groups[:top]:
+            flag = " ⚠️" if g["long_lived"] or g["unawaited"] else ""
+            print(f"{g['count']:>6} {g['oldest_age_s']:>9} {g['bytes_estimate'] / 1024:>7.1f} "
+                  f"{g['long_lived']:>5} {g['unawaited']:>9}  {g['site']} / {g['coroutine']}{flag}")
+
+
+# ---------------------------------------------------------------------------
+# 데모 / 오버헤드 측정
+# ---------------------------------------------------------------------------
+
+async def poll_forever():
+    """누수 예: 요청마다 만들고 아무도 취소/await하지 않는 폴링 태스크"""
+    while True:
+        await asyncio.sleep(0.05)
+
+
+async def handle_request(i: int):
+    asyncio.create_task(poll_forever(), name=f"poller-{i}")  # 참조도, 취소도 없음
+    await asyncio.sleep(0.01)
+    return i
+
+
+async def demo(long_lived_after: float) -> List[Dict]:
+    registry = TaskRegistry(long_lived_after=long_lived_after, unawaited_after=0.2).install()
+    background = set()
+    try:
+        # 정상: gather로 기다리는 요청 처리 + 참조를 유지하다 완료 시 제거하는 백그라운드 태스크
+        for i in range(3):
+            task = asyncio.create_task(asyncio.sleep(10), name=f"heartbeat-{i}")
+            background.add(task)
+            task.add_done_callback(background.discard)
+        await asyncio.gather(*[handle_request(i) for i in range(50)])
+        await asyncio.sleep(long_lived_after + 0.1)
+
+        print("=== 태스크 스냅샷 (생성 위치별) ===")
+        registry.print_report()
+        return registry.snapshot()
+    finally:
+        registry.uninstall()
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+
+async def overhead(n: int, repeat: int = 5) -> Dict:
+    async def noop():
+        pass
+
+    async def create_all():
+        start = time.perf_counter()
+        await asyncio.gather(*[asyncio.create_task(noop()) for _ in range(n)])
+        return time.perf_counter() - start
+
+    plain, tracked = [], []
+    for _ in range(repeat):
+        plain.append(await create_all())
+        registry = TaskRegistry().install()
+        try:
+            tracked.append(await create_all())
+        finally:
+            registry.uninstall()
+    base, with_registry = min(plain), min(tracked)
+    return {
+        "tasks": n,
+        "plain_s": round(base, 4),
+        "tracked_s": round(with_registry, 4),
+        "overhead_us_per_task": round((with_registry - base) / n * 1e6, 2),
+        "overhead_pct": round((with_registry - base) / base * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="태스크 목록 / 누수 추적기 데모")
+    parser.add_argument("--long-lived", type=float, default=0.5, help="long_lived 판단 기준 (초)")
+    parser.add_argument("--tasks", type=int, default=100_000, help="오버헤드 측정용 태스크 수")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    groups = asyncio.run(demo(args.long_lived))
+
+    print(f"\n=== 오버헤드 (태스크 {args.tasks:,}개 생성 + 완료) ===")
+    cost = asyncio.run(overhead(args.tasks))
+    print(f"추적 없음 {cost['plain_s']}초, 추적 {cost['tracked_s']}초 → "
+          f"태스크당 {cost['overhead_us_per_task']}µs ({cost['overhead_pct']}%)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"snapshot": groups, "overhead": cost}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+파이프라인 트랜잭션 처리기 - 단계별 워커 + 제한된 큐 + 배치 브로드캐스트
+
+async.py 예제 7은 트랜잭션마다 검증 → 브로드캐스트를 순서대로 await하고 모든 트랜잭션을
+한꺼번에 gather합니다. 여기서는 단계를 크기 제한이 있는 asyncio.Queue로 연결합니다.
+
+    생성 ──[validate_q]──> 검증 워커 N개 ──[broadcast_q]──> 브로드캐스트 워커 M개 (배치 전송)
+
+큐가 가득 차면 앞 단계가 기다리므로(백프레셔) 메모리에 올라가는 트랜잭션 수가 제한되고,
+브로드캐스트는 검증된 트랜잭션을 batch_size개씩 묶어 한 번의 네트워크 호출로 보냅니다.
+
+사용법:
+python txpipeline.py                          # 10만 트랜잭션 벤치마크 (예제 7 방식과 비교)
+python txpipeline.py --transactions 500000 --validate-workers 128 --batch-size 200
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import random
+import time
+import tracemalloc
+from typing import Dict, Iterable, List, Tuple
+
+# async는 예약어라 import 문으로 불러올 수 없음
+Transaction = importlib.import_module("async").Transaction
+
+_DONE = object()  # 워커 종료 신호
+
+
+class SimulatedNetwork:
+    """동시 연결 수가 제한된 원격 서비스 (호출당 왕복 지연 + 트랜잭션당 전송 비용)"""
+
+    def __init__(self, connections: int, rtt: float, per_tx: float = 0.0):
+        self._sem = asyncio.Semaphore(connections)
+        self.rtt = rtt
+        self.per_tx = per_tx
+        self.calls = 0
+
+    async def call(self, tx_count: int = 1):
+        async with self._sem:
+            self.calls += 1
+            await asyncio.sleep(self.rtt + self.per_tx * tx_count)
+
+
+def is_valid(tx: Transaction) -> bool:
+    return tx.amount > 0 and tx.from_addr != tx.to_addr
+
+
+class TransactionPipeline:
+    """검증/브로드캐스트 단계를 제한된 큐로 연결한 파이프라인"""
+
+    def __init__(self, validator: SimulatedNetwork, network: SimulatedNetwork,
+                 validate_workers: int = 64, broadcast_workers: int = 8,
+                 batch_size: int = 100, batch_timeout: float = 0.01,
+                 queue_size: int = 1000, sample_interval: float = 0.05):
+        self.validator = validator
+        self.network = network
+        self.validate_workers = validate_workers
+        self.broadcast_workers = broadcast_workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue_size = queue_size
+        self.sample_interval = sample_interval
+
+        self.validated = 0
+        self.rejected = 0
+        self.broadcasted = 0
+        self.batches = 0
+        self.depth_samples: Dict[str, List[int]] = {"validate_q": [], "broadcast_q": []}
+
+    async def _produce(self, transactions: Iterable[Transaction], validate_q: asyncio.Queue):
+        for tx in transactions:
+            await validate_q.put(tx)  # 큐가 가득 차면 여기서 대기 (백프레셔)
+        for _ in range(self.validate_workers):
+            await validate_q.put(_DONE)
+
+    async def _validate_worker(self, validate_q: asyncio.Queue, broadcast_q: asyncio.Queue):
+        while True:
+            tx = await validate_q.get()
+            if tx is _DONE:
+                return
+            await self.validator.call(1)
+            if is_valid(tx):
+                self.validated += 1
+                await broadcast_q.put(tx)
+            else:
+                self.rejected += 1
+
+    async def _next_batch(self, broadcast_q: asyncio.Queue) -> Tuple[List[Transaction], bool]:
+        """batch_size개가 모이거나 batch_timeout이 지나면 배치 반환 → (배치, 종료 여부)"""
+        first = await broadcast_q.get()
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            try:
+                item = broadcast_q.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(broadcast_q.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _broadcast_worker(self, broadcast_q: asyncio.Queue):
+        finished = False
+        while not finished:
+            batch, finished = await self._next_batch(broadcast_q)
+            if batch:
+                await self.network.call(len(batch))
+                self.broadcasted += len(batch)
+                self.batches += 1
+
+    async def _sample_depth(self, queues: Dict[str, asyncio.Queue]):
+        while True:
+            for name, queue in queues.items():
+                self.depth_samples[name].append(queue.qsize())
+            await asyncio.sleep(self.sample_interval)
+
+    async def run(self, transactions: Iterable[Transaction]) -> Dict:
+        validate_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        broadcast_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        sampler = asyncio.create_task(
+            self._sample_depth({"validate_q": validate_q, "broadcast_q": broadcast_q})
+        )
+
+        start = time.perf_counter()
+        validators = [asyncio.create_task(self._validate_worker(validate_q, broadcast_q))
+                      for _ in range(self.validate_workers)]
+        broadcasters = [asyncio.create_task(self._broadcast_worker(broadcast_q))
+                        for _ in range(self.broadcast_workers)]
+        try:
+            await self._produce(transactions, validate_q)
+            await asyncio.gather(*validators)
+            for _ in range(self.broadcast_workers):
+                await broadcast_q.put(_DONE)
+            await asyncio.gather(*broadcasters)
+        finally:
+            for task in validators + broadcasters + [sampler]:
+                task.cancel()
+            await asyncio.gather(*validators, *broadcasters, sampler, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "strategy": "pipeline",
+            "seconds": round(elapsed, 3),
+            "tx_per_sec": round(self.broadcasted / elapsed),
+            "broadcasted": self.broadcasted,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "avg_batch": round(self.broadcasted / self.batches, 1) if self.batches else 0,
+            "network_calls": self.validator.calls + self.network.calls,
+            "queue_depth": {
+                name: {
+                    "avg": round(sum(samples) / len(samples), 1) if samples else 0,
+                    "max": max(samples, default=0),
+                }
+                for name, samples in self.depth_samples.items()
+            },
+        }
+
+
+async def run_gather_baseline(transactions: List[Transaction], validator: SimulatedNetwork,
+                              network: SimulatedNetwork) -> Dict:
+    """예제 7 방식: 모든 트랜잭션을 동시에 시작하고 트랜잭션마다 검증 → 브로드캐스트"""
+    broadcasted = rejected = 0
+
+    async def process_transaction(tx: Transaction):
+        nonlocal broadcasted, rejected
+        await validator.call(1)
+        if not is_valid(tx):
+            rejected += 1
+            return
+        await network.call(1)
+        broadcasted += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[process_transaction(tx) for tx in transactions])
+    elapsed = time.perf_counter() - start
+    return {
+        "strategy": "gather",
+        "seconds": round(elapsed, 3),
+        "tx_per_sec": round(broadcasted / elapsed),
+        "broadcasted": broadcasted,
+        "rejected": rejected,
+        "batches": broadcasted,
+        "avg_batch": 1.0,
+        "network_calls": validator.calls + network.calls,
+    }
+
+
+def generate_transactions(count: int, invalid_ratio: float = 0.01, seed: int = 0) -> Iterable[Transaction]:
+    """시뮬레이션 트랜잭션 (invalid_ratio 비율은 금액 0으로 검증 실패)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        amount = 0.0 if rng.random() < invalid_ratio else round(rng.uniform(0.01, 10), 4)
+        yield Transaction(i, f"0x{rng.getrandbits(32):08X}", f"0x{rng.getrandbits(32):08X}", amount)
+
+
+def transaction_size_report(count: int = 100_000):
+    """__slots__ 유무에 따른 트랜잭션 객체 메모리 비교"""
+
+    class DictTransaction:
+        def __init__(self, tx_id, from_addr, to_addr, amount):
+            self.id = tx_id
+            self.from_addr = from_addr
+            self.to_addr = to_addr
+            self.amount = amount
+
+    sizes = {}
+    for label, cls in (("__dict__", DictTransaction), ("__slots__", Transaction)):
+        tracemalloc.start()
+        objects = [cls(i, "0xABC", "0xDEF", 1.5) for i in range(count)]
+        sizes[label] = tracemalloc.get_traced_memory()[0] / count
+        tracemalloc.stop()
+        del objects
+    print(f"트랜잭션 객체 크기: __dict__ {sizes['__dict__']:.0f}B → __slots__ {sizes['__slots__']:.0f}B")
+    return sizes
+
+
+async def benchmark(args) -> List[Dict]:
+    def networks():
+        return (SimulatedNetwork(args.validator_connections, args.validate_rtt),
+                SimulatedNetwork(args.network_connections, args.broadcast_rtt, args.per_tx))
+
+    rows = []
+    validator, network = networks()
+    pipeline = TransactionPipeline(
+        validator, network,
+        validate_workers=args.validate_workers, broadcast_workers=args.broadcast_workers,
+        batch_size=args.batch_size, batch_timeout=args.batch_timeout, queue_size=args.queue_size,
+    )
+    rows.append(await pipeline.run(generate_transactions(args.transactions)))
+
+    if not args.skip_baseline:
+        validator, network = networks()
+        rows.append(await run_gather_baseline(list(generate_transactions(args.transactions)),
+                                              validator, network))
+
+    print(f"\n{'strategy':<10} {'seconds':>8} {'tx/sec':>8} {'broadcast':>10} {'rejected':>9} "
+          f"{'avg_batch':>10} {'calls':>8}")
+    print("-" * 70)
+    for row in rows:
+        print(f"{row['strategy']:<10} {row['seconds']:>8} {row['tx_per_sec']:>8} "
+              f"{row['broadcasted']:>10} {row['rejected']:>9} {row['avg_batch']:>10} "
+              f"{row['network_calls']:>8}")
+
+    print("\n단계별 큐 깊이 (pipeline):")
+    for name, depth in rows[0]["queue_depth"].items():
+        print(f"  {name:<12} 평균 {depth['avg']:>7} / 최대 {depth['max']:>5} (한도 {args.queue_size})")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 트랜잭션 처리 벤치마크")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--validate-workers", type=int, default=64)
+    parser.add_argument("--broadcast-workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-timeout", type=float, default=0.01, help="배치 대기 최대 시간 (초)")
+    parser.add_argument("--queue-size", type=int, default=1000, help="단계 사이 큐 크기")
+    parser.add_argument("--validator-connections", type=int, default=256)
+    parser.add_argument("--validate-rtt", type=float, default=0.001, help="검증 서비스 지연 (초)")
+    parser.add_argument("--network-connections", type=int, default=32)
+    parser.add_argument("--broadcast-rtt", type=float, default=0.005, help="브로드캐스트 왕복 지연 (초)")
+    parser.add_argument("--per-tx", type=float, default=0.00002, help="트랜잭션당 전송 비용 (초)")
+    parser.add_argument("--skip-baseline", action="store_true", help="예제 7 방식 비교 생략")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("=== 파이프라인 트랜잭션 처리 벤치마크 ===")
+    print(f"트랜잭션 {args.transactions:,}개, 검증 워커 {args.validate_workers}, "
+          f"브로드캐스트 워커 {args.broadcast_workers}, 배치 {args.batch_size}")
+    transaction_size_report()
+    rows = asyncio.run(benchmark(args))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+커넥션 풀 기반 비동기 웹 크롤러 (asyncbest.py의 WebCrawlerExample)
+
+하나의 aiohttp.ClientSession을 모든 요청이 공유합니다.
+- TCPConnector: 전체/호스트별 연결 수 제한, keep-alive 재사용, DNS 캐시
+- 동시 실행 수 제한: 워커 태스크 max_concurrency개가 큐에서 URL을 꺼내 처리
+- URL 중복 제거: fragment 제거 + scheme/host 소문자 + 기본 포트 제거 후 집합으로 관리
+- 스트리밍 처리: 응답 본문을 청크 단위로 읽으면서 HTMLParser에 바로 넣어 링크 추출
+  (max_bytes를 넘으면 중단하므로 큰 응답도 전부 메모리에 올리지 않음)
+
+벤치마크는 로컬 aiohttp 테스트 서버(별도 프로세스)에 대해
+세션 하나(커넥션 풀) vs 요청마다 새 세션의 초당 요청 수와 지연시간을 비교합니다.
+
+사용법:
+python webcrawler.py                                  # 로컬 서버 크롤 데모 + 벤치마크
+python webcrawler.py --requests 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import codecs
+import json
+import multiprocessing
+import socket
+import time
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+import aiohttp
+from aiohttp import web
+
+from stats_util import percentile
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """중복 판단용 URL 정규화 (잘못된 포트 등은 ValueError)"""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host if parts.port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{parts.port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class _LinkParser(HTMLParser):
+    """청크 단위로 feed 받으면서 <a href> 수집"""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.links.append(urljoin(self.base_url, value))
+
+
+@dataclass
+class CrawlResult:
+    url: str
+    status: int = 0
+    bytes: int = 0
+    links: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    errors: int = 0
+    bytes: int = 0
+    duplicates_skipped: int = 0
+    seconds: float = 0.0
+    results: List[CrawlResult] = field(default_factory=list)
+
+
+class AsyncCrawler:
+    """
+    Args:
+        max_concurrency: 동시에 처리하는 요청 수 (워커 수)
+        limit / limit_per_host: 커넥터 전체 / 호스트별 최대 연결 수
+        keepalive_timeout: 유휴 연결 유지 시간 (초)
+        ttl_dns_cache: DNS 결과 캐시 시간 (초)
+        max_pages: 크롤할 최대 페이지 수
+        max_bytes: 페이지당 최대 읽기 바이트 (넘으면 중단)
+        same_host: True면 시작 URL과 같은 호스트의 링크만 따라감
+    """
+
+    def __init__(self, max_concurrency: int = 20, limit: int = 100, limit_per_host: int = 10,
+                 keepalive_timeout: float = 30.0, ttl_dns_cache: int = 300, timeout: float = 10.0,
+                 max_pages: int = 100, max_bytes: int = 1 << 20, chunk_size: int = 16 * 1024,
+                 same_host: bool = True):
+        self.max_concurrency = max_concurrency
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.same_host = same_host
+        self._connector_kwargs = dict(limit=limit, limit_per_host=limit_per_host,
+                                      keepalive_timeout=keepalive_timeout, ttl_dns_cache=ttl_dns_cache)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(**self._connector_kwargs)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.session.close()
+        self.session = None
+
+    async def fetch(self, url: str) -> Tuple[CrawlResult, List[str]]:
+        """한 페이지를 스트리밍으로 읽으며 링크 추출"""
+        result = CrawlResult(url)
+        links: List[str] = []
+        start = time.perf_counter()
+        try:
+            async with self.session.get(url) as response:
+                result.status = response.status
+                is_html = response.content_type == "text/html"
+                parser = _LinkParser(str(response.url)) if is_html else None
+                decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    result.bytes += len(chunk)
+                    if parser is not None:
+                        parser.feed(decoder.decode(chunk))
+                    if result.bytes >= self.max_bytes:
+                        result.truncated = True
+                        break
+                if parser is not None:
+                    parser.feed(decoder.decode(b"", final=True))
+                    parser.close()
+                    links = parser.links
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupError, ValueError) as e:
+            # LookupError: 알 수 없는 charset, ValueError: 잘못된 헤더/URL
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed = time.perf_counter() - start
+        result.links = len(links)
+        return result, links
+
+    async def crawl(self, start_urls: Iterable[str]) -> CrawlStats:
+        """시작 URL에서 링크를 따라가며 max_pages까지 크롤"""
+        stats = CrawlStats()
+        start_urls = [normalize_url(u) for u in start_urls]
+        allowed_hosts = {urlsplit(u).netloc for u in start_urls}
+        seen: Set[str] = set()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def schedule(url: str):
+            url = normalize_url(url)
+            if url in seen:
+                stats.duplicates_skipped += 1
+                return
+            if len(seen) >= self.max_pages:
+                return
+            if urlsplit(url).scheme not in _DEFAULT_PORTS:
+                return
+            if self.same_host and urlsplit(url).netloc not in allowed_hosts:
+                return
+            seen.add(url)
+            queue.put_nowait(url)
+
+        async def worker():
+            # 페이지 하나/링크 하나의 실패로 워커가 죽으면 queue.join()이 끝나지 않으므로
+            # 예외는 오류로 집계하고 계속 진행
+            while True:
+                url = await queue.get()
+                try:
+                    result, links = await self.fetch(url)
+                    stats.results.append(result)
+                    stats.bytes += result.bytes
+                    if result.error or result.status >= 400:
+                        stats.errors += 1
+                    else:
+                        stats.pages += 1
+                    for link in links:
+                        try:
+                            schedule(link)
+                        except ValueError:
+                            stats.errors += 1
+                except Exception as e:
+                    stats.errors += 1
+                    stats.results.append(CrawlResult(url, error=f"{type(e).__name__}: {e}"))
+                finally:
+                    queue.task_done()
+
+        for url in start_urls:
+            schedule(url)
+        begin = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        stats.seconds = time.perf_counter() - begin
+        return stats
+
+
+# ---------------------------------------------------------------------------
+# 로컬 테스트 서버 (합성 사이트)
+# ---------------------------------------------------------------------------
+
+def build_test_app(pages: int = 500, links_per_page: int = 8, latency: float = 0.005,
+                   body_kb: int = 8) -> web.Application:
+    """/page/{n}: 다른 페이지로 가는 링크 links_per_page개 + 채움 텍스트"""
+    filler = "<p>" + "비동기 크롤러 테스트 본문. " * (body_kb * 1024 // 40) + "</p>"
+
+    async def page(request: web.Request):
+        n = int(request.match_info["n"])
+        await asyncio.sleep(latency)
+        links = "".join(
+            f'<a href="/page/{(n * 7 + i * 13 + 1) % pages}#frag">p</a>' for i in range(links_per_page)
+        )
+        html = f"<html><body><h1>page {n}</h1>{links}{filler}</body></html>"
+        return web.Response(text=html, content_type="text/html")
+
+    async def ping(request: web.Request):
+        await asyncio.sleep(latency)
+        return web.Response(text="pong")
+
+    app = web.Application()
+    app.router.add_get("/page/{n}", page)
+    app.router.add_get("/ping", ping)
+    return app
+
+
+def _serve(port: int, latency: float):
+    web.run_app(build_test_app(latency=latency), host="127.0.0.1", port=port,
+                print=None, handle_signals=False, backlog=1024)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestServer:
+    """별도 프로세스에서 테스트 서버 실행 (클라이언트와 CPU를 나눠 쓰지 않도록)"""
+
+    def __init__(self, latency: float = 0.005):
+        self.port = _free_port()
+        self.latency = latency
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(self.port, latency), daemon=True)
+
+    def start(self) -> "TestServer":
+        self.process.start()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        self.process.terminate()
+        raise RuntimeError("테스트 서버가 시작되지 않았습니다")
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        # localhost로 접속해서 DNS 조회(캐시 효과)도 측정에 포함
+        return f"http://localhost:{self.port}"
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크: 공유 세션(커넥션 풀) vs 요청마다 새 세션
+# ---------------------------------------------------------------------------
+
+async def _load(url: str, requests: int, concurrency: int, pooled: bool) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) if pooled else None
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                if pooled:
+                    async with session.get(url) as response:
+                        await response.read()
+                else:
+                    async with aiohttp.ClientSession() as own:
+                        async with own.get(url) as response:
+                            await response.read()
+                latencies.append(time.perf_counter() - start)
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError):
+                errors += 1
+
+    begin = time.perf_counter()
+    try:
+        await asyncio.gather(*[one() for _ in range(requests)])
+    finally:
+        if session is not None:
+            await session.close()
+    elapsed = time.perf_counter() - begin
+    return {
+        "mode": "pooled" if pooled else "per_request",
+        "requests": requests,
+        "errors": errors,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def benchmark_sessions(base_url: str, requests: int, concurrency: int) -> List[Dict]:
+    url = f"{base_url}/ping"
+    await _load(url, min(200, requests), concurrency, pooled=True)  # 워밍업
+    rows = []
+    for pooled in (True, False):
+        rows.append(await _load(url, requests, concurrency, pooled))
+    return rows
+
+
+class WebCrawlerExample:
+    """asyncbest.py demonstrate_all에서 사용하는 크롤러 데모"""
+
+    def __init__(self, max_pages: int = 200, concurrency: int = 20):
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+
+    async def async_web_crawler(self, start_url: Optional[str] = None) -> CrawlStats:
+        """start_url이 없으면 로컬 테스트 서버를 띄워서 크롤"""
+        if start_url is None:
+            # 서버 시작/종료는 블로킹(폴링, join)이라 스레드에서 실행
+            server = await asyncio.to_thread(TestServer().start)
+            try:
+                return await self.async_web_crawler(f"{server.base_url}/page/0")
+            finally:
+                await asyncio.to_thread(server.stop)
+
+        async with AsyncCrawler(max_concurrency=self.concurrency, max_pages=self.max_pages) as crawler:
+            stats = await crawler.crawl([start_url])
+        print(f"크롤 완료: {stats.pages}페이지, 오류 {stats.errors}, "
+              f"{stats.bytes / 1024:.0f}KB, 중복 링크 {stats.duplicates_skipped}개 건너뜀, "
+              f"{stats.seconds:.2f}초 ({stats.pages / stats.seconds:.0f} 페이지/초)")
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="커넥션 풀 비동기 크롤러 데모 + 벤치마크")
+    parser.add_argument("--pages", type=int, default=200, help="크롤할 최대 페이지 수")
+    parser.add_argument("--requests", type=int, default=2000, help="벤치마크 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005, help="테스트 서버 응답 지연 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    with TestServer(latency=args.latency) as server:
+        print("=== 크롤러 데모 (로컬 테스트 서버) ===")
+        example = WebCrawlerExample(max_pages=args.pages, concurrency=min(args.concurrency, 20))
+        stats = asyncio.run(example.async_web_crawler(f"{server.base_url}/page/0"))
+
+        print(f"\n=== 세션 공유 vs 요청마다 새 세션 ({args.requests}회, 동시 {args.concurrency}) ===")
+        rows = asyncio.run(benchmark_sessions(server.base_url, args.requests, args.concurrency))
+    print(f"{'mode':<12} {'req/s':>8} {'p50_ms':>8} {'p99_ms':>8} {'errors':>7}")
+    print("-" * 47)
+    for row in rows:
+        print(f"{row['mode']:<12} {row['req_per_sec']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8} {row['errors']:>7}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            crawl = {k: v for k, v in asdict(stats).items() if k != "results"}
+            json.dump({"crawl": crawl, "sessions": rows}, f, ensure_ascii=False, indent=2)
+        print(f"JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
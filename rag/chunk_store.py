@@ -0,0 +1,485 @@
+"""
+압축 컬럼형 청크 저장소 - 청크 텍스트는 디스크에 압축해 두고 검색된 청크만 풀기
+
+지금은 모든 청크가 메타데이터 dict를 가진 Document 객체로 메모리에 상주합니다.
+ChunkStore는 청크를 컬럼으로 나눠서:
+- 출처 ID / 블록 번호 / 블록 내 오프셋 / 길이 → 타입 배열 (청크당 16바이트)
+- 출처 경로 → 고유 문자열 테이블 (출처당 한 번)
+- 텍스트 → 여러 청크를 묶은 블록 단위로 zstd(없으면 zlib) 압축해 파일에 저장
+검색 결과로 나온 청크의 블록만 읽어 압축을 풀고, 풀린 블록은 LRU 캐시에 둡니다.
+
+파일 구조 (리틀 엔디언):
+    [8B magic "RAGCHNK\\0"][4B 포맷 버전][4B 헤더 길이][헤더 JSON (코덱, 개수, 출처 테이블)]
+    [uint32 source_ids][uint32 block_ids][uint32 starts][uint32 lengths][uint64 block_offsets]
+    [압축 블록들]
+
+사용법:
+python chunk_store.py                          # 20만 청크 메모리/조회 벤치마크
+python chunk_store.py --chunks 1000000 --block-kb 32 --codec zlib
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+import tracemalloc
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.retrievers import BaseRetriever
+    from langchain.schema import Document
+    from pydantic import ConfigDict
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b"RAGCHNK\0"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")  # magic, 포맷 버전, 헤더 길이
+_COLUMNS = ("source_ids", "block_ids", "starts", "lengths")
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _compressor(codec: str, level: int):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Missing required package: zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=level).compress
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, level)
+    raise ValueError(f"지원하지 않는 코덱: {codec}")
+
+
+def _decompressor(codec: str):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Missing required package: zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == "zlib":
+        return zlib.decompress
+    raise ValueError(f"지원하지 않는 코덱: {codec}")
+
+
+class ChunkStoreWriter:
+    """청크를 순서대로 받아 block_bytes 단위로 압축해 저장 (청크 ID = 추가 순서)"""
+
+    def __init__(self, path: str, codec: Optional[str] = None, level: int = 3,
+                 block_bytes: int = 32 * 1024):
+        self.path = Path(path)
+        self.codec = codec or default_codec()
+        self.block_bytes = block_bytes
+        self._compress = _compressor(self.codec, level)
+
+        self._columns = {name: array("I") for name in _COLUMNS}
+        self._block_offsets = array("Q", [0])
+        self._sources: Dict[str, int] = {}
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self.header: Optional[Dict] = None
+
+        # 압축 블록은 임시 파일에 먼저 쓰고, 닫을 때 헤더/배열 뒤에 이어 붙임
+        self._blocks_tmp = self.path.with_name(self.path.name + ".blocks.tmp")
+        self._blocks = open(self._blocks_tmp, "wb")
+
+    def __len__(self) -> int:
+        return len(self._columns["source_ids"])
+
+    def add(self, text: str, source: str = "") -> int:
+        """청크 하나 추가 → 청크 ID"""
+        data = text.encode("utf-8")
+        source_id = self._sources.setdefault(source, len(self._sources))
+        chunk_id = len(self)
+        self._columns["source_ids"].append(source_id)
+        self._columns["block_ids"].append(len(self._block_offsets) - 1)
+        self._columns["starts"].append(self._pending_size)
+        self._columns["lengths"].append(len(data))
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self.block_bytes:
+            self._flush_block()
+        return chunk_id
+
+    def add_documents(self, documents: Iterable[Document]) -> List[int]:
+        return [self.add(doc.page_content, doc.metadata.get("source", "")) for doc in documents]
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        compressed = self._compress(b"".join(self._pending))
+        self._blocks.write(compressed)
+        self._block_offsets.append(self._block_offsets[-1] + len(compressed))
+        self._pending = []
+        self._pending_size = 0
+
+    def close(self) -> Dict:
+        """남은 블록을 쓰고 최종 파일을 원자적으로 교체 → 헤더 dict"""
+        if self.header is not None:
+            return self.header
+        self._flush_block()
+        self._blocks.close()
+
+        sources = sorted(self._sources, key=self._sources.get)
+        header = {
+            "format_version": FORMAT_VERSION,
+            "codec": self.codec,
+            "count": len(self),
+            "block_count": len(self._block_offsets) - 1,
+            "block_bytes": self.block_bytes,
+            "compressed_bytes": self._block_offsets[-1],
+            "raw_bytes": sum(self._columns["lengths"]),
+            "sources": sources,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+                f.write(header_bytes)
+                for name in _COLUMNS:
+                    f.write(self._columns[name].tobytes())
+                f.write(self._block_offsets.tobytes())
+                with open(self._blocks_tmp, "rb") as blocks:
+                    while True:
+                        data = blocks.read(1 << 20)
+                        if not data:
+                            break
+                        f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            self._blocks_tmp.unlink(missing_ok=True)
+        self.header = header
+        return header
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._blocks.close()
+            self._blocks_tmp.unlink(missing_ok=True)
+
+
+def write_chunk_store(documents: Iterable[Document], path: str, **kwargs) -> Dict:
+    """Document 목록 → 청크 저장소 파일"""
+    with ChunkStoreWriter(path, **kwargs) as writer:
+        writer.add_documents(documents)
+    return writer.header
+
+
+class ChunkStore:
+    """
+    청크 저장소 리더
+
+    인덱스 컬럼(청크당 16바이트)과 출처 테이블만 메모리에 올리고,
+    압축 블록은 mmap으로 두었다가 필요한 블록만 풀어서 LRU 캐시에 보관합니다.
+    """
+
+    def __init__(self, path: str, cache_blocks: int = 64):
+        self.path = Path(path)
+        self.cache_blocks = cache_blocks
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        magic, version, header_len = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"청크 저장소 파일이 아닙니다: {self.path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 청크 저장소 버전: {version} (지원: {FORMAT_VERSION})")
+
+        offset = _PREAMBLE.size + header_len
+        self.header = json.loads(self._mmap[_PREAMBLE.size:offset].decode("utf-8"))
+        self.sources: List[str] = self.header["sources"]
+        self._decompress = _decompressor(self.header["codec"])
+
+        count = self.header["count"]
+        for name in _COLUMNS:
+            column = array("I")
+            column.frombytes(self._mmap[offset:offset + count * column.itemsize])
+            setattr(self, f"_{name}", column)
+            offset += count * column.itemsize
+        self._block_offsets = array("Q")
+        size = (self.header["block_count"] + 1) * self._block_offsets.itemsize
+        self._block_offsets.frombytes(self._mmap[offset:offset + size])
+        self._blocks_offset = offset + size
+
+        if self._blocks_offset + self._block_offsets[-1] > len(self._mmap):
+            raise ValueError(f"청크 저장소가 잘렸습니다: {self.path}")
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def _block(self, block_id: int) -> bytes:
+        with self._lock:
+            data = self._cache.get(block_id)
+            if data is not None:
+                self._cache.move_to_end(block_id)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        start = self._blocks_offset + self._block_offsets[block_id]
+        end = self._blocks_offset + self._block_offsets[block_id + 1]
+        data = self._decompress(self._mmap[start:end])
+
+        with self._lock:
+            self._cache[block_id] = data
+            while len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return data
+
+    def text(self, chunk_id: int) -> str:
+        block = self._block(self._block_ids[chunk_id])
+        start = self._starts[chunk_id]
+        return block[start:start + self._lengths[chunk_id]].decode("utf-8")
+
+    def source(self, chunk_id: int) -> str:
+        return self.sources[self._source_ids[chunk_id]]
+
+    def get(self, chunk_ids: Sequence[int]) -> List[Document]:
+        """청크 ID 목록 → Document (검색 결과 top-k에만 사용)"""
+        return [
+            Document(page_content=self.text(i), metadata={"source": self.source(i)})
+            for i in chunk_ids
+        ]
+
+    def resident_bytes(self) -> int:
+        """인덱스 컬럼 + 출처 테이블 + 캐시된 블록 크기 (추정치)"""
+        columns = sum(getattr(self, f"_{name}").itemsize * len(self) for name in _COLUMNS)
+        columns += self._block_offsets.itemsize * len(self._block_offsets)
+        sources = sum(len(s.encode("utf-8")) + 49 for s in self.sources)
+        with self._lock:
+            cached = sum(len(data) for data in self._cache.values())
+        return columns + sources + cached
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict:
+        h = self.header
+        return {
+            "chunks": len(self),
+            "blocks": h["block_count"],
+            "codec": h["codec"],
+            "raw_mb": round(h["raw_bytes"] / 1024 / 1024, 2),
+            "compressed_mb": round(h["compressed_bytes"] / 1024 / 1024, 2),
+            "ratio": round(h["raw_bytes"] / max(h["compressed_bytes"], 1), 2),
+            "cached_blocks": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+    def close(self):
+        self._cache.clear()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ChunkStoreRetriever(BaseRetriever):
+    """
+    벡터 행렬(행 번호 = 청크 ID)에서 코사인 top-k를 찾고 그 청크만 ChunkStore에서 풀어 반환
+
+    vectors는 IndexSnapshot.vectors처럼 mmap된 배열이어도 됩니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: ChunkStore
+    vectors: np.ndarray
+    embeddings: Embeddings
+    k: int = 3
+
+    def search_ids(self, query_vector: List[float], k: int) -> List[int]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        norms = np.linalg.norm(self.vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (self.vectors @ query) / np.where(norms == 0, 1.0, norms)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [int(i) for i in sorted(top, key=lambda i: -scores[i])]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.store.get(self.search_ids(self.embeddings.embed_query(query), self.k))
+
+
+def snapshot_to_chunk_store(snapshot, path: str, **kwargs) -> Dict:
+    """IndexSnapshot 레코드 → 청크 저장소 (청크 ID = 스냅샷 벡터 행 번호)"""
+    with ChunkStoreWriter(path, **kwargs) as writer:
+        for record in snapshot.records:
+            writer.add(record["text"], record["metadata"].get("source", ""))
+    return writer.header
+
+
+def synthetic_chunks(count: int, chunk_chars: int = 500, seed: int = 0) -> Iterable[Document]:
+    """docs/ 문장을 섞고 숫자를 끼워 넣은 합성 청크 (청크 50개 = 출처 파일 1개)"""
+    from rag_bench import load_corpus
+
+    sentences = [
+        line.strip()
+        for doc in load_corpus()
+        for line in doc.page_content.splitlines()
+        if line.strip()
+    ]
+    rng = random.Random(seed)
+    for i in range(count):
+        parts, size = [], 0
+        while size < chunk_chars:
+            sentence = f"{rng.choice(sentences)} ({rng.randrange(100000)})"
+            parts.append(sentence)
+            size += len(sentence) + 1
+        yield Document(
+            page_content=" ".join(parts)[:chunk_chars],
+            metadata={"source": f"synthetic/doc_{i // 50:06d}.txt"},
+        )
+
+
+def _fetch_latency(store: ChunkStore, k: int, rounds: int, cold: bool, seed: int = 0) -> float:
+    """무작위 top-k ID 묶음을 풀어오는 평균 시간 (초)"""
+    rng = random.Random(seed)
+    total = 0.0
+    for _ in range(rounds):
+        ids = rng.sample(range(len(store)), k)
+        if cold:
+            store.clear_cache()
+        start = time.perf_counter()
+        store.get(ids)
+        total += time.perf_counter() - start
+    return total / rounds
+
+
+def benchmark(chunks: int, chunk_chars: int, block_kb: int, codec: Optional[str],
+              cache_blocks: int, k: int, rounds: int, path: str) -> Dict:
+    print(f"📦 합성 청크 {chunks:,}개 (청크당 {chunk_chars}자) 생성 중...")
+    tracemalloc.start()
+    documents = list(synthetic_chunks(chunks, chunk_chars))
+    documents_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    with ChunkStoreWriter(path, codec=codec, block_bytes=block_kb * 1024) as writer:
+        writer.add_documents(documents)
+    write_seconds = time.perf_counter() - start
+    del documents
+
+    tracemalloc.start()
+    store = ChunkStore(path, cache_blocks=cache_blocks)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    try:
+        cold = _fetch_latency(store, k, rounds, cold=True)
+        warm_ids = [random.Random(1).sample(range(len(store)), k)]
+        store.get(warm_ids[0])
+        start = time.perf_counter()
+        for _ in range(rounds):
+            store.get(warm_ids[0])
+        warm = (time.perf_counter() - start) / rounds
+        cached_bytes = store.resident_bytes()
+        stats = store.stats()
+    finally:
+        store.close()
+
+    per_million = 1_000_000 / chunks
+    result = {
+        **stats,
+        "file_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+        "write_seconds": round(write_seconds, 2),
+        "documents_mb": round(documents_bytes / 1024 / 1024, 1),
+        "store_mb": round(store_bytes / 1024 / 1024, 2),
+        "store_with_cache_mb": round(cached_bytes / 1024 / 1024, 2),
+        "documents_mb_per_million": round(documents_bytes * per_million / 1024 / 1024, 1),
+        "store_mb_per_million": round(store_bytes * per_million / 1024 / 1024, 1),
+        "memory_reduction": round(documents_bytes / max(store_bytes, 1), 1),
+        f"fetch_top{k}_cold_us": round(cold * 1e6, 1),
+        f"fetch_top{k}_warm_us": round(warm * 1e6, 1),
+    }
+
+    print(f"\n{'':<22} {'Document 목록':>14} {'ChunkStore':>12}")
+    print("-" * 50)
+    print(f"{'메모리 (MB)':<22} {result['documents_mb']:>14} {result['store_mb']:>12}")
+    print(f"{'100만 청크당 (MB)':<22} {result['documents_mb_per_million']:>14} "
+          f"{result['store_mb_per_million']:>12}")
+    print(f"\n💾 파일 {result['file_mb']}MB ({stats['codec']}, 원본 {stats['raw_mb']}MB, "
+          f"압축률 {stats['ratio']}x, 블록 {stats['blocks']:,}개), 쓰기 {result['write_seconds']}초")
+    print(f"📉 메모리 {result['memory_reduction']}배 감소 "
+          f"(캐시 {cache_blocks}블록 포함 시 {result['store_with_cache_mb']}MB)")
+    print(f"⏱️  top-{k} 텍스트 조회: 콜드 {result[f'fetch_top{k}_cold_us']}µs, "
+          f"캐시 히트 {result[f'fetch_top{k}_warm_us']}µs")
+    return result
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="압축 컬럼형 청크 저장소 벤치마크")
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--chunk-chars", type=int, default=500)
+    parser.add_argument("--block-kb", type=int, default=32, help="압축 블록 크기 (KB)")
+    parser.add_argument("--codec", choices=["zstd", "zlib"], help=f"기본: {default_codec()}")
+    parser.add_argument("--cache-blocks", type=int, default=64, help="풀린 블록 LRU 캐시 크기")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--path", default="chunks.ragchunk")
+    parser.add_argument("--keep", action="store_true", help="벤치마크 후 파일 유지")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("🚀 압축 청크 저장소 벤치마크\n")
+    try:
+        result = benchmark(args.chunks, args.chunk_chars, args.block_kb, args.codec,
+                           args.cache_blocks, args.k, args.rounds, args.path)
+    finally:
+        if not args.keep:
+            Path(args.path).unlink(missing_ok=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 JSON 저장: {args.json_path}")
+    print("\n✅ 벤치마크 완료!")
+
+
+if __name__ == "__main__":
+    main()
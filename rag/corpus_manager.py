@@ -0,0 +1,418 @@
+"""
+코퍼스 상주 관리자 - 한 프로세스에서 여러 테넌트 코퍼스를 메모리 예산 안에서 서비스
+
+SmartRAGSystem은 벡터스토어를 제한 없이 들고 있어서 테넌트마다 프로세스를 하나씩 띄웠습니다.
+CorpusResidencyManager는:
+- 이름으로 등록된 코퍼스(문서 디렉토리 또는 인덱스 스냅샷)를 첫 요청 때 로드
+- 모든 코퍼스가 하나의 임베딩 캐시(SharedEmbeddingCache)를 공유
+- 코퍼스마다 로드할 때 크기(벡터 바이트 + 텍스트 바이트 + 청크당 오버헤드)를 기록하고,
+  상주 코퍼스 크기 합이 예산(또는 상주 개수 상한)을 넘으면 가장 오래 사용하지 않은(LRU) 인덱스부터 내림
+  (use()/retrieve()로 사용 중인 코퍼스는 고정되어 축출하지 않음)
+- 로드/히트/축출 횟수 리포트
+
+사용법:
+python corpus_manager.py --tenants 20 --tenant-kb 100 --requests 300 --budget-mb 2
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from langchain_community.document_loaders import TextLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain_chroma import Chroma
+    from langchain_core.embeddings import Embeddings
+    from langchain.schema import Document
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+from index_snapshot import IndexSnapshot, embedding_model_id
+
+# 청크당 벡터/텍스트 외에 저장소가 들고 있는 ID, 메타데이터, HNSW 링크 등의 대략적인 크기
+CHUNK_OVERHEAD_BYTES = 512
+
+
+def corpus_bytes(chunks: int, dim: int, text_bytes: int) -> int:
+    """상주 코퍼스 크기 추정치 (float32 벡터 + UTF-8 텍스트 + 청크당 오버헤드)"""
+    return chunks * (dim * 4 + CHUNK_OVERHEAD_BYTES) + text_bytes
+
+
+def current_rss_bytes() -> int:
+    """현재 프로세스 RSS (psutil → /proc → 최대 RSS 순으로 시도)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        # ru_maxrss는 최대값이라 줄어들지 않음 (Linux: KB 단위)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SharedEmbeddingCache(Embeddings):
+    """여러 코퍼스가 공유하는 LRU 임베딩 캐시 (벡터는 float32 array로 저장해 메모리 절약)"""
+
+    def __init__(self, embeddings: Embeddings, max_entries: int = 100_000):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        # 스냅샷의 모델 ID 검사가 캐시를 거쳐도 통과하도록 원래 모델 ID를 노출
+        self.model = embedding_model_id(embeddings)
+        self._cache: "OrderedDict[bytes, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _lookup(self, key: bytes) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return vector.tolist()
+
+    def _store(self, key: bytes, vector: List[float]):
+        with self._lock:
+            self._cache[key] = array("f", vector)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [self._lookup(key) for key in keys]
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, vectors):
+                self._store(keys[i], vector)
+                results[i] = vector
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class _ResidentCorpus:
+    def __init__(self, vectorstore: Chroma, size: int):
+        self.vectorstore = vectorstore
+        self.size = size  # corpus_bytes() 추정치
+        self.pins = 0  # use() 중인 수 (0보다 크면 축출하지 않음)
+
+
+class CorpusResidencyManager:
+    """이름으로 등록된 코퍼스를 요청 시 로드하고, 상주 크기 예산 초과 시 LRU 축출"""
+
+    def __init__(self, embeddings: Embeddings, budget_mb: float = 1024,
+                 max_resident: Optional[int] = None,
+                 chunk_size: int = 1000, chunk_overlap: int = 200,
+                 cache_entries: int = 100_000):
+        """
+        Args:
+            embeddings: 모든 코퍼스가 공유할 임베딩 (SharedEmbeddingCache로 감쌈)
+            budget_mb: 상주 코퍼스 크기(corpus_bytes 추정치) 합의 상한 (MB)
+            max_resident: 동시에 상주할 코퍼스 수 상한 (None이면 제한 없음)
+        """
+        self.embeddings = SharedEmbeddingCache(embeddings, max_entries=cache_entries)
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.max_resident = max_resident
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+        )
+
+        self._sources: Dict[str, Dict] = {}
+        self._resident: "OrderedDict[str, _ResidentCorpus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self.resident_bytes = 0
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.over_budget = 0  # 고정된 코퍼스만 남아 예산을 맞추지 못한 횟수
+        self.load_time = 0.0
+
+    def register(self, name: str, docs_path: Optional[str] = None,
+                 snapshot_path: Optional[str] = None):
+        """코퍼스 등록 (문서 디렉토리 또는 index_snapshot 파일 중 하나)"""
+        if (docs_path is None) == (snapshot_path is None):
+            raise ValueError("docs_path와 snapshot_path 중 하나만 지정해야 합니다")
+        with self._lock:
+            self._sources[name] = {"docs_path": docs_path, "snapshot_path": snapshot_path}
+            self._load_locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _collection_name(name: str) -> str:
+        # Chroma 컬렉션 이름은 [a-zA-Z0-9._-]만 허용하므로 테넌트 이름을 해시
+        return "corpus_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+
+    def _load_documents(self, docs_path: str) -> List[Document]:
+        documents = []
+        for txt_file in sorted(Path(docs_path).rglob("*.txt")):
+            documents.extend(TextLoader(str(txt_file), encoding='utf-8').load())
+        return documents
+
+    def _load(self, name: str) -> _ResidentCorpus:
+        source = self._sources[name]
+        collection_name = self._collection_name(name)
+        if source["snapshot_path"]:
+            with IndexSnapshot(source["snapshot_path"]) as snapshot:
+                vectorstore = snapshot.to_chroma(self.embeddings, collection_name=collection_name)
+                text_bytes = sum(len(r["text"].encode("utf-8")) for r in snapshot.records)
+                size = corpus_bytes(snapshot.manifest["count"], snapshot.manifest["dim"], text_bytes)
+            return _ResidentCorpus(vectorstore, size)
+
+        chunks = self.text_splitter.split_documents(self._load_documents(source["docs_path"]))
+        vectorstore = Chroma.from_documents(
+            documents=chunks,
+            embedding=self.embeddings,
+            collection_name=collection_name,
+        )
+        # 방금 임베딩한 청크라 공유 캐시에서 바로 나옴 (추가 임베딩 호출 없음)
+        dim = len(self.embeddings.embed_documents([chunks[0].page_content])[0]) if chunks else 0
+        text_bytes = sum(len(chunk.page_content.encode("utf-8")) for chunk in chunks)
+        return _ResidentCorpus(vectorstore, corpus_bytes(len(chunks), dim, text_bytes))
+
+    def _hit(self, name: str, pin: bool) -> Optional[_ResidentCorpus]:
+        """상주 중이면 LRU 갱신 (+ 고정). self._lock 안에서 호출"""
+        resident = self._resident.get(name)
+        if resident is not None:
+            self._resident.move_to_end(name)
+            self.hits += 1
+            resident.pins += pin
+        return resident
+
+    def _acquire(self, name: str, pin: bool) -> _ResidentCorpus:
+        with self._lock:
+            if name not in self._sources:
+                raise KeyError(f"등록되지 않은 코퍼스: {name}")
+            resident = self._hit(name, pin)
+            if resident is not None:
+                return resident
+            load_lock = self._load_locks[name]
+
+        # 같은 코퍼스를 동시에 두 번 로드하지 않도록 코퍼스별 잠금
+        with load_lock:
+            with self._lock:
+                resident = self._hit(name, pin)
+                if resident is not None:
+                    return resident
+
+            start = time.perf_counter()
+            resident = self._load(name)
+
+            with self._lock:
+                self._resident[name] = resident
+                self.resident_bytes += resident.size
+                resident.pins += pin
+                self.loads += 1
+                self.load_time += time.perf_counter() - start
+            self._enforce_budget(keep=name)
+            return resident
+
+    def get(self, name: str) -> Chroma:
+        """
+        코퍼스 벡터스토어 반환 (상주하지 않으면 로드)
+
+        반환된 벡터스토어는 고정되지 않아 다른 코퍼스를 로드할 때 축출될 수 있습니다.
+        질의하는 동안 축출을 막으려면 use()를 쓰세요.
+        """
+        return self._acquire(name, pin=False).vectorstore
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Chroma]:
+        """with 블록 동안 코퍼스를 고정 (축출 대상에서 제외)"""
+        resident = self._acquire(name, pin=True)
+        try:
+            yield resident.vectorstore
+        finally:
+            with self._lock:
+                resident.pins -= 1
+
+    def retrieve(self, name: str, query: str, k: int = 3) -> List[Document]:
+        with self.use(name) as vectorstore:
+            return vectorstore.similarity_search(query, k=k)
+
+    def evict(self, name: str) -> bool:
+        """코퍼스를 메모리에서 내림 (등록은 유지). 상주하지 않거나 사용 중이면 False"""
+        return self._evict(name, blocking=True)
+
+    def _evict(self, name: str, blocking: bool) -> bool:
+        with self._lock:
+            load_lock = self._load_locks.get(name)
+        # 같은 이름으로 다시 로드하는 중에 컬렉션을 지우지 않도록 코퍼스별 잠금을 쥐고 삭제
+        if load_lock is None or not load_lock.acquire(blocking=blocking):
+            return False
+        try:
+            with self._lock:
+                resident = self._resident.get(name)
+                if resident is None or resident.pins:
+                    return False
+                del self._resident[name]
+                self.resident_bytes -= resident.size
+                self.evictions += 1
+            resident.vectorstore.delete_collection()
+            return True
+        finally:
+            load_lock.release()
+
+    def _within_budget(self) -> bool:
+        with self._lock:
+            return self.resident_bytes <= self.budget and (
+                self.max_resident is None or len(self._resident) <= self.max_resident
+            )
+
+    def _enforce_budget(self, keep: str):
+        """
+        상주 코퍼스 크기 합(또는 개수)이 예산을 넘으면 고정되지 않은 코퍼스를 LRU부터 축출
+
+        keep(방금 로드한 코퍼스)의 잠금을 쥔 채 호출되므로, 다른 코퍼스의 잠금은 기다리지 않고
+        지금 로드 중인 코퍼스는 건너뜁니다. 고정된 코퍼스만 남아 예산을 맞추지 못하면 over_budget 집계.
+        """
+        with self._lock:
+            victims = [name for name, resident in self._resident.items()
+                       if name != keep and not resident.pins]
+        for name in victims:
+            if self._within_budget():
+                return
+            self._evict(name, blocking=False)
+        if not self._within_budget():
+            with self._lock:
+                self.over_budget += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            resident = list(self._resident)
+            resident_bytes = self.resident_bytes
+        return {
+            "registered": len(self._sources),
+            "resident": len(resident),
+            "resident_mb": round(resident_bytes / 1024 / 1024, 2),
+            "budget_mb": round(self.budget / 1024 / 1024, 2),
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "over_budget": self.over_budget,
+            "load_time_s": round(self.load_time, 3),
+            "rss_mb": round(current_rss_bytes() / 1024 / 1024, 1),
+            "embedding_cache": self.embeddings.stats(),
+            "resident_corpora": resident,
+        }
+
+
+def make_synthetic_tenants(base: Path, tenants: int, size_kb: int, docs_path: str,
+                           rng: random.Random) -> List[str]:
+    """
+    테넌트별 합성 코퍼스 생성 - docs/ 문단을 섞고 테넌트 고유 문단을 더해서
+    일부 청크는 테넌트끼리 겹치고(공유 캐시 히트) 나머지는 고유하게 만듦
+    """
+    paragraphs = []
+    for txt_file in sorted(Path(docs_path).rglob("*.txt")):
+        paragraphs.extend(p.strip() for p in txt_file.read_text(encoding='utf-8').split("\n\n") if p.strip())
+
+    names = []
+    for i in range(tenants):
+        name = f"tenant-{i:03d}"
+        tenant_dir = base / name
+        tenant_dir.mkdir(parents=True)
+        parts = list(paragraphs)
+        size = sum(len(p) for p in parts)
+        while size < size_kb * 1024:
+            paragraph = f"{name} 내부 메모 {rng.randrange(10**9)}: " + rng.choice(paragraphs)
+            parts.append(paragraph)
+            size += len(paragraph)
+        (tenant_dir / "corpus.txt").write_text("\n\n".join(parts), encoding='utf-8')
+        names.append(name)
+    return names
+
+
+def main():
+    """여러 테넌트 코퍼스를 zipf 분포로 접근하며 로드/히트/축출 시뮬레이션"""
+    import shutil
+    import tempfile
+    from local_models import HashEmbeddings
+
+    parser = argparse.ArgumentParser(description="코퍼스 상주 관리자 데모")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--tenant-kb", type=int, default=100, help="테넌트당 합성 코퍼스 크기 (KB)")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--budget-mb", type=float, default=2.0, help="상주 코퍼스 크기 예산 (MB)")
+    parser.add_argument("--max-resident", type=int, help="동시에 상주할 코퍼스 수 상한")
+    parser.add_argument("--docs", default="docs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("🚀 코퍼스 상주 관리자 데모\n")
+
+    rng = random.Random(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="corpus_manager_"))
+    try:
+        tenants = make_synthetic_tenants(workdir, args.tenants, args.tenant_kb, args.docs, rng)
+        manager = CorpusResidencyManager(HashEmbeddings(), budget_mb=args.budget_mb,
+                                         max_resident=args.max_resident)
+        for tenant in tenants:
+            manager.register(tenant, docs_path=str(workdir / tenant))
+
+        # 대부분의 요청이 소수 테넌트에 몰리는 zipf 분포
+        weights = [1 / (rank + 1) for rank in range(len(tenants))]
+        questions = ["RSI 지표는 어떻게 사용하나요?", "손절매 설정 방법", "회사의 비전", "추세 추종 전략"]
+
+        start = time.perf_counter()
+        peak_bytes = 0
+        for _ in range(args.requests):
+            tenant = rng.choices(tenants, weights=weights)[0]
+            manager.retrieve(tenant, rng.choice(questions))
+            peak_bytes = max(peak_bytes, manager.resident_bytes)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = manager.stats()
+    print(f"📊 테넌트 {args.tenants}개 x {args.tenant_kb}KB, 요청 {args.requests}개, {elapsed:.2f}초")
+    print(f"   상주: {stats['resident']}/{stats['registered']}개, {stats['resident_mb']}MB "
+          f"(최대 {peak_bytes / 1024 / 1024:.2f}MB, 예산 {stats['budget_mb']}MB), "
+          f"프로세스 RSS: {stats['rss_mb']}MB")
+    print(f"   로드: {stats['loads']}회, 히트: {stats['hits']}회, 축출: {stats['evictions']}회 "
+          f"(로드 시간 합계 {stats['load_time_s']}초), 축출 후에도 예산 초과: {stats['over_budget']}회")
+    print(f"   임베딩 캐시: {stats['embedding_cache']}")
+    # 요청 사이에는 고정된 코퍼스가 없으므로 상주 크기는 항상 예산 안이어야 함
+    if peak_bytes > manager.budget or stats["over_budget"]:
+        raise SystemExit("❌ 상주 코퍼스 크기가 예산을 넘었습니다")
+    print("\n✅ 데모 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+헤지(hedged) + 데드라인 호출 - LLM/임베딩 호출의 꼬리 지연시간(tail latency) 줄이기
+
+qa_chain.invoke의 꼬리 지연시간은 가끔 느린 프로바이더 응답이 좌우합니다.
+- 데드라인: 호출마다 최대 대기 시간, 넘으면 모든 시도를 취소하고 TimeoutError
+- 헤징: 첫 시도가 관측된 지연시간 백분위(기본 p90) 안에 끝나지 않으면 같은 요청을 한 번 더 보내고
+  먼저 끝난 쪽을 사용, 나머지는 취소 (async.py example4_wait_timeout 패턴)
+- 헤지 예산: 중복 요청 비율이 설정한 퍼센트를 넘지 않도록 제한
+  (헤지 시점 백분위 밖의 비율(100 - 백분위)%보다 넉넉하게 잡아야 느린 호출을 모두 헤지할 수 있음)
+
+사용법:
+python hedged_calls.py   # 지연시간을 주입한 로컬 가짜 서버로 헤징 전/후 비교
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+from stats_util import percentile
+
+
+class HedgedCaller:
+    """데드라인 + p95 기반 헤징 호출기"""
+
+    def __init__(self, deadline: float = 30.0, hedge: bool = True,
+                 hedge_quantile: float = 90, budget_pct: float = 15.0,
+                 min_samples: int = 20, window: int = 1000):
+        """
+        Args:
+            deadline: 호출당 최대 대기 시간 (초)
+            hedge: 헤징 사용 여부
+            hedge_quantile: 이 백분위 지연시간이 지나도 응답이 없으면 헤지 요청 전송
+                (느린 응답 비율보다 낮은 백분위여야 헤지 시점이 느린 응답 쪽에 걸리지 않음)
+            budget_pct: 전체 호출 대비 헤지 요청 비율 상한 (%)
+            min_samples: 헤징을 시작하기 전 필요한 최소 지연시간 샘플 수
+            window: 지연시간 추정에 사용하는 최근 샘플 수
+        """
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.budget_pct = budget_pct
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=window)
+
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤지 요청을 보낼 시점 (샘플이 부족하면 None)"""
+        if not self.hedge or len(self.latencies) < self.min_samples:
+            return None
+        return percentile(list(self.latencies), self.hedge_quantile)
+
+    def _budget_allows(self) -> bool:
+        return (self.hedges_sent + 1) <= self.calls * self.budget_pct / 100
+
+    def _start_attempt(self, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        started = time.perf_counter()
+        task = asyncio.create_task(fn())
+
+        def record(t: asyncio.Task):
+            # 취소/실패한 시도는 지연시간 분포에 넣지 않음
+            if not t.cancelled() and t.exception() is None:
+                self.latencies.append(time.perf_counter() - started)
+
+        task.add_done_callback(record)
+        return task
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> Any:
+        """
+        fn()으로 만든 코루틴을 데드라인/헤징을 적용해 실행
+
+        Args:
+            fn: 호출마다 새 코루틴을 만드는 함수 (헤지 시 두 번 호출됨)
+            deadline: 이 호출에만 적용할 데드라인 (None이면 기본값)
+        """
+        deadline = self.deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline
+        self.calls += 1
+
+        primary = self._start_attempt(fn)
+        hedge = None
+        attempts = {primary}
+        last_error: Optional[BaseException] = None
+
+        try:
+            delay = self.hedge_delay()
+            if delay is not None and delay < deadline:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    if self._budget_allows():
+                        hedge = self._start_attempt(fn)
+                        attempts.add(hedge)
+                        self.hedges_sent += 1
+                    else:
+                        self.budget_denied += 1
+
+            while attempts:
+                remaining = expires - loop.time()
+                done, _ = await asyncio.wait(attempts, timeout=max(remaining, 0),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError(f"{deadline:.3f}초 데드라인 초과")
+
+                for task in done:
+                    attempts.discard(task)
+                    if task.exception() is not None:
+                        # 다른 시도가 남아 있으면 그 결과를 기다림
+                        last_error = task.exception()
+                        continue
+                    if task is hedge:
+                        self.hedge_wins += 1
+                    else:
+                        self.primary_wins += 1
+                    return task.result()
+
+            self.errors += 1
+            raise last_error
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        """헤징 메트릭"""
+        return {
+            "calls": self.calls,
+            "hedges_sent": self.hedges_sent,
+            "hedge_rate_pct": round(100 * self.hedges_sent / self.calls, 2) if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "budget_denied": self.budget_denied,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "hedge_delay_ms": round((self.hedge_delay() or 0.0) * 1000, 2),
+        }
+
+
+def _run_sync(coro: Awaitable) -> Any:
+    """동기 래퍼용 - 이미 이벤트 루프가 실행 중인 스레드에서는 별도 스레드의 새 루프에서 실행"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class HedgedQAChain:
+    """qa_chain.ainvoke를 HedgedCaller로 감싼 체인"""
+
+    def __init__(self, qa_chain, caller: Optional[HedgedCaller] = None):
+        self.qa_chain = qa_chain
+        self.caller = caller or HedgedCaller()
+
+    async def ainvoke(self, inputs: Dict) -> Dict:
+        return await self.caller.call(lambda: self.qa_chain.ainvoke(inputs))
+
+    def invoke(self, inputs: Dict) -> Dict:
+        return _run_sync(self.ainvoke(inputs))
+
+
+class HedgedEmbeddings(Embeddings):
+    """임베딩 호출에 데드라인/헤징 적용 (비동기 메서드 기준, 동기 메서드는 _run_sync)"""
+
+    def __init__(self, embeddings: Embeddings, caller: Optional[HedgedCaller] = None):
+        self.embeddings = embeddings
+        self.caller = caller or HedgedCaller()
+        self.model = getattr(embeddings, "model", type(embeddings).__name__)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.caller.call(lambda: self.embeddings.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.caller.call(lambda: self.embeddings.aembed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return _run_sync(self.aembed_documents(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return _run_sync(self.aembed_query(text))
+
+
+class FakeProviderServer:
+    """지연시간을 주입한 로컬 가짜 프로바이더 (JSON 한 줄 요청/응답 TCP 서버)"""
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.005,
+                 slow_prob: float = 0.05, slow_latency: float = 0.5,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_prob = slow_prob
+        self.slow_latency = slow_latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.cancelled = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._handlers: set = set()
+
+    def _sample_latency(self) -> float:
+        if random.random() < self.slow_prob:
+            return self.slow_latency
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.requests += 1
+        self._handlers.add(asyncio.current_task())
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            payload = json.loads(line)
+            # 클라이언트가 연결을 끊으면(취소) 즉시 알 수 있도록 읽기와 경쟁
+            disconnected = asyncio.create_task(reader.read(1))
+            work = asyncio.create_task(asyncio.sleep(self._sample_latency()))
+            done, _ = await asyncio.wait({disconnected, work}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                work.cancel()
+                self.cancelled += 1
+                return
+            disconnected.cancel()
+            writer.write(json.dumps({"result": f"응답: {payload.get('query', '')}"},
+                                    ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # 연결 핸들러 최상위라 취소를 전파할 곳이 없음 (서버 종료 시)
+            self.cancelled += 1
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def start(self) -> "FakeProviderServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for handler in list(self._handlers):
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def request(self, query: str) -> str:
+        """클라이언트 요청 - 취소되면 연결을 닫아 서버 작업도 중단시킴"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(json.dumps({"query": query}, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("서버가 응답 없이 연결을 닫음")
+            return json.loads(line)["result"]
+        finally:
+            writer.close()
+
+
+async def run_load(server: FakeProviderServer, caller: Optional[HedgedCaller],
+                   requests: int, concurrency: int) -> List[float]:
+    """동시성 concurrency로 requests개 호출, 호출별 지연시간 반환"""
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with sem:
+            start = time.perf_counter()
+            try:
+                if caller is None:
+                    await server.request(f"질문 {i}")
+                else:
+                    await caller.call(lambda: server.request(f"질문 {i}"))
+            except asyncio.TimeoutError:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return latencies
+
+
+def print_latencies(label: str, latencies: List[float]):
+    print(f"{label:<12} p50={percentile(latencies, 50) * 1000:7.1f}ms  "
+          f"p95={percentile(latencies, 95) * 1000:7.1f}ms  "
+          f"p99={percentile(latencies, 99) * 1000:7.1f}ms  "
+          f"max={max(latencies) * 1000:7.1f}ms")
+
+
+async def demo(args):
+    server = await FakeProviderServer(latency=args.latency, slow_prob=args.slow_prob,
+                                      slow_latency=args.slow_latency).start()
+    print(f"🖥️  가짜 프로바이더: 127.0.0.1:{server.port} "
+          f"(기본 {args.latency * 1000:.0f}ms, {args.slow_prob:.0%} 확률로 {args.slow_latency * 1000:.0f}ms)\n")
+    try:
+        baseline = await run_load(server, None, args.requests, args.concurrency)
+        print_latencies("헤징 없음", baseline)
+
+        caller = HedgedCaller(deadline=args.deadline, hedge_quantile=args.hedge_quantile,
+                              budget_pct=args.budget)
+        # 지연시간 분포 워밍업 (헤지 시점 추정용)
+        await run_load(server, caller, caller.min_samples * 2, args.concurrency)
+        hedged = await run_load(server, caller, args.requests, args.concurrency)
+        print_latencies("헤징 사용", hedged)
+
+        print(f"\n📊 헤징 메트릭: {json.dumps(caller.stats(), ensure_ascii=False)}")
+        print(f"🛑 서버에서 취소된 요청: {server.cancelled}개")
+    finally:
+        await server.stop()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="헤지 + 데드라인 호출 데모")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="기본 응답 지연 (초)")
+    parser.add_argument("--slow-prob", type=float, default=0.05, help="느린 응답 확률")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="느린 응답 지연 (초)")
+    parser.add_argument("--hedge-quantile", type=float, default=90, help="헤지 시점 백분위")
+    parser.add_argument("--budget", type=float, default=15.0, help="헤지 예산 (%%)")
+    parser.add_argument("--deadline", type=float, default=2.0, help="호출 데드라인 (초)")
+    args = parser.parse_args()
+
+    print("🚀 헤지 + 데드라인 호출 데모\n")
+    asyncio.run(demo(args))
+    print("\n✅ 데모 완료!")
+
+
+if __name__ == "__main__":
+    main()
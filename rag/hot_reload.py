@@ -0,0 +1,355 @@
+"""
+무중단 핫 리로드 - doc_metadata.json / 문서 변경 시 셀렉터와 인덱스를 백그라운드에서 재구성
+
+SmartDocumentSelector는 __init__에서 메타데이터를 한 번만 읽기 때문에
+카테고리/문서를 추가하려면 재시작이 필요했습니다.
+
+동작 방식:
+1. 감시 스레드가 메타데이터 파일과 문서 파일의 (mtime, size)를 주기적으로 폴링
+2. 변경이 감지되면 debounce 시간 동안 추가 변경이 없을 때까지 대기 (저장 도중 읽기 방지)
+3. 새 셀렉터 + 변경된 카테고리의 인덱스만 백그라운드에서 재구성 (나머지는 재사용)
+4. 현재 세대(generation) 참조를 원자적으로 교체 (더블 버퍼링)
+5. 이전 세대는 진행 중인 질의가 모두 끝난 뒤 정리
+
+사용법:
+python hot_reload.py   # 임시 복사본에서 메타데이터를 수정하며 리로드 데모 실행
+"""
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from langchain_chroma import Chroma
+    from langchain.chains import RetrievalQA
+    from langchain.retrievers import MergerRetriever
+    from langchain.schema import Document
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+from rag_smart import SmartDocumentSelector, SmartRAGSystem
+
+
+def file_fingerprint(path: Path) -> Optional[Tuple[int, int]]:
+    """파일 변경 감지용 (mtime_ns, size), 파일이 없으면 None"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IndexGeneration:
+    """한 시점의 셀렉터 + 카테고리별 인덱스 (교체 단위, 생성 후 변경하지 않음)"""
+
+    def __init__(self, version: int, selector: SmartDocumentSelector,
+                 indexes: Dict[str, Chroma], fingerprints: Dict[str, tuple]):
+        self.version = version
+        self.selector = selector
+        self.indexes = indexes
+        self.fingerprints = fingerprints
+        self._in_flight = 0
+        self._retired = False
+        self._keep: set = set()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            should_close = self._retired and self._in_flight == 0
+        if should_close:
+            self._close()
+
+    def retire(self, keep: set):
+        """교체된 세대 표시 - keep에 있는 인덱스(다음 세대가 재사용)는 정리하지 않음"""
+        with self._lock:
+            self._retired = True
+            self._keep = keep
+            should_close = self._in_flight == 0
+        if should_close:
+            self._close()
+
+    def _close(self):
+        for index in self.indexes.values():
+            if id(index) not in self._keep:
+                index.delete_collection()
+
+
+class HotReloadingRAG:
+    """doc_metadata.json과 문서 변경을 감시하며 무중단으로 인덱스를 교체하는 RAG"""
+
+    def __init__(self, rag: SmartRAGSystem, metadata_path: str = "docs/doc_metadata.json",
+                 poll_interval: float = 1.0, debounce: float = 0.5, k: int = 3):
+        self.rag = rag
+        self.metadata_path = Path(metadata_path)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.k = k
+
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # 재구성은 한 번에 하나만 (감시 스레드와 reload_now 호출자)
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._version = 0
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+
+        self._current = self._build_generation(previous=None)
+
+    # ---------- 인덱스 구성 ----------
+
+    def _category_fingerprint(self, selector: SmartDocumentSelector, category: str) -> tuple:
+        """카테고리의 파일 목록 + 각 파일의 (mtime, size)"""
+        files = selector.metadata['categories'][category]['files']
+        return tuple(
+            (file, file_fingerprint(self.rag.docs_base_path / file)) for file in files
+        )
+
+    def _build_index(self, selector: SmartDocumentSelector, category: str, version: int) -> Optional[Chroma]:
+        paths = selector.get_document_paths([category], str(self.rag.docs_base_path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = self.rag.load_documents(paths)
+        if not documents:
+            return None
+        for doc in documents:
+            doc.metadata["category"] = category
+        chunks = self.rag.text_splitter.split_documents(documents)
+        # 세대별 컬렉션 이름을 달리해서 서비스 중인 인덱스와 충돌하지 않게 함
+        return Chroma.from_documents(
+            documents=chunks,
+            embedding=self.rag.embeddings,
+            collection_name=f"hot_{category}_v{version}",
+        )
+
+    def _build_generation(self, previous: Optional[IndexGeneration]) -> IndexGeneration:
+        """
+        새 세대 생성 - 파일 목록/내용이 바뀌지 않은 카테고리는 이전 인덱스 재사용
+
+        도중에 실패하면 이번에 새로 만든 컬렉션을 지우고 예외를 다시 발생시킵니다.
+        """
+        self._version += 1
+        version = self._version
+        with contextlib.redirect_stdout(io.StringIO()):
+            selector = SmartDocumentSelector(str(self.metadata_path))
+
+        indexes = {}
+        fingerprints = {}
+        built: List[Chroma] = []
+        try:
+            for category in selector.metadata['categories']:
+                fingerprint = self._category_fingerprint(selector, category)
+                fingerprints[category] = fingerprint
+                if (previous is not None and previous.fingerprints.get(category) == fingerprint
+                        and category in previous.indexes):
+                    indexes[category] = previous.indexes[category]
+                    continue
+                index = self._build_index(selector, category, version)
+                if index is not None:
+                    built.append(index)
+                    indexes[category] = index
+        except BaseException:
+            for index in built:
+                index.delete_collection()
+            raise
+
+        return IndexGeneration(version, selector, indexes, fingerprints)
+
+    def reload_now(self) -> bool:
+        """
+        즉시 재구성 후 교체, 실패하면 기존 세대를 유지하고 False 반환
+
+        재구성 전체를 _reload_lock으로 직렬화해서 동시에 호출돼도 각 재구성이 직전 세대를 기준으로
+        인덱스를 재사용하고, 교체된 세대가 아직 쓰이는 인덱스를 지우지 않게 합니다.
+        """
+        with self._reload_lock:
+            previous = self._current
+            try:
+                generation = self._build_generation(previous)
+            except Exception as e:
+                # 편집 중인 메타데이터, 잘못된 설정으로 인덱스 생성 실패 등 - 감시 스레드는 살려두고
+                # 다음 변경 때 다시 시도
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️  리로드 실패 (v{previous.version} 유지): {self.last_error}")
+                return False
+
+            with self._swap_lock:
+                self._current = generation
+            previous.retire(keep={id(index) for index in generation.indexes.values()})
+
+            self.reload_count += 1
+            self.last_error = None
+            rebuilt = [c for c, idx in generation.indexes.items() if previous.indexes.get(c) is not idx]
+            print(f"🔄 리로드 완료: v{previous.version} → v{generation.version} "
+                  f"(재구성: {', '.join(rebuilt) if rebuilt else '없음'})")
+            return True
+
+    # ---------- 변경 감시 ----------
+
+    def _watched_files(self) -> List[Path]:
+        files = [self.metadata_path]
+        for info in self._current.selector.metadata['categories'].values():
+            files.extend(self.rag.docs_base_path / file for file in info['files'])
+        return files
+
+    def _snapshot(self) -> Dict[Path, Optional[tuple]]:
+        return {path: file_fingerprint(path) for path in self._watched_files()}
+
+    def _watch_loop(self):
+        last_seen = self._snapshot()
+        changed_at: Optional[float] = None
+
+        while not self._stop.wait(self.poll_interval if changed_at is None else self.debounce / 4):
+            current = self._snapshot()
+            if current != last_seen:
+                last_seen = current
+                changed_at = time.monotonic()
+                continue
+
+            # debounce: 마지막 변경 이후 조용해지면 리로드
+            if changed_at is not None and time.monotonic() - changed_at >= self.debounce:
+                changed_at = None
+                self.reload_now()
+                last_seen = self._snapshot()
+
+    def start(self):
+        """백그라운드 감시 시작"""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, name="metadata-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """감시 중지"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # ---------- 질의 ----------
+
+    @contextlib.contextmanager
+    def generation(self):
+        """현재 세대를 잡고 있는 동안 교체되더라도 정리되지 않음"""
+        with self._swap_lock:
+            generation = self._current
+            generation.acquire()
+        try:
+            yield generation
+        finally:
+            generation.release()
+
+    def _select_indexes(self, generation: IndexGeneration, query: str) -> List[Chroma]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            categories = generation.selector.analyze_query(query)
+        indexes = [generation.indexes[c] for c in categories if c in generation.indexes]
+        return indexes or list(generation.indexes.values())
+
+    def retrieve(self, query: str) -> List[Document]:
+        """선택된 카테고리 인덱스에서 관련 청크 검색 (LLM 호출 없음)"""
+        with self.generation() as generation:
+            scored = []
+            for index in self._select_indexes(generation, query):
+                scored.extend(index.similarity_search_with_score(query, k=self.k))
+        scored.sort(key=lambda pair: pair[1])
+        return [doc for doc, _ in scored[:self.k]]
+
+    def ask(self, query: str) -> Dict:
+        """스마트 선택 + 답변 생성 (질의 중에는 같은 세대를 사용)"""
+        with self.generation() as generation:
+            indexes = self._select_indexes(generation, query)
+            if not indexes:
+                return {"error": "로드된 문서가 없습니다."}
+            if len(indexes) == 1:
+                qa_chain = self.rag.create_qa_chain(indexes[0], k=self.k)
+            else:
+                qa_chain = RetrievalQA.from_chain_type(
+                    llm=self.rag.llm,
+                    chain_type="stuff",
+                    retriever=MergerRetriever(retrievers=[
+                        index.as_retriever(search_kwargs={"k": self.k}) for index in indexes
+                    ]),
+                    return_source_documents=True,
+                )
+            return qa_chain.invoke({"query": query})
+
+
+def main():
+    """임시 복사본에서 메타데이터를 수정하며 서비스 중 리로드 데모"""
+    from local_models import HashEmbeddings, StubLLM
+
+    print("🚀 무중단 핫 리로드 데모\n")
+
+    workdir = Path(tempfile.mkdtemp(prefix="hot_reload_"))
+    try:
+        docs = workdir / "docs"
+        shutil.copytree("docs", docs)
+        metadata_path = docs / "doc_metadata.json"
+
+        rag = SmartRAGSystem(docs_base_path=str(docs), embeddings=HashEmbeddings(), llm=StubLLM())
+        hot = HotReloadingRAG(rag, metadata_path=str(metadata_path), poll_interval=0.2, debounce=0.3)
+        hot.start()
+
+        question = "ESG 투자 원칙은 무엇인가요?"
+        latencies = []
+        stop = threading.Event()
+
+        def query_loop():
+            while not stop.is_set():
+                start = time.perf_counter()
+                hot.retrieve(question)
+                latencies.append(time.perf_counter() - start)
+
+        worker = threading.Thread(target=query_loop)
+        worker.start()
+
+        with hot.generation() as generation:
+            print(f"📋 v{generation.version} 카테고리: {', '.join(generation.indexes)}")
+
+        # 새 카테고리 추가 (문서 → 메타데이터 순으로 저장)
+        (docs / "esg").mkdir()
+        (docs / "esg" / "esg_policy.txt").write_text(
+            "ESG 투자 원칙\n\n환경, 사회, 지배구조 요소를 투자 판단에 반영합니다.\n", encoding='utf-8'
+        )
+        metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+        metadata["categories"]["esg"] = {
+            "keywords": ["ESG", "환경", "지배구조"],
+            "description": "ESG 투자 문서",
+            "files": ["esg/esg_policy.txt"],
+        }
+        metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding='utf-8')
+        print("✏️  doc_metadata.json에 esg 카테고리 추가")
+
+        deadline = time.monotonic() + 10
+        while hot.reload_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        time.sleep(0.5)
+
+        stop.set()
+        worker.join()
+        hot.stop()
+
+        sources = {Path(doc.metadata['source']).name for doc in hot.retrieve(question)}
+        print(f"📄 '{question}' 검색 결과: {', '.join(sorted(sources))}")
+
+        ordered = sorted(latencies)
+        print(f"⏱️  리로드 중 질의 {len(ordered)}회: "
+              f"p50={ordered[len(ordered) // 2] * 1000:.2f}ms, "
+              f"max={ordered[-1] * 1000:.2f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n✅ 핫 리로드 데모 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+인덱스 스냅샷 - 빌드된 벡터 인덱스를 단일 파일로 내보내고 재임베딩 없이 불러오기
+
+새 워커가 docs/를 다시 임베딩하거나 SQLite WAL 상태가 있는 chroma_db 디렉토리를
+통째로 복사하지 않아도 되도록, 벡터/청크 텍스트/메타데이터/매니페스트/임베딩 모델 ID를
+버전과 체크섬이 있는 하나의 파일에 담습니다. 불러올 때는 mmap으로 매핑하므로
+벡터 블록은 복사 없이 바로 사용됩니다.
+
+파일 구조 (리틀 엔디언):
+    [8B magic "RAGSNAP\\0"][4B 포맷 버전][4B 헤더 길이][헤더 JSON (매니페스트)]
+    [패딩 → 64B 정렬][float32 벡터 블록 (count x dim)][레코드 JSON 블록 (id, text, metadata)]
+
+사용법:
+python index_snapshot.py export index.ragsnap --offline
+python index_snapshot.py export index.ragsnap --chroma-dir ./chroma_db
+python index_snapshot.py info index.ragsnap
+python index_snapshot.py load index.ragsnap --offline --query "RSI 지표는?"
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    from langchain_chroma import Chroma
+    from langchain.schema import Document
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+
+MAGIC = b"RAGSNAP\0"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 64
+
+
+def embedding_model_id(embeddings) -> str:
+    """임베딩 모델 식별자 (다른 모델의 스냅샷을 잘못 불러오는 것 방지)"""
+    model = getattr(embeddings, "model", None)
+    return str(model) if model else type(embeddings).__name__
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def export_snapshot(vectorstore: Chroma, path: str, embedding_model: str) -> Dict:
+    """
+    Chroma 인덱스를 스냅샷 파일로 저장 (임시 파일에 쓴 뒤 원자적으로 교체)
+
+    Returns:
+        매니페스트 dict
+    """
+    data = vectorstore._collection.get(include=["embeddings", "documents", "metadatas"])
+    if not data["ids"]:
+        # 빈 컬렉션: 차원을 알 수 없으므로 (0, 0) 벡터 블록
+        vectors = np.zeros((0, 0), dtype="<f4")
+    else:
+        vectors = np.ascontiguousarray(np.asarray(data["embeddings"], dtype="<f4"))
+        if vectors.ndim != 2:
+            vectors = vectors.reshape(len(data["ids"]), -1)
+
+    records = [
+        {"id": id_, "text": text, "metadata": metadata or {}}
+        for id_, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+    ]
+    records_bytes = json.dumps(records, ensure_ascii=False).encode("utf-8")
+    vectors_bytes = vectors.tobytes()
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "embedding_model": embedding_model,
+        "count": int(vectors.shape[0]),
+        "dim": int(vectors.shape[1]) if vectors.size else 0,
+        "dtype": "float32",
+        "collection_metadata": vectorstore._collection.metadata or {},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "vectors_bytes": len(vectors_bytes),
+        "records_bytes": len(records_bytes),
+        "vectors_sha256": hashlib.sha256(vectors_bytes).hexdigest(),
+        "records_sha256": hashlib.sha256(records_bytes).hexdigest(),
+    }
+    header = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+    vectors_offset = _align(_PREAMBLE.size + len(header))
+
+    target = Path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b"\0" * (vectors_offset - f.tell()))
+        f.write(vectors_bytes)
+        f.write(records_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+    return manifest
+
+
+class IndexSnapshot:
+    """
+    mmap으로 연 스냅샷 - vectors는 파일을 그대로 가리키는 numpy 배열 (복사 없음)
+
+    close() 뒤에도 호출자가 들고 있는 vectors 조각은 유효합니다. 매핑 해제는 마지막 조각이
+    해제될 때까지 미뤄집니다.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.vectors = None
+        self._records: Optional[List[Dict]] = None
+        try:
+            self._open(verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, verify: bool):
+        magic, version, header_len = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"스냅샷 파일이 아닙니다: {self.path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 버전: {version} (지원: {FORMAT_VERSION})")
+
+        header = self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_len]
+        self.manifest = json.loads(header.decode("utf-8"))
+        # 블록 오프셋은 저장하지 않고 헤더 길이로부터 계산
+        vectors_offset = _align(_PREAMBLE.size + header_len)
+        self._offsets = {
+            "vectors": vectors_offset,
+            "records": vectors_offset + self.manifest["vectors_bytes"],
+        }
+
+        if verify:
+            self.verify()
+
+        m = self.manifest
+        self.vectors = np.frombuffer(
+            self._mmap, dtype="<f4", count=m["count"] * m["dim"], offset=self._offsets["vectors"]
+        ).reshape(m["count"], m["dim"])
+
+    def _block(self, name: str) -> memoryview:
+        offset = self._offsets[name]
+        return memoryview(self._mmap)[offset:offset + self.manifest[f"{name}_bytes"]]
+
+    def verify(self):
+        """블록 체크섬 검증 (손상/잘린 파일이면 ValueError)"""
+        for name in ("vectors", "records"):
+            block = self._block(name)
+            try:
+                if len(block) != self.manifest[f"{name}_bytes"]:
+                    raise ValueError(f"스냅샷이 잘렸습니다: {name} 블록 크기 불일치")
+                if hashlib.sha256(block).hexdigest() != self.manifest[f"{name}_sha256"]:
+                    raise ValueError(f"스냅샷 체크섬 불일치: {name} 블록")
+            finally:
+                block.release()
+
+    @property
+    def records(self) -> List[Dict]:
+        """청크 텍스트/메타데이터 (처음 접근할 때 파싱)"""
+        if self._records is None:
+            block = self._block("records")
+            try:
+                self._records = json.loads(bytes(block).decode("utf-8"))
+            finally:
+                block.release()
+        return self._records
+
+    def check_model(self, embeddings):
+        model = embedding_model_id(embeddings)
+        if model != self.manifest["embedding_model"]:
+            raise ValueError(
+                f"임베딩 모델 불일치: 스냅샷={self.manifest['embedding_model']}, 현재={model}"
+            )
+
+    def search_by_vector(self, vector: List[float], k: int = 3) -> List[Document]:
+        """Chroma 없이 mmap 벡터에서 바로 코사인 유사도 검색"""
+        if not self.manifest["count"]:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norms = np.linalg.norm(self.vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (self.vectors @ query) / np.where(norms == 0, 1.0, norms)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k else []
+        top = sorted(top, key=lambda i: -scores[i])
+        return [
+            Document(page_content=self.records[i]["text"], metadata=self.records[i]["metadata"])
+            for i in top
+        ]
+
+    def to_chroma(self, embeddings, collection_name: str = "langchain",
+                  persist_directory: Optional[str] = None, batch_size: int = 5000) -> Chroma:
+        """재임베딩 없이 스냅샷 벡터를 그대로 Chroma 컬렉션에 적재"""
+        self.check_model(embeddings)
+        vectorstore = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+            collection_metadata=self.manifest.get("collection_metadata") or None,
+        )
+        records = self.records
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            vectorstore._collection.add(
+                ids=[r["id"] for r in batch],
+                embeddings=self.vectors[start:start + len(batch)],
+                documents=[r["text"] for r in batch],
+                # Chroma는 빈 메타데이터 dict를 허용하지 않음
+                metadatas=[r["metadata"] or None for r in batch],
+            )
+        return vectorstore
+
+    def close(self):
+        self.vectors = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 호출자가 아직 vectors 조각을 참조 중 → 그 조각들이 mmap을 붙잡고 있으므로
+                # 참조만 놓고, 마지막 조각이 해제되면 가비지 컬렉션이 매핑을 해제
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def load_snapshot(path: str, embeddings, verify: bool = True, **chroma_kwargs) -> Chroma:
+    """스냅샷 파일 → Chroma 벡터스토어 (워커 부트스트랩용)"""
+    with IndexSnapshot(path, verify=verify) as snapshot:
+        return snapshot.to_chroma(embeddings, **chroma_kwargs)
+
+
+def _make_embeddings(offline: bool):
+    if offline:
+        from local_models import HashEmbeddings
+        return HashEmbeddings()
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings()
+
+
+def _stub_llm():
+    # 내보내기에는 LLM이 필요 없으므로 API 키 없이 SmartRAGSystem을 만들기 위해 사용
+    from local_models import StubLLM
+    return StubLLM()
+
+
+def cmd_export(args):
+    embeddings = _make_embeddings(args.offline)
+    if args.chroma_dir:
+        vectorstore = Chroma(persist_directory=args.chroma_dir, embedding_function=embeddings)
+    else:
+        from rag_smart import SmartRAGSystem
+        print(f"📚 {args.docs} 문서로 인덱스 생성 중...")
+        rag = SmartRAGSystem(docs_base_path=args.docs, embeddings=embeddings, llm=_stub_llm())
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = rag.load_all_documents()
+            texts = rag.text_splitter.split_documents(documents)
+        vectorstore = Chroma.from_documents(texts, embeddings, collection_name="snapshot_export")
+
+    start = time.perf_counter()
+    manifest = export_snapshot(vectorstore, args.path, embedding_model_id(embeddings))
+    elapsed = time.perf_counter() - start
+    print(f"💾 스냅샷 저장: {args.path} ({manifest['count']}개 청크, dim={manifest['dim']}, "
+          f"{Path(args.path).stat().st_size:,} bytes, {elapsed * 1000:.1f}ms)")
+
+
+def cmd_info(args):
+    with IndexSnapshot(args.path, verify=True) as snapshot:
+        print(json.dumps(snapshot.manifest, ensure_ascii=False, indent=2))
+        print("✅ 체크섬 검증 통과")
+
+
+def cmd_load(args):
+    embeddings = _make_embeddings(args.offline)
+
+    start = time.perf_counter()
+    snapshot = IndexSnapshot(args.path, verify=not args.no_verify)
+    opened = time.perf_counter()
+    vectorstore = snapshot.to_chroma(embeddings, collection_name="snapshot_import")
+    loaded = time.perf_counter()
+    print(f"⚡ 열기+검증: {(opened - start) * 1000:.1f}ms, "
+          f"Chroma 적재: {(loaded - opened) * 1000:.1f}ms "
+          f"({snapshot.manifest['count']}개 청크, 재임베딩 없음)")
+
+    if args.query:
+        vector = embeddings.embed_query(args.query)
+        print(f"\n❓ 질문: {args.query}")
+        for doc in vectorstore.similarity_search_by_vector(vector, k=args.k):
+            print(f"  📄 {Path(doc.metadata.get('source', '?')).name}: "
+                  f"{doc.page_content[:60].strip()!r}")
+    snapshot.close()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="인덱스 스냅샷 내보내기/불러오기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="인덱스를 스냅샷 파일로 저장")
+    export.add_argument("path")
+    export.add_argument("--chroma-dir", help="기존 Chroma 디렉토리 (없으면 docs로 새로 생성)")
+    export.add_argument("--docs", default="docs")
+    export.add_argument("--offline", action="store_true", help="로컬 HashEmbeddings 사용")
+    export.set_defaults(func=cmd_export)
+
+    info = sub.add_parser("info", help="매니페스트 출력 및 체크섬 검증")
+    info.add_argument("path")
+    info.set_defaults(func=cmd_info)
+
+    load = sub.add_parser("load", help="스냅샷을 불러와 부트 시간 측정")
+    load.add_argument("path")
+    load.add_argument("--offline", action="store_true", help="로컬 HashEmbeddings 사용")
+    load.add_argument("--no-verify", action="store_true", help="체크섬 검증 생략")
+    load.add_argument("--query", help="불러온 뒤 검색할 질문")
+    load.add_argument("--k", type=int, default=3)
+    load.set_defaults(func=cmd_load)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
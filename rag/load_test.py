@@ -0,0 +1,272 @@
+"""
+오픈 루프 부하 테스트 - RAG 질의 처리량/지연시간 곡선 측정
+
+SmartRAGSystem 인스턴스 하나가 초당 몇 개의 질문을 버티는지 측정합니다.
+목표 요청률(rate)마다 포아송 도착(지수분포 간격)으로 질문을 보내고,
+응답을 기다리지 않고 다음 요청을 예정된 시각에 보냅니다 (오픈 루프).
+지연시간은 "예정된 도착 시각"부터 재므로 큐 대기 시간이 그대로 드러납니다.
+(클로즈드 루프는 서버가 느려지면 요청 자체를 덜 보내서 큐잉 지연을 숨깁니다.)
+
+대상:
+- 기본: 프로세스 내 SmartRAGSystem (스텁 임베딩/LLM, 지연시간 설정 가능)
+- --url: 로컬 서비스 엔드포인트 (POST JSON {"query": ...})
+- --serve PORT: 프로세스 내 대상을 HTTP 엔드포인트로 띄우기 (--url 테스트용)
+
+사용법:
+python load_test.py --rates 5 10 20 40 --duration 10 --llm-latency 0.2
+python load_test.py --serve 8000 --llm-latency 0.2
+python load_test.py --url http://127.0.0.1:8000/ask --rates 5 10 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import shutil
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from local_models import HashEmbeddings, StubLLM
+from rag_bench import build_labeled_set
+from stats_util import percentile
+from rag_smart import DEMO_QUESTIONS, SmartRAGSystem
+
+
+def load_questions(path: Optional[str] = None) -> List[str]:
+    """질문 코퍼스 - 파일(한 줄에 하나) 또는 데모 질문 + 메타데이터 키워드 질문"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    questions = [question for question, _ in DEMO_QUESTIONS]
+    questions.extend(item["question"] for item in build_labeled_set())
+    return questions
+
+
+class InProcessTarget:
+    """스텁 프로바이더로 만든 SmartRAGSystem QA 체인 (인덱스는 한 번만 생성)"""
+
+    def __init__(self, embed_latency: float = 0.0, llm_latency: float = 0.0,
+                 llm_jitter: float = 0.0, k: int = 3):
+        self.rag = SmartRAGSystem(
+            embeddings=HashEmbeddings(latency=embed_latency),
+            llm=StubLLM(latency=llm_latency, jitter=llm_jitter),
+        )
+        self._persist_dir = tempfile.mkdtemp(prefix="load_test_")
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = self.rag.load_all_documents()
+            vectorstore = self.rag.create_vectorstore(documents, persist_dir=self._persist_dir)
+        self.qa_chain = self.rag.create_qa_chain(vectorstore, k=k)
+
+    async def __call__(self, query: str) -> Dict:
+        return await self.qa_chain.ainvoke({"query": query})
+
+    def invoke(self, query: str) -> Dict:
+        return self.qa_chain.invoke({"query": query})
+
+    def close(self):
+        shutil.rmtree(self._persist_dir, ignore_errors=True)
+
+
+class HttpTarget:
+    """로컬 서비스 엔드포인트 (urllib 블로킹 호출을 스레드 풀에서 실행)"""
+
+    def __init__(self, url: str, timeout: float = 30.0, max_workers: int = 256):
+        self.url = url
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load-http")
+
+    def _post(self, query: str) -> Dict:
+        body = json.dumps({"query": query}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    async def __call__(self, query: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._post, query)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_open_loop(target: Callable[[str], Awaitable[Dict]], questions: List[str],
+                        rate: float, duration: float, max_in_flight: int = 10000,
+                        drain_timeout: float = 30.0, seed: int = 0) -> Dict:
+    """
+    rate(요청/초)의 포아송 도착으로 duration초 동안 요청 전송
+
+    응답 여부와 무관하게 예정 시각에 다음 요청을 보냅니다.
+    동시 요청이 max_in_flight를 넘으면 보내지 않고 에러(dropped)로 집계합니다.
+    """
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    errors = 0
+    dropped = 0
+    in_flight = set()
+
+    async def fire(query: str, scheduled: float):
+        nonlocal errors
+        try:
+            await target(query)
+            latencies.append(loop.time() - scheduled)
+        except Exception:
+            errors += 1
+
+    start = loop.time()
+    next_arrival = start
+    sent = 0
+    while True:
+        next_arrival += rng.expovariate(rate)
+        if next_arrival - start >= duration:
+            break
+        delay = next_arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent += 1
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+            continue
+        task = asyncio.create_task(fire(rng.choice(questions), next_arrival))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    timed_out = 0
+    if in_flight:
+        _, pending = await asyncio.wait(set(in_flight), timeout=drain_timeout)
+        timed_out = len(pending)
+        for task in pending:
+            task.cancel()
+    elapsed = loop.time() - start
+
+    failed = errors + dropped + timed_out
+    return {
+        "offered_rps": rate,
+        "sent": sent,
+        "sent_rps": round(sent / duration, 2),
+        "completed": len(latencies),
+        "achieved_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(failed / sent, 4) if sent else 0.0,
+        "errors": errors,
+        "dropped": dropped,
+        "timed_out": timed_out,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 1),
+    }
+
+
+def find_saturation(rows: List[Dict], slo_ms: float, min_ratio: float = 0.9) -> Optional[Dict]:
+    """처리량이 실제 전송률의 min_ratio 미만이거나 p99가 SLO를 넘는 첫 요청률"""
+    for row in rows:
+        # 포아송 도착은 짧은 구간에서 목표 요청률과 차이가 나므로 실제 전송률과 비교
+        if (row["achieved_rps"] < row["sent_rps"] * min_ratio
+                or row["p99_ms"] > slo_ms or row["error_rate"] > 0.01):
+            return row
+    return None
+
+
+def serve(target: InProcessTarget, port: int):
+    """프로세스 내 대상을 POST /ask 엔드포인트로 노출"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length))["query"]
+            result = target.invoke(query)
+            body = json.dumps({"result": result["result"]}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"🖥️  서비스 시작: http://127.0.0.1:{port}/ask (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+async def sweep(target, questions: List[str], args) -> List[Dict]:
+    rows = []
+    print(f"{'rate':>7} {'sent/s':>7} {'achieved':>9} {'err%':>6} "
+          f"{'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    print("-" * 68)
+    for rate in args.rates:
+        row = await run_open_loop(target, questions, rate, args.duration,
+                                  max_in_flight=args.max_in_flight, seed=args.seed)
+        rows.append(row)
+        print(f"{row['offered_rps']:>7} {row['sent_rps']:>7} {row['achieved_rps']:>9} "
+              f"{row['error_rate'] * 100:>6.2f} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['max_ms']:>8}")
+    return rows
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="오픈 루프 RAG 부하 테스트")
+    parser.add_argument("--rates", type=float, nargs="+", default=[5, 10, 20, 40, 80])
+    parser.add_argument("--duration", type=float, default=10.0, help="요청률당 측정 시간 (초)")
+    parser.add_argument("--questions", help="질문 파일 (한 줄에 하나)")
+    parser.add_argument("--url", help="로컬 서비스 엔드포인트 (없으면 프로세스 내 대상)")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="프로세스 내 대상을 HTTP로 노출")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="스텁 임베딩 지연 (초)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="스텁 LLM 지연 (초)")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="스텁 LLM 지연 편차 (초)")
+    parser.add_argument("--max-in-flight", type=int, default=10000, help="동시 요청 상한 (초과 시 drop)")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="포화 판정용 p99 SLO (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.url:
+        target = HttpTarget(args.url)
+        label = args.url
+    else:
+        target = InProcessTarget(args.embed_latency, args.llm_latency, args.llm_jitter)
+        label = f"in-process (embed {args.embed_latency * 1000:.0f}ms, llm {args.llm_latency * 1000:.0f}ms)"
+
+    try:
+        if args.serve:
+            serve(target, args.serve)
+            return
+
+        print("🚀 오픈 루프 RAG 부하 테스트")
+        print(f"🎯 대상: {label}, 요청률당 {args.duration:.0f}초\n")
+        questions = load_questions(args.questions)
+        rows = asyncio.run(sweep(target, questions, args))
+    finally:
+        target.close()
+
+    saturated = find_saturation(rows, args.slo_ms)
+    if saturated is None:
+        print(f"\n✅ 포화 없음: 최대 {rows[-1]['offered_rps']} req/s까지 처리")
+    else:
+        sustainable = [r for r in rows if r["offered_rps"] < saturated["offered_rps"]]
+        print(f"\n📈 포화 지점: {saturated['offered_rps']} req/s "
+              f"(처리 {saturated['achieved_rps']} req/s, p99 {saturated['p99_ms']}ms)")
+        if sustainable:
+            print(f"   유지 가능한 최대 요청률: {sustainable[-1]['offered_rps']} req/s")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"target": label, "rows": rows,
+                       "saturation_rps": saturated["offered_rps"] if saturated else None},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 JSON 저장: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
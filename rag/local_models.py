@@ -0,0 +1,109 @@
+"""
+로컬 모델 - API 키 없이 오프라인으로 동작하는 결정적(deterministic) 임베딩과 스텁 LLM
+
+벤치마크/테스트에서 OpenAIEmbeddings, ChatOpenAI 대신 사용합니다.
+같은 텍스트는 항상 같은 벡터가 나오므로 실행 간 결과 비교가 가능합니다.
+"""
+import asyncio
+import hashlib
+import math
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+try:
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models.llms import LLM
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashEmbeddings(Embeddings):
+    """단어 + 문자 n-gram 해싱 기반 임베딩 (feature hashing)"""
+
+    def __init__(self, dim: int = 256, ngram: int = 2, latency: float = 0.0):
+        """
+        Args:
+            dim: 벡터 차원
+            ngram: 문자 n-gram 길이
+            latency: 호출당 주입할 지연시간 (초, 부하 테스트에서 원격 임베딩 API 흉내)
+        """
+        self.dim = dim
+        self.ngram = ngram
+        self.latency = latency
+        # 인덱스 스냅샷 등에서 임베딩 모델 식별자로 사용
+        self.model = f"hash-embeddings-d{dim}-n{ngram}"
+
+    def _features(self, text: str) -> List[str]:
+        """단어와 단어 내부 문자 n-gram 추출 (한글은 띄어쓰기가 불규칙해서 n-gram이 필요)"""
+        features = []
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            features.append(token)
+            if len(token) > self.ngram:
+                for i in range(len(token) - self.ngram + 1):
+                    features.append("#" + token[i:i + self.ngram])
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return vector
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+class StubLLM(LLM):
+    """지연시간을 주입할 수 있는 스텁 LLM (프롬프트 길이만 담은 고정 답변 반환)"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _answer(self, prompt: str) -> str:
+        return f"[stub] 프롬프트 {len(prompt)}자에 대한 답변"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Any = None, **kwargs: Any) -> str:
+        time.sleep(self._delay())
+        return self._answer(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Any = None, **kwargs: Any) -> str:
+        await asyncio.sleep(self._delay())
+        return self._answer(prompt)
@@ -0,0 +1,206 @@
+"""
+MMR(Maximal Marginal Relevance) 재선택 - 검색 결과 다양화
+
+create_qa_chain의 기본 리트리버는 top-k 최근접 청크를 그대로 반환해서
+같은 파일의 겹치는 청크가 자주 나옵니다. MMR은 더 큰 후보 풀(fetch_k)에서
+"질문과의 관련도 - 이미 고른 청크와의 중복도"가 최대인 청크를 하나씩 고릅니다.
+
+    score(d) = λ · sim(q, d) - (1 - λ) · max_{s ∈ 선택됨} sim(d, s)
+
+후보 간 유사도 행렬(fetch_k × fetch_k)을 만들지 않고, 청크를 하나 고를 때마다 그 청크와 전체 후보의
+유사도(행렬-벡터 곱 한 번)로 "선택된 청크와의 최대 유사도" 벡터만 갱신하므로
+O(k · fetch_k · dim) 연산으로 끝납니다.
+
+사용법:
+python mmr.py                       # fetch_k 20~500 벤치마크 + docs/ 다양성 비교
+python mmr.py --fetch-sizes 20 100 500 --k 6 --dim 1536
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Any, List
+
+try:
+    import numpy as np
+    from langchain_chroma import Chroma
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.retrievers import BaseRetriever
+    from langchain.schema import Document
+    from pydantic import ConfigDict
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(query: Any, candidates: Any, k: int = 3, lambda_mult: float = 0.5) -> List[int]:
+    """
+    벡터화된 MMR 선택
+
+    Args:
+        query: 질문 임베딩 (dim,)
+        candidates: 후보 임베딩 (fetch_k, dim)
+        k: 선택할 개수
+        lambda_mult: 1이면 관련도만, 0이면 다양성만 고려
+
+    Returns:
+        선택된 후보 인덱스 (선택 순서)
+    """
+    candidates = _normalize(np.asarray(candidates, dtype=np.float32))
+    query = _normalize(np.asarray(query, dtype=np.float32))
+    n = candidates.shape[0]
+    k = min(k, n)
+    if k == 0:
+        return []
+
+    relevance = candidates @ query
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    # 선택된 행과의 유사도만 계산 (fetch_k × fetch_k 행렬은 만들지 않음)
+    max_sim = candidates @ candidates[first]
+    available = np.ones(n, dtype=bool)
+    available[first] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, candidates @ candidates[best], out=max_sim)
+
+    return selected
+
+
+def mmr_select_loop(query: Any, candidates: Any, k: int = 3, lambda_mult: float = 0.5) -> List[int]:
+    """후보 쌍마다 파이썬 루프로 유사도를 계산하는 기준 구현 (벤치마크 비교용)"""
+    candidates = [_normalize(np.asarray(c, dtype=np.float32)) for c in candidates]
+    query = _normalize(np.asarray(query, dtype=np.float32))
+    relevance = [float(np.dot(c, query)) for c in candidates]
+    k = min(k, len(candidates))
+
+    selected: List[int] = []
+    while len(selected) < k:
+        best, best_score = -1, -float("inf")
+        for i, candidate in enumerate(candidates):
+            if i in selected:
+                continue
+            redundancy = max((float(np.dot(candidate, candidates[j])) for j in selected), default=0.0)
+            score = lambda_mult * relevance[i] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+class MMRRetriever(BaseRetriever):
+    """Chroma에서 fetch_k개 후보를 임베딩과 함께 가져와 mmr_select로 k개 재선택"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Chroma
+    k: int = 3
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector = self.vectorstore.embeddings.embed_query(query)
+        results = self.vectorstore._collection.query(
+            query_embeddings=[query_vector],
+            n_results=self.fetch_k,
+            include=["documents", "metadatas", "embeddings"],
+        )
+        embeddings = results["embeddings"][0]
+        if len(embeddings) == 0:
+            return []
+
+        selected = mmr_select(query_vector, embeddings, k=self.k, lambda_mult=self.lambda_mult)
+        return [
+            Document(page_content=results["documents"][0][i], metadata=results["metadatas"][0][i] or {})
+            for i in selected
+        ]
+
+
+def benchmark(fetch_sizes: List[int], k: int, dim: int, repeat: int, seed: int = 0):
+    """fetch_k별 벡터화 MMR vs 파이썬 루프 MMR 실행 시간 비교"""
+    rng = np.random.default_rng(seed)
+    print(f"⏱️  MMR 선택 시간 (k={k}, dim={dim}, {repeat}회 평균)\n")
+    print(f"{'fetch_k':>8} {'vectorized_ms':>14} {'loop_ms':>10} {'speedup':>8}")
+    print("-" * 43)
+
+    for fetch_k in fetch_sizes:
+        query = rng.standard_normal(dim).astype(np.float32)
+        candidates = rng.standard_normal((fetch_k, dim)).astype(np.float32)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fast = mmr_select(query, candidates, k, 0.5)
+        vectorized = (time.perf_counter() - start) / repeat
+
+        loop_repeat = max(1, repeat // 10)
+        start = time.perf_counter()
+        for _ in range(loop_repeat):
+            slow = mmr_select_loop(query, candidates, k, 0.5)
+        loop = (time.perf_counter() - start) / loop_repeat
+
+        assert fast == slow, "벡터화 구현과 기준 구현의 선택 결과가 다릅니다"
+        print(f"{fetch_k:>8} {vectorized * 1000:>14.3f} {loop * 1000:>10.3f} {loop / vectorized:>7.1f}x")
+
+
+def diversity_demo(k: int, fetch_k: int, lambda_mult: float):
+    """
+    docs/ 인덱스에서 유사도 top-k와 MMR 결과의 출처 파일 비교
+
+    두 주제를 함께 묻는 질문은 유사도 top-k가 한 파일의 겹치는 이웃 청크로 채워지기 쉬워서
+    MMR이 다른 주제의 파일을 끌어오는지 확인하기 좋습니다.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from local_models import HashEmbeddings
+    from rag_bench import load_corpus
+
+    # 작은 청크로 나눠서 같은 파일의 이웃 청크가 후보에 많이 들어오게 함
+    splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=100, length_function=len)
+    texts = splitter.split_documents(load_corpus())
+    vectorstore = Chroma.from_documents(texts, HashEmbeddings(), collection_name="mmr_demo")
+
+    question = "리스크 관리와 기술적 지표"
+    plain = vectorstore.similarity_search(question, k=k)
+    diverse = MMRRetriever(vectorstore=vectorstore, k=k, fetch_k=fetch_k,
+                           lambda_mult=lambda_mult).invoke(question)
+
+    print(f"\n❓ 질문: {question} ({len(texts)}개 청크 중 k={k}, λ={lambda_mult})")
+    unique = {}
+    for label, docs in (("유사도 top-k", plain), ("MMR", diverse)):
+        sources = [Path(doc.metadata["source"]).name for doc in docs]
+        chars = sum(len(doc.page_content) for doc in docs)
+        unique[label] = len(set(sources))
+        print(f"  {label:<10} 고유 파일 {unique[label]}개, 프롬프트 {chars}자: {', '.join(sources)}")
+    if unique["MMR"] <= unique["유사도 top-k"]:
+        print("  ⚠️  MMR이 출처를 늘리지 못했습니다 (--lambda-mult를 낮춰 보세요)")
+    vectorstore.delete_collection()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="벡터화 MMR 벤치마크")
+    parser.add_argument("--fetch-sizes", type=int, nargs="+", default=[20, 50, 100, 200, 500])
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--dim", type=int, default=1536, help="임베딩 차원 (text-embedding-ada-002: 1536)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--lambda-mult", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print("🚀 MMR 다양화 벤치마크\n")
+    benchmark(args.fetch_sizes, args.k, args.dim, args.repeat)
+    diversity_demo(k=3, fetch_k=20, lambda_mult=args.lambda_mult)
+    print("\n✅ 벤치마크 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,554 @@
+"""
+멀티 프로세스 인제스트 - 청크 분할/해시/토큰 수 계산을 프로세스 풀에서
+
+SmartRAGSystem.create_vectorstore는 split_documents를 메인 스레드에서 실행합니다.
+비동기 서비스에서는 그동안 이벤트 루프가 멈추고, 코어가 여러 개여도 하나만 씁니다.
+ParallelIngest는 CPU를 쓰는 단계를 프로세스 풀로 보내되 프로세스 간 전달량을 최소로 유지합니다.
+- 작업 단위: (파일, 시작 바이트, 끝 바이트) 범위를 batch_bytes만큼 묶은 목록. 텍스트를 피클로
+  보내지 않고 워커가 파일에서 직접 읽음 (batch_bytes보다 큰 파일은 그 근처 빈 줄에서 자름)
+- 워커: RecursiveCharacterTextSplitter 분할 + blake2b-128 해시(corpus_manager 임베딩 캐시 키와 동일,
+  중복 제거용) + 토큰 수 (tiktoken 인코딩 지정 시, 기본은 \\w+ 개수)
+- 돌려받는 것: 청크 텍스트 대신 범위 번호/문자 오프셋/길이/토큰 수 배열과 해시 바이트 (청크당 ~32바이트),
+  범위 텍스트 전체의 해시 (범위당 16바이트)
+- IngestResult.documents(): 필요할 때 파일에서 다시 읽어 Document 생성
+
+사용법:
+python parallel_ingest.py                               # 합성 1GB 코퍼스, 워커 1..코어 수
+python parallel_ingest.py --corpus-mb 256 --workers 1 2 4 --json ingest.json
+python parallel_ingest.py --corpus-dir ./big_corpus --keep  # 생성한 코퍼스 재사용
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain.schema import Document
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+HASH_BYTES = 16
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# (범위 번호, 경로, 시작 바이트, 끝 바이트)
+Range = Tuple[int, str, int, int]
+
+
+def chunk_hash(text: str) -> bytes:
+    """corpus_manager.SharedEmbeddingCache._key와 같은 키 (임베딩 캐시/중복 제거에 그대로 사용)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=HASH_BYTES).digest()
+
+
+def make_token_counter(tokenizer: Optional[str] = None) -> Callable[[str], int]:
+    """tokenizer가 tiktoken 인코딩 이름이면 정확한 토큰 수, 없으면 단어(\\w+) 수 근사"""
+    if tokenizer and tokenizer != "words":
+        if tiktoken is None:
+            raise ImportError("Missing required package: tiktoken (pip install tiktoken)")
+        encoding = tiktoken.get_encoding(tokenizer)
+        return lambda text: len(encoding.encode_ordinary(text))
+    return lambda text: len(_WORD_PATTERN.findall(text))
+
+
+def plan_ranges(paths: Sequence[str], batch_bytes: int, cut_large_files: bool = True) -> List[Tuple[int, int, int]]:
+    """파일별 (경로 번호, 시작, 끝) 바이트 범위. 큰 파일은 batch_bytes 뒤 첫 빈 줄에서 자름"""
+    ranges = []
+    for path_id, path in enumerate(paths):
+        size = os.path.getsize(path)
+        if size == 0:
+            continue
+        start = 0
+        if cut_large_files and size > batch_bytes:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while size - start > batch_bytes:
+                    cut = data.find(b"\n\n", start + batch_bytes)
+                    if cut < 0:
+                        break
+                    ranges.append((path_id, start, cut + 2))
+                    start = cut + 2
+        ranges.append((path_id, start, size))
+    return ranges
+
+
+def group_tasks(paths: Sequence[str], ranges: List[Tuple[int, int, int]], batch_bytes: int) -> List[List[Range]]:
+    """범위를 순서대로 batch_bytes 이상씩 묶음 (작업 하나 = 워커 호출 한 번)"""
+    tasks, current, size = [], [], 0
+    for range_id, (path_id, start, end) in enumerate(ranges):
+        current.append((range_id, paths[path_id], start, end))
+        size += end - start
+        if size >= batch_bytes:
+            tasks.append(current)
+            current, size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def read_range(path: str, start: int, end: int) -> str:
+    """바이트 범위를 TextLoader(open의 universal newlines)와 같은 텍스트로 디코딩 (\r\n, \r → \n)"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+# ---------------------------------------------------------------------------
+# 워커 (프로세스마다 분할기/토큰 카운터를 한 번만 만듦)
+# ---------------------------------------------------------------------------
+
+_worker: Dict = {}
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int, tokenizer: Optional[str]):
+    _worker["splitter"] = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        add_start_index=True,
+    )
+    _worker["count_tokens"] = make_token_counter(tokenizer)
+
+
+def _process_task(task: List[Range]) -> Tuple:
+    """범위 묶음 하나를 분할 → (범위 번호, 오프셋, 길이, 토큰 수 배열, 해시 바이트, 범위 해시, CPU 초)"""
+    cpu = time.process_time()
+    splitter = _worker["splitter"]
+    count_tokens = _worker["count_tokens"]
+    range_ids, starts, lengths, tokens = array("I"), array("I"), array("I"), array("I")
+    hashes, range_hashes = bytearray(), bytearray()
+    for range_id, path, start, end in task:
+        text = read_range(path, start, end)
+        range_hashes += chunk_hash(text)
+        for doc in splitter.create_documents([text]):
+            chunk = doc.page_content
+            range_ids.append(range_id)
+            starts.append(doc.metadata["start_index"])
+            lengths.append(len(chunk))
+            tokens.append(count_tokens(chunk))
+            hashes += chunk_hash(chunk)
+    return range_ids, starts, lengths, tokens, bytes(hashes), bytes(range_hashes), time.process_time() - cpu
+
+
+def _process_texts(texts: List[str]) -> Tuple[List[str], List[int], bytes]:
+    """비교용: 텍스트를 피클로 받아 청크 텍스트를 피클로 돌려주는 방식"""
+    splitter = _worker["splitter"]
+    count_tokens = _worker["count_tokens"]
+    chunks = [chunk for text in texts for chunk in splitter.split_text(text)]
+    return chunks, [count_tokens(chunk) for chunk in chunks], b"".join(chunk_hash(c) for c in chunks)
+
+
+# ---------------------------------------------------------------------------
+# 결과 / 실행기
+# ---------------------------------------------------------------------------
+
+@dataclass
+class IngestResult:
+    """청크 텍스트 없이 위치/해시/토큰 수만 담은 컬럼형 결과"""
+    paths: List[str]
+    ranges: List[Tuple[int, int, int]]
+    range_ids: array = field(default_factory=lambda: array("I"))
+    starts: array = field(default_factory=lambda: array("I"))
+    lengths: array = field(default_factory=lambda: array("I"))
+    tokens: array = field(default_factory=lambda: array("I"))
+    hashes: bytearray = field(default_factory=bytearray)
+    range_hashes: bytearray = field(default_factory=bytearray)  # 워커가 읽은 범위 텍스트의 해시
+    seconds: float = 0.0
+    worker_cpu_seconds: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _extend(self, part: Tuple):
+        range_ids, starts, lengths, tokens, hashes, range_hashes, cpu = part
+        self.range_ids.extend(range_ids)
+        self.starts.extend(starts)
+        self.lengths.extend(lengths)
+        self.tokens.extend(tokens)
+        self.hashes += hashes
+        self.range_hashes += range_hashes
+        self.worker_cpu_seconds += cpu
+
+    def hash(self, i: int) -> bytes:
+        return bytes(self.hashes[i * HASH_BYTES:(i + 1) * HASH_BYTES])
+
+    def range_hash(self, range_id: int) -> bytes:
+        return bytes(self.range_hashes[range_id * HASH_BYTES:(range_id + 1) * HASH_BYTES])
+
+    def unique_count(self) -> int:
+        view = memoryview(self.hashes)
+        return len({bytes(view[i:i + HASH_BYTES]) for i in range(0, len(view), HASH_BYTES)})
+
+    @property
+    def input_bytes(self) -> int:
+        return sum(end - start for _, start, end in self.ranges)
+
+    def documents(self) -> Iterator[Document]:
+        """파일에서 다시 읽어 Document 생성 (metadata는 TextLoader와 같은 source)"""
+        current, text = -1, ""
+        for range_id, start, length in zip(self.range_ids, self.starts, self.lengths):
+            if range_id != current:
+                path_id, begin, end = self.ranges[range_id]
+                text = read_range(self.paths[path_id], begin, end)
+                current = range_id
+            yield Document(page_content=text[start:start + length],
+                           metadata={"source": self.paths[self.ranges[range_id][0]]})
+
+    def summary(self) -> Dict:
+        return {
+            "chunks": len(self),
+            "unique_chunks": self.unique_count(),
+            "tokens": sum(self.tokens),
+            "input_mb": round(self.input_bytes / 1024 / 1024, 1),
+            "seconds": round(self.seconds, 2),
+            "chunks_per_sec": round(len(self) / self.seconds) if self.seconds else 0,
+            "mb_per_sec": round(self.input_bytes / 1024 / 1024 / self.seconds, 1) if self.seconds else 0,
+            "worker_cpu_seconds": round(self.worker_cpu_seconds, 2),
+        }
+
+
+class ParallelIngest:
+    """
+    Args:
+        workers: 프로세스 수 (None이면 코어 수)
+        chunk_size / chunk_overlap: SmartRAGSystem과 같은 분할 설정
+        batch_bytes: 워커 호출 한 번에 넘길 입력 크기 (크게 잡을수록 호출/전달 비용이 줄어듦)
+        tokenizer: tiktoken 인코딩 이름 (None이면 단어 수 근사)
+        cut_large_files: False면 파일을 자르지 않음 (청크 경계가 split_documents와 완전히 같음)
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 batch_bytes: int = 8 * 1024 * 1024, tokenizer: Optional[str] = None,
+                 cut_large_files: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_bytes = batch_bytes
+        self.tokenizer = tokenizer
+        self.cut_large_files = cut_large_files
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.chunk_size, self.chunk_overlap, self.tokenizer),
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def plan(self, paths: Sequence[str]) -> Tuple[List[Tuple[int, int, int]], List[List[Range]]]:
+        ranges = plan_ranges(paths, self.batch_bytes, self.cut_large_files)
+        return ranges, group_tasks(paths, ranges, self.batch_bytes)
+
+    def run(self, paths: Sequence[str]) -> IngestResult:
+        paths = [str(p) for p in paths]
+        start = time.perf_counter()
+        ranges, tasks = self.plan(paths)
+        result = IngestResult(paths, ranges)
+        for part in self._pool().map(_process_task, tasks):  # 작업 순서 = 파일 순서 유지
+            result._extend(part)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    async def run_async(self, paths: Sequence[str]) -> IngestResult:
+        """이벤트 루프를 막지 않고 인제스트 (루프 스레드는 결과 배열을 이어 붙이기만 함)"""
+        paths = [str(p) for p in paths]
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        ranges, tasks = await loop.run_in_executor(None, self.plan, paths)
+        pool = self._pool()
+        parts = await asyncio.gather(*[loop.run_in_executor(pool, _process_task, task) for task in tasks])
+        result = IngestResult(paths, ranges)
+        for part in parts:
+            result._extend(part)
+        result.seconds = time.perf_counter() - start
+        return result
+
+
+def ingest_serial(paths: Sequence[str], chunk_size: int = 1000, chunk_overlap: int = 200,
+                  batch_bytes: int = 8 * 1024 * 1024, tokenizer: Optional[str] = None) -> IngestResult:
+    """비교 기준: 같은 처리를 현재 프로세스에서 순서대로"""
+    paths = [str(p) for p in paths]
+    _init_worker(chunk_size, chunk_overlap, tokenizer)
+    start = time.perf_counter()
+    ranges = plan_ranges(paths, batch_bytes)
+    result = IngestResult(paths, ranges)
+    for task in group_tasks(paths, ranges, batch_bytes):
+        result._extend(_process_task(task))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def split_documents_parallel(documents: List[Document], chunk_size: int, chunk_overlap: int,
+                             workers: Optional[int] = None) -> List[Document]:
+    """
+    SmartRAGSystem.create_vectorstore용: TextLoader로 읽은 파일 문서는 프로세스 풀에서 분할
+
+    워커는 source 파일을 직접 읽어 분할하고 읽은 텍스트의 해시를 함께 돌려줍니다. 그 해시가
+    page_content의 해시와 같은 문서만 워커 결과를 쓰고(청크 텍스트는 page_content에서 잘라냄),
+    나머지(파일 없음, 로드 후 수정, 다른 로더/인코딩, 같은 source 반복)는 현재 프로세스에서 분할합니다.
+    파일을 자르지 않으므로 청크는 split_documents 결과와 같습니다.
+    """
+    by_path = {}
+    for doc in documents:
+        source = doc.metadata.get("source")
+        if source and source not in by_path and os.path.isfile(source):
+            by_path[source] = doc
+
+    split_by_path: Dict[str, List[Document]] = {}
+    if by_path:
+        with ParallelIngest(workers, chunk_size, chunk_overlap, cut_large_files=False) as ingest:
+            result = ingest.run(list(by_path))
+        # 파일을 자르지 않으므로 범위 하나 = 파일 하나 (빈 파일은 범위 없음 → 현재 프로세스에서 분할)
+        matched = {}
+        for range_id, (path_id, _, _) in enumerate(result.ranges):
+            doc = by_path[result.paths[path_id]]
+            if result.range_hash(range_id) == chunk_hash(doc.page_content):
+                matched[range_id] = doc
+                split_by_path[result.paths[path_id]] = []
+        for range_id, start, length in zip(result.range_ids, result.starts, result.lengths):
+            doc = matched.get(range_id)
+            if doc is not None:
+                split_by_path[doc.metadata["source"]].append(
+                    Document(page_content=doc.page_content[start:start + length], metadata=dict(doc.metadata))
+                )
+
+    # split_documents와 같은 순서로 합침
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                              length_function=len)
+    chunks = []
+    for doc in documents:
+        source = doc.metadata.get("source")
+        if source in split_by_path and by_path[source] is doc:
+            chunks.extend(split_by_path[source])
+        else:
+            chunks.extend(splitter.split_documents([doc]))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# 벤치마크
+# ---------------------------------------------------------------------------
+
+def build_synthetic_corpus(directory: str, total_mb: int, file_kb: int = 1024, seed: int = 0) -> List[str]:
+    """docs/ 문장을 섞고 숫자를 끼워 넣은 문단으로 total_mb 크기의 텍스트 파일들을 생성"""
+    from rag_bench import load_corpus
+
+    sentences = [line.strip() for doc in load_corpus() for line in doc.page_content.splitlines() if line.strip()]
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(20_000):
+        parts = [f"{rng.choice(sentences)} ({rng.randrange(1_000_000)})" for _ in range(rng.randint(3, 12))]
+        paragraphs.append(" ".join(parts))
+
+    os.makedirs(directory, exist_ok=True)
+    paths, written, target = [], 0, total_mb * 1024 * 1024
+    while written < target:
+        path = os.path.join(directory, f"doc_{len(paths):06d}.txt")
+        body = "\n\n".join(rng.choices(paragraphs, k=max(1, file_kb * 1024 // 700)))
+        data = body.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+        written += len(data)
+    return paths
+
+
+def _pickled_baseline(paths: List[str], workers: int, chunk_size: int, chunk_overlap: int,
+                      batch_bytes: int, tokenizer: Optional[str]) -> Dict:
+    """텍스트를 보내고 청크 텍스트를 받는 방식 (전달량 비교용)"""
+    def batches():
+        current, size = [], 0
+        for path in paths:
+            text = Path(path).read_text(encoding="utf-8")
+            current.append(text)
+            size += len(text)
+            if size >= batch_bytes:
+                yield current
+                current, size = [], 0
+        if current:
+            yield current
+
+    batch_chars = {}  # future → 보낸 문자 수
+
+    def collect(future):
+        texts = future.result()[0]
+        return len(texts), batch_chars.pop(future) + sum(len(t) for t in texts)
+
+    start = time.perf_counter()
+    chunks = transferred = 0  # 전달량은 문자 수 기준 (보낸 텍스트 + 받은 청크)
+    pending = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(chunk_size, chunk_overlap, tokenizer)) as pool:
+        for batch in batches():  # 메모리를 위해 진행 중인 배치는 workers * 2개까지만
+            future = pool.submit(_process_texts, batch)
+            batch_chars[future] = sum(len(t) for t in batch)
+            pending.append(future)
+            if len(pending) >= workers * 2:
+                count, size = collect(pending.pop(0))
+                chunks, transferred = chunks + count, transferred + size
+        for future in pending:
+            count, size = collect(future)
+            chunks, transferred = chunks + count, transferred + size
+    seconds = time.perf_counter() - start
+    return {"mode": "pickled_texts", "workers": workers, "chunks": chunks, "seconds": round(seconds, 2),
+            "chunks_per_sec": round(chunks / seconds), "ipc_mb": round(transferred / 1024 / 1024, 1)}
+
+
+def _ipc_mb(result: IngestResult, tasks: int) -> float:
+    """범위 목록 + 결과 배열 크기 (청크당 4x4바이트 + 해시 16바이트, 범위당 해시 16바이트)"""
+    per_chunk = 4 * 4 + HASH_BYTES
+    return round((len(result) * per_chunk + len(result.ranges) * HASH_BYTES + tasks * 200) / 1024 / 1024, 1)
+
+
+async def _loop_lag(work, interval: float = 0.01) -> float:
+    """work를 await하는 동안 heartbeat 최대 지연 (ms)"""
+    lags, done = [], asyncio.Event()
+
+    async def heartbeat():
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            before = loop.time()
+            await asyncio.sleep(interval)
+            lags.append(loop.time() - before - interval)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    try:
+        await work()
+    finally:
+        done.set()
+        await beat
+    return round(max(lags, default=0.0) * 1000, 1)
+
+
+def run_benchmark(paths: List[str], workers_list: List[int], chunk_size: int, chunk_overlap: int,
+                  batch_bytes: int, tokenizer: Optional[str], pickled: bool) -> List[Dict]:
+    rows = []
+    serial = ingest_serial(paths, chunk_size, chunk_overlap, batch_bytes, tokenizer)
+    rows.append({"mode": "serial", "workers": 1, **serial.summary(), "ipc_mb": 0.0})
+    print_row(rows[-1])
+
+    for workers in workers_list:
+        with ParallelIngest(workers, chunk_size, chunk_overlap, batch_bytes, tokenizer) as ingest:
+            ingest._pool().submit(_init_worker, chunk_size, chunk_overlap, tokenizer).result()  # 워커 기동
+            result = ingest.run(paths)
+            tasks = len(ingest.plan(paths)[1])
+        assert result.hashes == serial.hashes, "병렬 결과가 순차 결과와 다릅니다"
+        rows.append({"mode": "offsets", "workers": workers, **result.summary(), "ipc_mb": _ipc_mb(result, tasks),
+                     "speedup": round(serial.seconds / result.seconds, 2)})
+        print_row(rows[-1])
+
+    if pickled:
+        row = _pickled_baseline(paths, max(workers_list), chunk_size, chunk_overlap, batch_bytes, tokenizer)
+        row["speedup"] = round(serial.seconds / row["seconds"], 2)
+        rows.append(row)
+        print_row(row)
+    return rows
+
+
+def print_row(row: Dict):
+    print(f"{row['mode']:<14} {row['workers']:>7} {row['chunks']:>10,} {row['seconds']:>8} "
+          f"{row['chunks_per_sec']:>10,} {row.get('speedup', 1.0):>7}x {row['ipc_mb']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 프로세스 인제스트 벤치마크")
+    parser.add_argument("--corpus-mb", type=int, default=1024, help="합성 코퍼스 크기 (MB)")
+    parser.add_argument("--file-kb", type=int, default=1024, help="합성 파일 하나 크기 (KB)")
+    parser.add_argument("--corpus-dir", help="코퍼스 디렉토리 (있으면 재사용, 없으면 생성)")
+    parser.add_argument("--keep", action="store_true", help="생성한 코퍼스를 지우지 않음")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="프로세스 수 목록 (기본: 1, 2, 4, ... 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--batch-mb", type=float, default=8, help="워커 호출당 입력 크기 (MB)")
+    parser.add_argument("--tokenizer", help="tiktoken 인코딩 이름 (기본: 단어 수 근사)")
+    parser.add_argument("--no-pickled", action="store_true", help="텍스트 피클 전달 비교 생략")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    workers_list = args.workers or sorted({min(2 ** i, cpu_count) for i in range(cpu_count.bit_length() + 1)})
+    batch_bytes = int(args.batch_mb * 1024 * 1024)
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="ingest_corpus_")
+    existing = sorted(str(p) for p in Path(corpus_dir).glob("*.txt"))
+    if existing:
+        paths = existing
+        print(f"📂 기존 코퍼스 사용: {corpus_dir} ({len(paths)}개 파일)")
+    else:
+        print(f"📝 합성 코퍼스 생성 중: {args.corpus_mb}MB → {corpus_dir}")
+        start = time.perf_counter()
+        paths = build_synthetic_corpus(corpus_dir, args.corpus_mb, args.file_kb)
+        print(f"✅ {len(paths)}개 파일 생성 ({time.perf_counter() - start:.1f}초)")
+
+    try:
+        print(f"\n⚙️  청크 {args.chunk_size}/{args.chunk_overlap}, 배치 {args.batch_mb}MB, 코어 {cpu_count}개")
+        print(f"{'mode':<14} {'workers':>7} {'chunks':>10} {'seconds':>8} {'chunks/s':>10} {'speedup':>8} {'ipc_mb':>8}")
+        print("-" * 72)
+        rows = run_benchmark(paths, workers_list, args.chunk_size, args.chunk_overlap, batch_bytes,
+                             args.tokenizer, not args.no_pickled)
+
+        # 이벤트 루프 반응성: 앞쪽 일부 파일로 루프 안 순차 처리 vs run_async
+        sample = paths[:max(1, len(paths) // 16)]
+
+        async def inline():
+            ingest_serial(sample, args.chunk_size, args.chunk_overlap, batch_bytes, args.tokenizer)
+
+        async def offloaded():
+            with ParallelIngest(max(workers_list), args.chunk_size, args.chunk_overlap,
+                                batch_bytes, args.tokenizer) as ingest:
+                await ingest.run_async(sample)
+
+        lag = {"inline_ms": asyncio.run(_loop_lag(inline)), "run_async_ms": asyncio.run(_loop_lag(offloaded))}
+        print(f"\n⏱️  이벤트 루프 최대 지연 ({len(sample)}개 파일): 루프 안에서 처리 {lag['inline_ms']}ms, "
+              f"run_async {lag['run_async_ms']}ms")
+
+        best = max((r for r in rows if r["mode"] == "offsets"), key=lambda r: r["chunks_per_sec"])
+        print(f"\n📊 중복 제거 가능 청크: {best['chunks'] - best['unique_chunks']:,}개 / {best['chunks']:,}개, "
+              f"토큰 {best['tokens']:,}개")
+
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump({"cpu_count": cpu_count, "corpus_files": len(paths), "rows": rows, "loop_lag": lag},
+                          f, ensure_ascii=False, indent=2)
+            print(f"💾 JSON 저장: {args.json_path}")
+    finally:
+        if not args.keep and not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+RAG 검색 파라미터 스윕 벤치마크 - 청크 크기/오버랩, k, HNSW M/ef 튜닝용
+
+라벨링된 (질문 → 정답 문서) 세트로 각 설정의 recall@k, 인덱스 빌드 시간,
+인덱스 크기, 검색 지연시간(p50/p99)을 측정합니다.
+결정적 로컬 임베딩(HashEmbeddings)을 사용하므로 API 키 없이 오프라인으로 실행됩니다.
+
+사용법:
+python rag_bench.py
+python rag_bench.py --chunk-sizes 500 1000 --overlaps 100 200 --ks 1 3 5 --json results.json
+"""
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from langchain_community.document_loaders import TextLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain_chroma import Chroma
+    from langchain.schema import Document
+except ImportError as e:
+    raise ImportError(f"Missing required package: {e}")
+
+from local_models import HashEmbeddings
+from rag_smart import DEMO_QUESTIONS, SmartDocumentSelector
+from stats_util import percentile
+
+
+def directory_size(path: Path) -> int:
+    """디렉토리 전체 크기 (bytes)"""
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def build_labeled_set(metadata_path: str = "docs/doc_metadata.json",
+                      docs_base_path: str = "docs") -> List[Dict]:
+    """
+    데모 질문과 doc_metadata.json 키워드로 (질문 → 정답 문서) 세트 생성
+
+    Returns:
+        [{"question": str, "sources": [docs 기준 상대 경로, ...]}, ...]
+    """
+    selector = SmartDocumentSelector(metadata_path)
+    base = Path(docs_base_path)
+    labeled = []
+
+    # 1. 데모 질문: 셀렉터가 고르는 카테고리의 문서를 정답으로 사용
+    for question, _ in DEMO_QUESTIONS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            categories = selector.analyze_query(question)
+            paths = selector.get_document_paths(categories, docs_base_path)
+        sources = [str(Path(p).relative_to(base)) for p in paths]
+        if sources:
+            labeled.append({"question": question, "sources": sources})
+
+    # 2. 카테고리 키워드별 질문: 해당 카테고리 문서가 정답 (문서가 없는 카테고리는 제외)
+    for info in selector.metadata["categories"].values():
+        if not info["files"]:
+            continue
+        for keyword in info["keywords"]:
+            labeled.append({
+                "question": f"{keyword}에 대해 설명해주세요",
+                "sources": list(info["files"]),
+            })
+
+    return labeled
+
+
+def load_labeled_set(path: str) -> List[Dict]:
+    """JSON 라벨 파일 로드 ([{"question": ..., "sources": [...]}, ...]), 정답 문서가 없는 항목은 ValueError"""
+    with open(path, 'r', encoding='utf-8') as f:
+        labeled = json.load(f)
+    for i, item in enumerate(labeled):
+        if not item.get("question") or not item.get("sources"):
+            raise ValueError(f"{path}: {i}번째 라벨에 question 또는 sources가 비어 있습니다: {item}")
+    return labeled
+
+
+def load_corpus(docs_base_path: str = "docs") -> List[Document]:
+    """docs/ 아래 모든 .txt 로드, source 메타데이터는 docs 기준 상대 경로로 저장"""
+    base = Path(docs_base_path)
+    documents = []
+    for txt_file in sorted(base.rglob("*.txt")):
+        docs = TextLoader(str(txt_file), encoding='utf-8').load()
+        for doc in docs:
+            doc.metadata["source"] = str(txt_file.relative_to(base))
+        documents.extend(docs)
+    return documents
+
+
+def recall_at_k(results: List[List[Document]], labeled: List[Dict]) -> float:
+    """질문별 (검색된 정답 문서 수 / 정답 문서 수)의 평균 (정답 문서가 없는 질문은 제외)"""
+    total, counted = 0.0, 0
+    for docs, item in zip(results, labeled):
+        expected = set(item["sources"])
+        if not expected:
+            continue
+        found = {doc.metadata.get("source") for doc in docs}
+        total += len(expected & found) / len(expected)
+        counted += 1
+    return total / counted if counted else 0.0
+
+
+class RetrievalBenchmark:
+    """청크/검색/HNSW 파라미터 조합별 recall 및 성능 측정"""
+
+    def __init__(self, labeled: List[Dict], documents: List[Document],
+                 embeddings=None, repeat: int = 5):
+        self.labeled = labeled
+        self.documents = documents
+        self.embeddings = embeddings or HashEmbeddings()
+        self.repeat = repeat
+        # 질문 임베딩은 설정과 무관하므로 한 번만 계산 (검색 지연시간만 측정하기 위함)
+        self.query_vectors = self.embeddings.embed_documents(
+            [item["question"] for item in labeled]
+        )
+
+    def build_index(self, chunk_size: int, chunk_overlap: int, hnsw_m: int,
+                    hnsw_ef: int, persist_dir: Path) -> Dict:
+        """인덱스 생성 후 (vectorstore, 청크 수, 빌드 시간, 크기) 반환"""
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+        )
+
+        start = time.perf_counter()
+        chunks = splitter.split_documents(self.documents)
+        vectorstore = Chroma.from_documents(
+            documents=chunks,
+            embedding=self.embeddings,
+            persist_directory=str(persist_dir),
+            collection_metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": hnsw_m,
+                "hnsw:construction_ef": hnsw_ef,
+                "hnsw:search_ef": hnsw_ef,
+            },
+        )
+        build_time = time.perf_counter() - start
+
+        return {
+            "vectorstore": vectorstore,
+            "num_chunks": len(chunks),
+            "build_time_s": build_time,
+            "index_bytes": directory_size(persist_dir),
+        }
+
+    def measure_search(self, vectorstore: Chroma, k: int) -> Dict:
+        """recall@k와 질문당 검색 지연시간 측정"""
+        latencies = []
+        results = []
+        for round_no in range(self.repeat):
+            for vector in self.query_vectors:
+                start = time.perf_counter()
+                docs = vectorstore.similarity_search_by_vector(vector, k=k)
+                latencies.append(time.perf_counter() - start)
+                if round_no == 0:
+                    results.append(docs)
+
+        return {
+            "recall": recall_at_k(results, self.labeled),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+    def sweep(self, chunk_sizes: List[int], overlaps: List[int], ks: List[int],
+              hnsw_ms: List[int], hnsw_efs: List[int]) -> List[Dict]:
+        """모든 파라미터 조합 측정 (인덱스는 k와 무관하므로 k별로 재사용)"""
+        rows = []
+        for chunk_size, overlap, hnsw_m, hnsw_ef in itertools.product(
+                chunk_sizes, overlaps, hnsw_ms, hnsw_efs):
+            if overlap >= chunk_size:
+                continue
+
+            persist_dir = Path(tempfile.mkdtemp(prefix="rag_bench_"))
+            try:
+                index = self.build_index(chunk_size, overlap, hnsw_m, hnsw_ef, persist_dir)
+                for k in ks:
+                    search = self.measure_search(index["vectorstore"], k)
+                    row = {
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": overlap,
+                        "k": k,
+                        "hnsw_m": hnsw_m,
+                        "hnsw_ef": hnsw_ef,
+                        "num_chunks": index["num_chunks"],
+                        "build_time_s": round(index["build_time_s"], 4),
+                        "index_bytes": index["index_bytes"],
+                        "recall_at_k": round(search["recall"], 4),
+                        "p50_ms": round(search["p50_ms"], 3),
+                        "p99_ms": round(search["p99_ms"], 3),
+                    }
+                    rows.append(row)
+                    print_row(row)
+                index["vectorstore"].delete_collection()
+            finally:
+                shutil.rmtree(persist_dir, ignore_errors=True)
+
+        return rows
+
+
+_COLUMNS = [
+    ("chunk_size", "chunk", 6), ("chunk_overlap", "overlap", 7), ("k", "k", 3),
+    ("hnsw_m", "M", 4), ("hnsw_ef", "ef", 5), ("num_chunks", "chunks", 7),
+    ("build_time_s", "build_s", 9), ("index_bytes", "bytes", 10),
+    ("recall_at_k", "recall", 8), ("p50_ms", "p50_ms", 8), ("p99_ms", "p99_ms", 8),
+]
+
+
+def print_header():
+    print(" ".join(f"{label:>{width}}" for _, label, width in _COLUMNS))
+    print("-" * (sum(width + 1 for _, _, width in _COLUMNS) - 1))
+
+
+def print_row(row: Dict):
+    print(" ".join(f"{row[name]!s:>{width}}" for name, _, width in _COLUMNS))
+
+
+def write_results(rows: List[Dict], json_path: Optional[str], csv_path: Optional[str]):
+    """결과를 JSON / CSV로 저장"""
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"💾 JSON 저장: {json_path}")
+    if csv_path and rows:
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"💾 CSV 저장: {csv_path}")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="RAG 검색 파라미터 스윕 벤치마크")
+    parser.add_argument("--docs", default="docs", help="문서 디렉토리")
+    parser.add_argument("--metadata", default="docs/doc_metadata.json", help="메타데이터 파일")
+    parser.add_argument("--labels", help="라벨 JSON 파일 (없으면 데모 질문 + 메타데이터로 생성)")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 1000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--hnsw-m", type=int, nargs="+", default=[16, 32])
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--repeat", type=int, default=5, help="질문 세트 반복 횟수 (지연시간 샘플 수)")
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    parser.add_argument("--csv", dest="csv_path", help="결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    print("🚀 RAG 검색 파라미터 스윕 벤치마크\n")
+
+    labeled = load_labeled_set(args.labels) if args.labels else build_labeled_set(args.metadata, args.docs)
+    documents = load_corpus(args.docs)
+    print(f"📋 라벨 질문: {len(labeled)}개, 📚 문서: {len(documents)}개\n")
+
+    benchmark = RetrievalBenchmark(labeled, documents, repeat=args.repeat)
+    print_header()
+    rows = benchmark.sweep(args.chunk_sizes, args.overlaps, args.ks, args.hnsw_m, args.hnsw_ef)
+
+    if rows:
+        best = max(rows, key=lambda r: (r["recall_at_k"], -r["k"], -r["p99_ms"]))
+        print(f"\n🏆 최고 recall: chunk_size={best['chunk_size']}, overlap={best['chunk_overlap']}, "
+              f"k={best['k']}, M={best['hnsw_m']}, ef={best['hnsw_ef']} "
+              f"(recall@k={best['recall_at_k']}, p99={best['p99_ms']}ms)")
+
+    write_results(rows, args.json_path, args.csv_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ pip install langchain langchain-community langchain-openai langchain-chroma chro
 import os
 import json
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
 try:
     from langchain_community.document_loaders import TextLoader, DirectoryLoader
@@ -21,6 +21,18 @@ except ImportError as e:
     print(f"   pip install langchain langchain-community langchain-openai langchain-chroma chromadb openai")
     raise ImportError(f"Missing required package: {e}")
 
+from mmr import MMRRetriever
+
+
+# 데모 질문 (질문, use_all) - 벤치마크 라벨 세트의 시드로도 사용
+DEMO_QUESTIONS = [
+    ("회사의 트레이딩 전략에는 어떤 것들이 있나요?", False),
+    ("RSI 지표는 어떻게 사용하나요?", False),
+    ("리스크 관리에서 손절매는 어떻게 설정하나요?", False),
+    ("회사의 비전은 무엇인가요?", False),
+    ("볼린저 밴드와 포지션 사이징을 함께 설명해주세요", True),  # 여러 카테고리
+]
+
 
 class SmartDocumentSelector:
     """질문 분석 후 적절한 문서 카테고리 선택"""
@@ -96,14 +108,22 @@ class SmartDocumentSelector:
 class SmartRAGSystem:
     """스마트 RAG 시스템"""
 
-    def __init__(self, docs_base_path: str = "docs"):
+    def __init__(self, docs_base_path: str = "docs", embeddings=None, llm=None):
+        """
+        Args:
+            docs_base_path: 문서 디렉토리
+            embeddings: 임베딩 모델 (None이면 OpenAIEmbeddings)
+            llm: LLM (None이면 ChatOpenAI gpt-3.5-turbo)
+        """
         self.docs_base_path = Path(docs_base_path)
         self.selector = SmartDocumentSelector()
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+        self.embeddings = embeddings or OpenAIEmbeddings()
+        self.llm = llm or ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+        self.chunk_size = 1000
+        self.chunk_overlap = 200
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
             length_function=len,
         )
 
@@ -138,10 +158,20 @@ class SmartRAGSystem:
 
         return documents
 
-    def create_vectorstore(self, documents: List[Document], persist_dir: str = "./chroma_db") -> Chroma:
-        """벡터 DB 생성"""
+    def create_vectorstore(self, documents: List[Document], persist_dir: str = "./chroma_db",
+                           ingest_workers: int = 0) -> Chroma:
+        """
+        벡터 DB 생성
+
+        Args:
+            ingest_workers: 0보다 크면 파일 문서 분할을 그 수만큼의 프로세스에서 실행 (parallel_ingest.py)
+        """
         print(f"✂️  {len(documents)}개 문서를 청크로 분할 중...")
-        texts = self.text_splitter.split_documents(documents)
+        if ingest_workers > 0:
+            from parallel_ingest import split_documents_parallel
+            texts = split_documents_parallel(documents, self.chunk_size, self.chunk_overlap, ingest_workers)
+        else:
+            texts = self.text_splitter.split_documents(documents)
         print(f"✅ {len(texts)}개 청크 생성 완료")
 
         print("🔢 벡터 DB 생성 중...")
@@ -154,12 +184,26 @@ class SmartRAGSystem:
 
         return vectorstore
 
-    def create_qa_chain(self, vectorstore: Chroma, k: int = 3) -> RetrievalQA:
-        """QA 체인 생성"""
+    def create_qa_chain(self, vectorstore: Chroma, k: int = 3, fetch_k: Optional[int] = None,
+                        lambda_mult: float = 0.5) -> RetrievalQA:
+        """
+        QA 체인 생성
+
+        Args:
+            k: 프롬프트에 넣을 청크 수
+            fetch_k: 지정하면 fetch_k개 후보에서 MMR로 k개를 다양하게 재선택
+            lambda_mult: MMR 관련도 가중치 (1이면 관련도만, 0이면 다양성만)
+        """
+        if fetch_k:
+            retriever = MMRRetriever(vectorstore=vectorstore, k=k, fetch_k=fetch_k,
+                                     lambda_mult=lambda_mult)
+        else:
+            retriever = vectorstore.as_retriever(search_kwargs={"k": k})
+
         qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
-            retriever=vectorstore.as_retriever(search_kwargs={"k": k}),
+            retriever=retriever,
             return_source_documents=True,
         )
         return qa_chain
@@ -247,13 +291,7 @@ def main():
         rag = SmartRAGSystem(docs_base_path="docs")
 
         # 테스트 질문들
-        questions = [
-            ("회사의 트레이딩 전략에는 어떤 것들이 있나요?", False),
-            ("RSI 지표는 어떻게 사용하나요?", False),
-            ("리스크 관리에서 손절매는 어떻게 설정하나요?", False),
-            ("회사의 비전은 무엇인가요?", False),
-            ("볼린저 밴드와 포지션 사이징을 함께 설명해주세요", True),  # 여러 카테고리
-        ]
+        questions = DEMO_QUESTIONS
 
         for i, (question, use_all) in enumerate(questions, 1):
             print(f"\n{'='*60}")